@@ -16,29 +16,90 @@ class ProductSupplierInfo(models.Model):
             [("is_default", "=", True)], limit=1
         )
 
-    @api.depends("warranty_return_partner")
+    @api.depends(
+        "warranty_return_partner",
+        "warranty_return_other_address",
+        "name",
+        "company_id.partner_id",
+        "company_id.crm_return_address_id",
+    )
     def _compute_warranty_return_address(self):
         """Method to return the partner delivery address or if none, the
         default address
         """
         for record in self:
-            return_partner = record.warranty_return_partner
-            partner_id = record.company_id.partner_id.id
-            if return_partner and return_partner == "supplier":
-                partner_id = record.name.id
-            elif (
-                return_partner
-                and return_partner == "company"
-                and record.company_id.crm_return_address_id
-            ):
-                partner_id = record.company_id.crm_return_address_id.id
-            elif (
-                return_partner
-                and return_partner == "other"
-                and record.warranty_return_other_address
-            ):
-                partner_id = record.warranty_return_other_address.id
-            record.warranty_return_address = partner_id
+            record.warranty_return_address = record._get_warranty_return_address(
+                record.company_id
+            )
+
+    def _get_warranty_return_address(self, company):
+        """Return address of this supplier info when the goods are handled
+        by the given company. The company is a parameter because supplier
+        info lines without company are shared by all the companies.
+        """
+        self.ensure_one()
+        return_partner = self.warranty_return_partner
+        partner = company.partner_id
+        if return_partner == "supplier":
+            partner = self.name
+        elif return_partner == "company" and company.crm_return_address_id:
+            partner = company.crm_return_address_id
+        elif return_partner == "other" and self.warranty_return_other_address:
+            partner = self.warranty_return_other_address
+        return partner
+
+    @api.model
+    def _get_warranty_sellers(self, products, companies):
+        """Return a dict mapping (product id, company id) to the supplier
+        info line that applies to the warranty return of the product in
+        the company. All the candidate lines are read with a single search
+        and the first one in the model order wins, like in
+        `product.product._select_seller`.
+        """
+        sellers = self.search(
+            [
+                ("product_tmpl_id", "in", products.product_tmpl_id.ids),
+                "|",
+                ("product_id", "=", False),
+                ("product_id", "in", products.ids),
+                "|",
+                ("company_id", "=", False),
+                ("company_id", "in", companies.ids),
+            ]
+        )
+        sellers_by_template = {}
+        for seller in sellers:
+            sellers_by_template.setdefault(seller.product_tmpl_id.id, []).append(seller)
+        result = {}
+        for product in products:
+            for company in companies:
+                for seller in sellers_by_template.get(product.product_tmpl_id.id, []):
+                    if seller.product_id and seller.product_id != product:
+                        continue
+                    if seller.company_id and seller.company_id != company:
+                        continue
+                    result[(product.id, company.id)] = seller
+                    break
+        return result
+
+    @api.model
+    def _get_warranty_return_addresses(self, products, companies):
+        """Bulk version of `warranty_return_address` for vendor return
+        routing: return a dict mapping (product id, company id) to the
+        partner where the goods have to be sent back. Products without any
+        supplier info are not present in the result.
+        """
+        result = {}
+        sellers = self._get_warranty_sellers(products, companies)
+        for (product_id, company_id), seller in sellers.items():
+            if seller.company_id:
+                address = seller.warranty_return_address
+            else:
+                address = seller._get_warranty_return_address(
+                    companies.browse(company_id)
+                )
+            result[(product_id, company_id)] = address
+        return result
 
     warranty_duration = fields.Float(
         "Period",
@@ -72,6 +133,7 @@ class ProductSupplierInfo(models.Model):
     warranty_return_address = fields.Many2one(
         "res.partner",
         compute="_compute_warranty_return_address",
+        store=True,
         string="Return address",
         help="Where the goods should be returned  "
         "(computed field based on other infos.)",
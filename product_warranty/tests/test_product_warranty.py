@@ -75,3 +75,29 @@ class TestProductWarranty(TransactionCase):
             self.supplierinfo_brw.warranty_return_address.id,
             self.supplierinfo_brw.warranty_return_other_address.id,
         )
+
+    def test_warranty_return_address_company_change(self):
+        """The stored return address follows the company return address"""
+        self.supplierinfo_brw.write({"warranty_return_partner": "company"})
+        company = self.supplierinfo_brw.company_id
+        new_address = self.env["res.partner"].create({"name": "Return center"})
+        company.crm_return_address_id = new_address
+        self.assertEqual(self.supplierinfo_brw.warranty_return_address, new_address)
+
+    def test_warranty_return_addresses_bulk(self):
+        """Bulk resolver returns the address of the first matching supplier
+        info for every (product, company) key
+        """
+        company = self.supplierinfo_brw.company_id
+        product = self.supplierinfo_brw.product_tmpl_id.product_variant_id
+        self.supplierinfo_brw.sequence = -1
+        product_without_seller = self.env["product.product"].create(
+            {"name": "Product without supplier"}
+        )
+        addresses = self.supplierinfo._get_warranty_return_addresses(
+            product | product_without_seller, company
+        )
+        self.assertEqual(
+            addresses[(product.id, company.id)], self.supplierinfo_brw.name
+        )
+        self.assertNotIn((product_without_seller.id, company.id), addresses)
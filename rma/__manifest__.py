@@ -3,7 +3,7 @@
 {
     "name": "Return Merchandise Authorization Management",
     "summary": "Return Merchandise Authorization (RMA)",
-    "version": "14.0.3.3.0",
+    "version": "14.0.3.23.0",
     "development_status": "Production/Stable",
     "category": "RMA",
     "website": "https://github.com/OCA/rma",
@@ -14,6 +14,7 @@
     "data": [
         "views/report_rma.xml",
         "report/report.xml",
+        "data/ir_cron_data.xml",
         "data/mail_data.xml",
         "data/rma_operation_data.xml",
         "data/stock_data.xml",
@@ -24,12 +25,20 @@
         "wizard/rma_finalization_wizard_views.xml",
         "wizard/rma_split_views.xml",
         "views/menus.xml",
+        "wizard/rma_export_views.xml",
+        "wizard/rma_import_views.xml",
         "views/res_partner_views.xml",
         "views/rma_finalization_views.xml",
         "views/rma_portal_templates.xml",
         "views/rma_team_views.xml",
         "views/rma_views.xml",
         "views/rma_tag_views.xml",
+        "views/rma_perf_sample_views.xml",
+        "views/rma_mass_action_views.xml",
+        "views/rma_job_views.xml",
+        "views/rma_kpi_views.xml",
+        "views/rma_event_views.xml",
+        "report/rma_report_views.xml",
         "views/stock_picking_views.xml",
         "views/stock_warehouse_views.xml",
         "views/res_config_settings_views.xml",
@@ -0,0 +1,42 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import _, http
+from odoo.exceptions import UserError
+from odoo.http import request
+
+# Maximum number of RMAs created by a call
+MAX_BATCH_SIZE = 1000
+
+
+class RmaApi(http.Controller):
+    @http.route("/rma/api/events", type="json", auth="user")
+    def rma_events(self, cursor=None, limit=None, **kw):
+        """Page of the RMA events committed after `cursor`. Call it again
+        with the returned cursor while 'has_more' is true, and later on to
+        get the new events.
+        """
+        return request.env["rma.event"]._fetch(cursor=cursor, limit=limit)
+
+    @http.route("/rma/api/create", type="json", auth="user")
+    def rma_create(self, rmas, confirm=False, idempotency_key=None, **kw):
+        """Create an RMA for each item of `rmas`, and confirm them if
+        `confirm` is set. The whole batch is created in the transaction of
+        the call, so either all the RMAs are created or none of them.
+        Return the ids and names of the RMAs in the same order.
+
+        A call repeated with the same `idempotency_key` returns the RMAs
+        created by the first one instead of creating them again.
+        """
+        if not isinstance(rmas, list) or not all(isinstance(r, dict) for r in rmas):
+            raise UserError(_("'rmas' must be a list of objects."))
+        if len(rmas) > MAX_BATCH_SIZE:
+            raise UserError(
+                _("At most %d RMAs can be created at once.") % MAX_BATCH_SIZE
+            )
+        key_model = request.env["rma.idempotency.key"]
+        records = key_model._reserve(idempotency_key)
+        if records is None:
+            records = request.env["rma"]._create_batch(rmas, confirm=confirm)
+            key_model._record(idempotency_key, records)
+        return [{"id": rma.id, "name": rma.name} for rma in records]
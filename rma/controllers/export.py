@@ -0,0 +1,89 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import csv
+import io
+import os
+import tempfile
+
+import xlsxwriter
+
+from odoo import api, http
+from odoo.http import content_disposition, request
+
+# Size of the blocks the exported files are sent in
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class RmaExport(http.Controller):
+    @http.route("/rma/export/<int:wizard_id>", type="http", auth="user")
+    def rma_export(self, wizard_id, **kw):
+        """Stream the file of an RMA export wizard. The rows are read while
+        the response is sent, after the request cursor has been closed, so
+        the stream uses its own cursor.
+        """
+        wizard = request.env["rma.export.wizard"].browse(wizard_id).exists()
+        if not wizard:
+            return request.not_found()
+        wizard.check_access_rule("read")
+        if wizard.file_format == "xlsx":
+            stream = self._stream_xlsx
+            mimetype = (
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+        else:
+            stream = self._stream_csv
+            mimetype = "text/csv;charset=utf-8"
+        return request.make_response(
+            stream(request.env.registry, request.env.uid, request.context, wizard_id),
+            headers=[
+                ("Content-Type", mimetype),
+                ("Content-Disposition", content_disposition(wizard._get_filename())),
+            ],
+        )
+
+    def _iter_wizard(self, registry, uid, context, wizard_id):
+        """Yield the headers and then the rows of the export. The request
+        environments are gone when the response is sent, so new ones are
+        managed here.
+        """
+        with api.Environment.manage(), registry.cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            wizard = env["rma.export.wizard"].browse(wizard_id)
+            yield [header for header, __ in wizard._get_columns()]
+            yield from wizard._iter_rows()
+
+    def _stream_csv(self, registry, uid, context, wizard_id):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in self._iter_wizard(registry, uid, context, wizard_id):
+            writer.writerow(["" if value is None else value for value in row])
+            if buffer.tell() >= STREAM_BLOCK_SIZE:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    def _stream_xlsx(self, registry, uid, context, wizard_id):
+        """The workbook is written row by row to a temporary file in
+        constant memory mode, and then sent by blocks.
+        """
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            workbook = xlsxwriter.Workbook(
+                path,
+                {"constant_memory": True, "default_date_format": "yyyy-mm-dd hh:mm"},
+            )
+            worksheet = workbook.add_worksheet()
+            rows = self._iter_wizard(registry, uid, context, wizard_id)
+            for row_index, row in enumerate(rows):
+                worksheet.write_row(row_index, 0, row)
+            workbook.close()
+            with open(path, "rb") as exported_file:
+                block = exported_file.read(STREAM_BLOCK_SIZE)
+                while block:
+                    yield block
+                    block = exported_file.read(STREAM_BLOCK_SIZE)
+        finally:
+            os.remove(path)
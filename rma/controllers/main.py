@@ -14,7 +14,8 @@ class PortalRma(CustomerPortal):
     def _prepare_home_portal_values(self, counters):
         values = super()._prepare_home_portal_values(counters)
         if "rma_count" in counters:
-            rma_model = request.env["rma"]
+            # The customers keep seeing their archived RMAs
+            rma_model = request.env["rma"].with_context(active_test=False)
             rma_count = (
                 rma_model.search_count([])
                 if rma_model.check_access_rights("read", raise_exception=False)
@@ -40,7 +41,7 @@ class PortalRma(CustomerPortal):
     )
     def portal_my_rmas(self, page=1, date_begin=None, date_end=None, sortby=None, **kw):
         values = self._prepare_portal_layout_values()
-        rma_obj = request.env["rma"]
+        rma_obj = request.env["rma"].with_context(active_test=False)
         # Avoid error if the user does not have access.
         if not rma_obj.check_access_rights("read", raise_exception=False):
             return request.redirect("/my")
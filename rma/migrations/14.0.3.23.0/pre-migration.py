@@ -0,0 +1,21 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo.tools import sql
+
+
+def migrate(cr, version):
+    # The KPI table doesn't exist yet when upgrading from a version
+    # without KPIs, it is created with the new schema
+    if not sql.table_exists(cr, "rma_kpi"):
+        return
+    # KPI rows are appended as deltas now, several rows can have the same
+    # dimensions and the average cycle time is computed when reading them
+    cr.execute(
+        """
+        ALTER TABLE rma_kpi
+            DROP CONSTRAINT IF EXISTS rma_kpi_key_uniq,
+            DROP COLUMN IF EXISTS key,
+            DROP COLUMN IF EXISTS avg_cycle_time
+        """
+    )
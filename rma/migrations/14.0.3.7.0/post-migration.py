@@ -0,0 +1,18 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    # The closing date of the already closed RMAs is unknown, the date of
+    # their last update is the best approximation.
+    cr.execute(
+        """
+        UPDATE rma SET date_closed = write_date
+        WHERE date_closed IS NULL AND state IN %s
+        """,
+        (tuple(env["rma"]._get_closed_states()),),
+    )
+    env["rma.kpi"]._reconcile()
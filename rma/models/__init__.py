@@ -2,8 +2,14 @@
 
 from . import account_move
 from . import rma
+from . import rma_event
 from . import rma_finalization
+from . import rma_idempotency_key
+from . import rma_job
+from . import rma_kpi
+from . import rma_mass_action
 from . import rma_operation
+from . import rma_perf_sample
 from . import rma_tag
 from . import rma_team
 from . import res_company
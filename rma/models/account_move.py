@@ -42,7 +42,7 @@ class AccountMove(models.Model):
 
     def unlink(self):
         rma = self.mapped("invoice_line_ids.rma_id")
-        rma.write({"state": "received"})
+        rma._apply_state_event("refund_unlink")
         return super().unlink()
 
 
@@ -52,4 +52,5 @@ class AccountMoveLine(models.Model):
     rma_id = fields.Many2one(
         comodel_name="rma",
         string="RMA",
+        index=True,
     )
@@ -64,6 +64,17 @@ class Company(models.Model):
         default=_default_rma_mail_draft_template,
         help="Email sent to the customer when they place " "an RMA from the portal",
     )
+    rma_archive_delay = fields.Integer(
+        string="Archive closed RMAs after (days)",
+        help="Closed and cancelled RMAs are archived this number of days "
+        "after they were closed. Set 0 to never archive them.",
+    )
+    rma_chatter_compaction_delay = fields.Integer(
+        string="Compact the history of closed RMAs after (days)",
+        help="The tracking messages and internal system notes of the closed "
+        "and cancelled RMAs are collapsed into a single summary note this "
+        "number of days after they were closed. Set 0 to never compact them.",
+    )
 
     @api.model
     def create(self, vals):
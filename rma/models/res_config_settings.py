@@ -39,3 +39,11 @@ class ResConfigSettings(models.TransientModel):
         related="company_id.rma_mail_draft_confirmation_template_id",
         readonly=False,
     )
+    rma_archive_delay = fields.Integer(
+        related="company_id.rma_archive_delay",
+        readonly=False,
+    )
+    rma_chatter_compaction_delay = fields.Integer(
+        related="company_id.rma_chatter_compaction_delay",
+        readonly=False,
+    )
@@ -1,15 +1,21 @@
 # Copyright 2020 Tecnativa - Ernesto Tejeda
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import base64
+import threading
 from collections import Counter
+from datetime import timedelta
 
 from odoo import _, api, fields, models
 from odoo.exceptions import AccessError, ValidationError
 from odoo.tests import Form
-from odoo.tools import html2plaintext
+from odoo.tools import email_normalize, html2plaintext, html_escape, index_exists
 
 from odoo.addons.stock.models.stock_move import PROCUREMENT_PRIORITIES
 
+from .rma_kpi import KPI_MEASURES
+from .rma_perf_sample import instrumented
+
 
 class Rma(models.Model):
     _name = "rma"
@@ -29,6 +35,7 @@ class Rma(models.Model):
         return [("id", "child_of", rma_loc.ids)]
 
     # General fields
+    active = fields.Boolean(default=True, index=True)
     sent = fields.Boolean()
     name = fields.Char(
         string="Name",
@@ -187,6 +194,12 @@ class Rma(models.Model):
         copy=False,
         tracking=True,
     )
+    date_closed = fields.Datetime(
+        string="Closed on",
+        readonly=True,
+        copy=False,
+        help="Date on which the RMA reached a closed state.",
+    )
     description = fields.Html(
         states={"locked": [("readonly", True)], "cancelled": [("readonly", True)]},
     )
@@ -206,6 +219,7 @@ class Rma(models.Model):
         comodel_name="stock.move",
         string="Reception move",
         copy=False,
+        index=True,
     )
     # Refund fields
     refund_id = fields.Many2one(
@@ -220,7 +234,11 @@ class Rma(models.Model):
         readonly=True,
         copy=False,
     )
-    can_be_refunded = fields.Boolean(compute="_compute_can_be_refunded")
+    can_be_refunded = fields.Boolean(
+        compute="_compute_can_be_refunded",
+        store=True,
+        index=True,
+    )
     # Delivery fields
     delivery_move_ids = fields.One2many(
         comodel_name="stock.move",
@@ -243,29 +261,39 @@ class Rma(models.Model):
         string="Delivered qty done",
         digits="Product Unit of Measure",
         compute="_compute_delivered_qty",
-        compute_sudo=True,
+        store=True,
     )
     can_be_returned = fields.Boolean(
         compute="_compute_can_be_returned",
+        store=True,
+        index=True,
     )
     can_be_replaced = fields.Boolean(
         compute="_compute_can_be_replaced",
+        store=True,
+        index=True,
     )
     can_be_locked = fields.Boolean(
         compute="_compute_can_be_locked",
+        store=True,
+        index=True,
     )
     can_be_finished = fields.Boolean(
         compute="_compute_can_be_finished",
+        store=True,
+        index=True,
     )
     remaining_qty = fields.Float(
         string="Remaining delivered qty",
         digits="Product Unit of Measure",
         compute="_compute_remaining_qty",
+        store=True,
     )
     remaining_qty_to_done = fields.Float(
         string="Remaining delivered qty to done",
         digits="Product Unit of Measure",
         compute="_compute_remaining_qty",
+        store=True,
     )
     uom_category_id = fields.Many2one(
         related="product_id.uom_id.category_id", string="Category UoM"
@@ -273,6 +301,8 @@ class Rma(models.Model):
     # Split fields
     can_be_split = fields.Boolean(
         compute="_compute_can_be_split",
+        store=True,
+        index=True,
     )
     origin_split_rma_id = fields.Many2one(
         comodel_name="rma",
@@ -527,19 +557,68 @@ class Rma(models.Model):
                 )
                 self.location_id = warehouse.rma_loc_id.id
 
+    def _get_unresolved_excluded_states(self):
+        """States excluded from the RMAs yet to be processed. They are the
+        ones of the 'Unresolved RMAs' filter, and the predicate of the
+        partial index on the working set. A query excluding more states
+        can still use that index.
+        """
+        return ["refunded", "returned", "replaced", "locked", "cancelled"]
+
+    def _get_indexes(self):
+        """Composite and partial indexes of the rma table as a dictionary
+        {index name: definition}. They serve the filters on company and
+        state sorted by the model order.
+        """
+        excluded_states = ", ".join(
+            "'%s'" % state for state in self._get_unresolved_excluded_states()
+        )
+        return {
+            "rma_company_id_state_index": "(company_id, state)",
+            "rma_date_desc_priority_index": "(date DESC, priority)",
+            "rma_unresolved_company_id_date_index": (
+                "(company_id, date DESC, priority) WHERE state NOT IN (%s)"
+                % excluded_states
+            ),
+        }
+
+    def init(self):
+        super().init()
+        for name, definition in self._get_indexes().items():
+            if not index_exists(self.env.cr, name):
+                self.env.cr.execute(
+                    "CREATE INDEX {} ON {} {}".format(name, self._table, definition)
+                )
+
     # CRUD methods (ORM overrides)
     @api.model_create_multi
     def create(self, vals_list):
+        default_team = None
+        sequences = {}
         for vals in vals_list:
             if vals.get("name", _("New")) == _("New"):
-                ir_sequence = self.env["ir.sequence"]
-                if "company_id" in vals:
-                    ir_sequence = ir_sequence.with_company(vals["company_id"])
-                vals["name"] = ir_sequence.next_by_code("rma")
+                # Same sequence as the one of `next_by_code`, searched once
+                # per company
+                company_id = vals.get("company_id") or self.env.company.id
+                if company_id not in sequences:
+                    sequences[company_id] = self.env["ir.sequence"].search(
+                        [
+                            ("code", "=", "rma"),
+                            ("company_id", "in", [company_id, False]),
+                        ],
+                        order="company_id",
+                        limit=1,
+                    )
+                sequence = sequences[company_id]
+                vals["name"] = sequence._next() if sequence else False
             # Assign a default team_id which will be the first in the sequence
             if not vals.get("team_id"):
-                vals["team_id"] = self.env["rma.team"].search([], limit=1).id
+                if default_team is None:
+                    default_team = self.env["rma.team"].search([], limit=1)
+                vals["team_id"] = default_team.id
         rmas = super().create(vals_list)
+        self.env["rma.kpi"]._apply_delta({}, rmas._get_kpi_contributions())
+        self.env["rma.event"]._record(rmas, "create")
         # Send acknowledge when the RMA is created from the portal and the
         # company has the proper setting active. This context is set by the
         # `rma_sale` module.
@@ -547,6 +626,32 @@ class Rma(models.Model):
             rmas._send_draft_email()
         return rmas
 
+    def write(self, vals):
+        to_close = self.browse()
+        if "state" in vals and "date_closed" not in vals:
+            if vals["state"] in self._get_closed_states():
+                to_close = self.filtered(lambda r: not r.date_closed)
+            elif any(self.mapped("date_closed")):
+                vals = dict(vals, date_closed=False)
+        kpi_before = None
+        if self._get_kpi_fields() & set(vals):
+            kpi_before = self._get_kpi_contributions()
+        old_states = {}
+        if "state" in vals:
+            old_states = {
+                rma.id: rma.state for rma in self if rma.state != vals["state"]
+            }
+        res = super().write(vals)
+        if to_close:
+            super(Rma, to_close).write({"date_closed": fields.Datetime.now()})
+        if kpi_before is not None:
+            self.env["rma.kpi"]._apply_delta(kpi_before, self._get_kpi_contributions())
+        if old_states:
+            self.env["rma.event"]._record(
+                self.browse(old_states), "state", old_states=old_states
+            )
+        return res
+
     def copy(self, default=None):
         team = super().copy(default)
         for follower in self.message_follower_ids:
@@ -561,7 +666,84 @@ class Rma(models.Model):
             raise ValidationError(
                 _("You cannot delete RMAs that are not in draft state")
             )
-        return super().unlink()
+        kpi_before = self._get_kpi_contributions()
+        res = super().unlink()
+        self.env["rma.kpi"]._apply_delta(kpi_before, {})
+        return res
+
+    # KPI methods
+    def _get_open_states(self):
+        return [
+            "draft",
+            "confirmed",
+            "received",
+            "waiting_return",
+            "waiting_replacement",
+        ]
+
+    def _get_not_received_states(self):
+        return ["draft", "confirmed", "cancelled"]
+
+    def _get_closed_states(self):
+        """States in which the RMA is considered closed. Reaching one of
+        them sets the closing date used to compute the cycle time.
+        """
+        return ["refunded", "returned", "replaced", "finished", "locked"]
+
+    def _get_kpi_fields(self):
+        """Fields whose change updates the KPI table"""
+        return {
+            "state",
+            "date",
+            "date_closed",
+            "company_id",
+            "team_id",
+            "location_id",
+            "product_id",
+            "product_uom",
+            "product_uom_qty",
+        }
+
+    def _get_kpi_contributions(self):
+        """Return the figures of these RMAs for the KPI table, as a
+        dictionary {dimension values: {measure: value}}, the dimension
+        values being in the order of KPI_DIMENSIONS. The quantities are
+        converted to the unit of measure of the products.
+        """
+        open_states = self._get_open_states()
+        not_received_states = self._get_not_received_states()
+        res = {}
+        for rma in self:
+            dimensions = (
+                rma.date.date(),
+                rma.company_id.id,
+                rma.team_id.id,
+                rma.warehouse_id.id,
+                rma.product_id.categ_id.id,
+                rma.state,
+            )
+            values = res.setdefault(
+                dimensions, {measure: 0 for measure in KPI_MEASURES}
+            )
+            values["rma_count"] += 1
+            values["open_count"] += rma.state in open_states
+            values["received_count"] += rma.state not in not_received_states
+            values["refunded_count"] += rma.state == "refunded"
+            if rma.product_uom and rma.product_id:
+                values["product_uom_qty"] += rma.product_uom._compute_quantity(
+                    rma.product_uom_qty,
+                    rma.product_id.uom_id,
+                    round=False,
+                    raise_if_failure=False,
+                )
+            else:
+                values["product_uom_qty"] += rma.product_uom_qty
+            if rma.date_closed:
+                values["closed_count"] += 1
+                values["cycle_time"] += (
+                    rma.date_closed - rma.date
+                ).total_seconds() / 86400.0
+        return res
 
     def _send_draft_email(self):
         """Send customer notifications they place the RMA from the portal"""
@@ -595,6 +777,192 @@ class Rma(models.Model):
                 default_subtype_id=self.env.ref("rma.mt_rma_notification").id,
             ).message_post_with_template(rma_template_id)
 
+    # Archiving methods
+    def _get_archivable_states(self):
+        return self._get_closed_states() + ["cancelled"]
+
+    def _get_archivable_domain(self, company):
+        """RMAs of the company closed or cancelled before its archive delay.
+        The cancelled ones have no closing date, their last update is used.
+        """
+        limit_date = fields.Datetime.now() - timedelta(days=company.rma_archive_delay)
+        return [
+            ("company_id", "=", company.id),
+            ("state", "in", self._get_archivable_states()),
+            "|",
+            ("date_closed", "<", limit_date),
+            "&",
+            ("date_closed", "=", False),
+            ("write_date", "<", limit_date),
+        ]
+
+    @api.model
+    def _cron_archive(self, batch_size=1000):
+        """Archive the old closed RMAs so that the default searches only
+        deal with the working set. RMAs are archived in batches and the
+        transaction is committed after each batch.
+        """
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        companies = self.env["res.company"].search([("rma_archive_delay", ">", 0)])
+        for company in companies:
+            domain = self._get_archivable_domain(company)
+            while True:
+                rmas = self.search(domain, order="id", limit=batch_size)
+                rmas.write({"active": False})
+                if auto_commit:
+                    self.env.cr.commit()  # pylint: disable=invalid-commit
+                self.invalidate_cache()
+                if len(rmas) < batch_size:
+                    break
+
+    # Chatter compaction methods
+    def _get_compactable_message_clause(self):
+        """SQL condition on the messages `m` that can be compacted: the
+        tracking messages and system notes without attachments that are
+        not shown to the customer in the portal. The emails and the
+        comments are never compacted.
+        """
+        return """
+            m.model = 'rma'
+            AND m.message_type = 'notification'
+            AND (
+                m.subtype_id IS NULL
+                OR m.subtype_id IN (
+                    SELECT id FROM mail_message_subtype WHERE internal
+                )
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM message_attachment_rel
+                WHERE message_id = m.id
+            )
+        """
+
+    @api.model
+    def _cron_compact_chatter(self, batch_size=500):
+        """Collapse the history of the old closed RMAs. Only the RMAs with
+        more than one compactable message are processed, so the RMAs
+        already compacted are not processed again.
+        """
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        companies = self.env["res.company"].search(
+            [("rma_chatter_compaction_delay", ">", 0)]
+        )
+        for company in companies:
+            limit_date = fields.Datetime.now() - timedelta(
+                days=company.rma_chatter_compaction_delay
+            )
+            while True:
+                self.env["base"].flush()
+                self.env.cr.execute(
+                    """
+                    SELECT r.id
+                    FROM rma r
+                    JOIN mail_message m ON m.res_id = r.id
+                    WHERE r.company_id = %s
+                        AND r.state IN %s
+                        AND COALESCE(r.date_closed, r.write_date) < %s
+                        AND {clause}
+                    GROUP BY r.id
+                    HAVING COUNT(*) > 1
+                    ORDER BY r.id
+                    LIMIT %s
+                    """.format(
+                        clause=self._get_compactable_message_clause()
+                    ),
+                    (
+                        company.id,
+                        tuple(self._get_archivable_states()),
+                        limit_date,
+                        batch_size,
+                    ),
+                )
+                rma_ids = [row[0] for row in self.env.cr.fetchall()]
+                self.browse(rma_ids)._compact_chatter()
+                if auto_commit:
+                    self.env.cr.commit()  # pylint: disable=invalid-commit
+                self.invalidate_cache()
+                if len(rma_ids) < batch_size:
+                    break
+
+    def _compact_chatter(self):
+        """Replace the compactable messages of the RMAs by a summary note
+        that lists them with their tracked values.
+        """
+        if not self:
+            return
+        self.env["base"].flush()
+        self.env.cr.execute(
+            """
+            SELECT m.id FROM mail_message m
+            WHERE m.res_id IN %s AND {clause}
+            ORDER BY m.res_id, m.date, m.id
+            """.format(
+                clause=self._get_compactable_message_clause()
+            ),
+            (tuple(self.ids),),
+        )
+        messages = (
+            self.env["mail.message"]
+            .sudo()
+            .browse([row[0] for row in self.env.cr.fetchall()])
+        )
+        messages_by_rma = {}
+        for message in messages:
+            messages_by_rma.setdefault(message.res_id, []).append(message)
+        vals_list = []
+        to_unlink = self.env["mail.message"].sudo()
+        for rma_id, rma_messages in messages_by_rma.items():
+            if len(rma_messages) < 2:
+                continue
+            lines = "".join(
+                "<li>%s</li>" % self._get_compacted_message_line(message)
+                for message in rma_messages
+            )
+            vals_list.append(
+                {
+                    "model": "rma",
+                    "res_id": rma_id,
+                    "message_type": "notification",
+                    "subtype_id": self.env.ref("mail.mt_note").id,
+                    "is_internal": True,
+                    "author_id": self.env.ref("base.partner_root").id,
+                    # Keep the summary where the last compacted message was
+                    "date": rma_messages[-1].date,
+                    "body": "<p>%s</p><ul>%s</ul>"
+                    % (html_escape(_("History summary:")), lines),
+                }
+            )
+            to_unlink |= self.env["mail.message"].concat(*rma_messages)
+        self.env["mail.message"].sudo().create(vals_list)
+        to_unlink.unlink()
+
+    def _get_compacted_message_line(self, message):
+        """HTML line describing a message in the history summary"""
+        parts = [
+            html_escape(
+                "%s - %s"
+                % (
+                    fields.Datetime.to_string(message.date),
+                    message.author_id.display_name or "",
+                )
+            )
+        ]
+        text = html2plaintext(message.body or "").strip()
+        if text:
+            parts.append(html_escape(text))
+        for tracking in message.tracking_value_ids:
+            parts.append(
+                html_escape(
+                    "%s: %s → %s"
+                    % (
+                        tracking.field_desc,
+                        tracking.get_old_display_value()[0] or "",
+                        tracking.get_new_display_value()[0] or "",
+                    )
+                )
+            )
+        return "<br/>".join(parts)
+
     # Action methods
     def action_rma_send(self):
         self.ensure_one()
@@ -627,19 +995,22 @@ class Rma(models.Model):
         if self.partner_id and self.partner_id not in self.message_partner_ids:
             self.message_subscribe([self.partner_id.id])
 
+    @instrumented
     def action_confirm(self):
         """Invoked when 'Confirm' button in rma form view is clicked."""
         self.ensure_one()
         self._ensure_required_fields()
+        self._lock_for_update()
         if self.state == "draft":
             if self.picking_id:
                 reception_move = self._create_receptions_from_picking()
             else:
                 reception_move = self._create_receptions_from_product()
-            self.write({"reception_move_id": reception_move.id, "state": "confirmed"})
+            self._apply_state_event("confirm", {"reception_move_id": reception_move.id})
             self._add_message_subscribe_partner()
             self._send_confirmation_email()
 
+    @instrumented
     def action_refund(self):
         """Invoked when 'Refund' button in rma form view is clicked
         and 'rma_refund_action_server' server action is run.
@@ -673,13 +1044,21 @@ class Rma(models.Model):
                 refund = invoice_form.save()
                 line = refund.invoice_line_ids.filtered(lambda r: not r.rma_id)
                 line.rma_id = rma.id
-                rma.write(
-                    {
-                        "refund_line_id": line.id,
+                rma.write({"refund_line_id": line.id, "refund_id": refund.id})
+            rmas._apply_state_event("refund")
+            self.env["rma.event"]._record(
+                rmas,
+                "refund",
+                {
+                    rma.id: {
                         "refund_id": refund.id,
-                        "state": "refunded",
+                        "refund_line_id": rma.refund_line_id.id,
+                        "amount": rma.refund_line_id.price_subtotal,
+                        "currency": refund.currency_id.name,
                     }
-                )
+                    for rma in rmas
+                },
+            )
             refund.invoice_origin = origin
             refund.with_user(self.env.uid).message_post_with_view(
                 "mail.message_origin_link",
@@ -744,21 +1123,38 @@ class Rma(models.Model):
 
     def action_cancel(self):
         """Invoked when 'Cancel' button in rma form view is clicked."""
+        self._lock_for_update()
         self.mapped("reception_move_id")._action_cancel()
-        self.write({"state": "cancelled"})
+        self._apply_state_event("cancel")
 
     def action_draft(self):
-        cancelled_rma = self.filtered(lambda r: r.state == "cancelled")
-        cancelled_rma.write({"state": "draft"})
+        self._apply_state_event("draft")
 
     def action_lock(self):
         """Invoked when 'Lock' button in rma form view is clicked."""
-        self.filtered("can_be_locked").write({"state": "locked"})
+        self._apply_state_event("lock")
 
     def action_unlock(self):
         """Invoked when 'Unlock' button in rma form view is clicked."""
-        locked_rma = self.filtered(lambda r: r.state == "locked")
-        locked_rma.write({"state": "received"})
+        self._apply_state_event("unlock")
+
+    def _run_mass_action(self, action, **values):
+        """Run `action` (see rma.mass.action) on these RMAs. Selections
+        bigger than one chunk are processed in background by a mass action
+        that commits after each chunk, and the mass action is returned.
+        """
+        values.update(action=action, rma_ids=[(6, 0, self.ids)])
+        mass_action_model = self.env["rma.mass.action"]
+        if len(self) <= mass_action_model._default_chunk_size():
+            mass_action_model.new(values)._execute(self)
+            return False
+        mass_action = mass_action_model.create(values)
+        mass_action.action_run()
+        action = self.env["ir.actions.actions"]._for_xml_id(
+            "rma.rma_mass_action_action"
+        )
+        action.update(res_id=mass_action.id, view_mode="form", views=[(False, "form")])
+        return action
 
     def action_preview(self):
         """Invoked when 'Preview' button in rma form view is clicked."""
@@ -826,7 +1222,7 @@ class Rma(models.Model):
         rma._check_required_after_draft
         rma.action_confirm
         """
-        ir_translation = self.env["ir.translation"]
+        field_strings = self.env["ir.translation"].get_field_string("rma")
         required = [
             "partner_id",
             "partner_shipping_id",
@@ -837,7 +1233,7 @@ class Rma(models.Model):
         for record in self:
             desc = ""
             for field in filter(lambda item: not record[item], required):
-                desc += "\n%s" % ir_translation.get_field_string("rma")[field]
+                desc += "\n%s" % field_strings[field]
             if desc:
                 raise ValidationError(_("Required field(s):%s") % desc)
 
@@ -980,42 +1376,65 @@ class Rma(models.Model):
             move_form.product_uom = self.product_uom
 
     # Extract business methods
+    @instrumented
     def extract_quantity(self, qty, uom):
+        self.ensure_one()
+        return self.extract_quantities([qty], uom)
+
+    @instrumented
+    def extract_quantities(self, quantities, uom):
+        """Split the RMA extracting a new received RMA for each quantity of
+        `quantities`, expressed in `uom`. All the RMAs are created at once
+        and a single message is posted in this RMA.
+        """
         self.ensure_one()
         self._ensure_can_be_split()
-        self._ensure_qty_to_extract(qty, uom)
-        self.product_uom_qty -= uom._compute_quantity(qty, self.product_uom)
-        if self.remaining_qty_to_done <= 0:
-            if self.state == "waiting_return":
-                self.state = "returned"
-            elif self.state == "waiting_replacement":
-                self.state = "replaced"
-        extracted_rma = self.copy(
-            {
-                "origin": self.name,
-                "product_uom_qty": qty,
-                "product_uom": uom.id,
-                "state": "received",
-                "reception_move_id": self.reception_move_id.id,
-                "origin_split_rma_id": self.id,
-            }
+        if not quantities or any(qty <= 0 for qty in quantities):
+            raise ValidationError(_("Quantities to extract must be greater than 0."))
+        total_qty = sum(quantities)
+        self._ensure_qty_to_extract(total_qty, uom)
+        self.product_uom_qty -= uom._compute_quantity(total_qty, self.product_uom)
+        self._apply_state_event("split")
+        vals_list = [
+            self.copy_data(
+                {
+                    "origin": self.name,
+                    "product_uom_qty": qty,
+                    "product_uom": uom.id,
+                    "state": "received",
+                    "reception_move_id": self.reception_move_id.id,
+                    "origin_split_rma_id": self.id,
+                }
+            )[0]
+            for qty in quantities
+        ]
+        extracted_rmas = self.create(vals_list)
+        # Subscribe the followers as copy does
+        for follower in self.message_follower_ids:
+            extracted_rmas.message_subscribe(
+                partner_ids=follower.partner_id.ids,
+                subtype_ids=follower.subtype_ids.ids,
+            )
+        # The origin link is the same for all the extracted RMAs
+        origin_link = self.env.ref("mail.message_origin_link")._render(
+            {"self": extracted_rmas[0], "origin": self},
+            engine="ir.qweb",
+            minimal_qcontext=True,
         )
-        extracted_rma.message_post_with_view(
-            "mail.message_origin_link",
-            values={"self": extracted_rma, "origin": self},
-            subtype_id=self.env.ref("mail.mt_note").id,
+        extracted_rmas._message_log_batch(
+            {rma.id: origin_link for rma in extracted_rmas}
         )
-        self.message_post(
-            body=_(
-                'Split: <a href="#" data-oe-model="rma" '
-                'data-oe-id="%d">%s</a> has been created.'
-            )
-            % (
-                extracted_rma.id,
-                extracted_rma.name,
-            )
+        links = ", ".join(
+            '<a href="#" data-oe-model="rma" data-oe-id="%d">%s</a>'
+            % (rma.id, rma.name)
+            for rma in extracted_rmas
         )
-        return extracted_rma
+        if len(extracted_rmas) == 1:
+            body = _("Split: %s has been created.") % links
+        else:
+            body = _("Split: %s have been created.") % links
+        self.message_post(body=body)
+        return extracted_rmas
 
     # Refund business methods
     def _prepare_refund(self, invoice_form, origin):
@@ -1070,15 +1489,26 @@ class Rma(models.Model):
         return {}
 
     # Returning business methods
-    def create_return(self, scheduled_date, qty=None, uom=None):
-        """Intended to be invoked by the delivery wizard"""
+    @instrumented
+    def create_return(self, scheduled_date, qty=None, uom=None, quantities=None):
+        """Intended to be invoked by the delivery wizard. `quantities` is
+        an optional dictionary {rma id: (qty, uom)} with the quantity to
+        return of each RMA, which takes precedence over `qty` and `uom`.
+        """
+        quantities = quantities or {}
         group_returns = self.env.company.rma_return_grouping
         if "rma_return_grouping" in self.env.context:
             group_returns = self.env.context.get("rma_return_grouping")
+        # Lock the RMAs before checking them, so the values read are the
+        # ones of a concurrent return committed in the meantime
+        self.flush()
+        self._lock_for_update()
+        self.invalidate_cache(ids=self.ids)
         self._ensure_can_be_returned()
-        self._ensure_qty_to_return(qty, uom)
-        group_dict = {}
         rmas_to_return = self.filtered("can_be_returned")
+        for rma in rmas_to_return:
+            rma._ensure_qty_to_return(*quantities.get(rma.id, (qty, uom)))
+        group_dict = {}
         for record in rmas_to_return:
             key = (
                 record.partner_shipping_id.id,
@@ -1091,6 +1521,7 @@ class Rma(models.Model):
             grouped_rmas = group_dict.values()
         else:
             grouped_rmas = rmas_to_return
+        event_payloads = {}
         for rmas in grouped_rmas:
             origin = ", ".join(rmas.mapped("name"))
             rma_out_type = rmas[0].warehouse_id.rma_out_type_id
@@ -1103,8 +1534,11 @@ class Rma(models.Model):
             rmas[0]._prepare_returning_picking(picking_form, origin)
             picking = picking_form.save()
             for rma in rmas:
+                rma_qty, rma_uom = quantities.get(rma.id, (qty, uom))
                 with picking_form.move_ids_without_package.new() as move_form:
-                    rma._prepare_returning_move(move_form, scheduled_date, qty, uom)
+                    rma._prepare_returning_move(
+                        move_form, scheduled_date, rma_qty, rma_uom
+                    )
                 # rma_id is not present in the form view, so we need to get
                 # the 'values to save' to add the rma id and use the
                 # create method intead of save the form.
@@ -1118,7 +1552,13 @@ class Rma(models.Model):
                 )
                 if "product_qty" in move_vals:
                     move_vals.pop("product_qty")
-                self.env["stock.move"].sudo().create(move_vals)
+                move = self.env["stock.move"].sudo().create(move_vals)
+                event_payloads[rma.id] = {
+                    "picking_id": picking.id,
+                    "move_id": move.id,
+                    "product_uom_qty": move.product_uom_qty,
+                    "product_uom": move.product_uom.name,
+                }
                 rma.message_post(
                     body=_(
                         'Return: <a href="#" data-oe-model="stock.picking" '
@@ -1133,7 +1573,8 @@ class Rma(models.Model):
                 values={"self": picking, "origin": rmas},
                 subtype_id=self.env.ref("mail.mt_note").id,
             )
-        rmas_to_return.write({"state": "waiting_return"})
+        rmas_to_return._apply_state_event("return")
+        self.env["rma.event"]._record(rmas_to_return, "return", event_payloads)
 
     def _prepare_returning_picking(self, picking_form, origin=None):
         picking_form.picking_type_id = self.warehouse_id.rma_out_type_id
@@ -1149,88 +1590,156 @@ class Rma(models.Model):
         move_form.date = scheduled_date
 
     # Replacing business methods
-    def create_replace(self, scheduled_date, warehouse, product, qty, uom):
-        """Intended to be invoked by the delivery wizard"""
-        self.ensure_one()
+    @instrumented
+    def create_replace(
+        self,
+        scheduled_date,
+        warehouse,
+        product=None,
+        qty=None,
+        uom=None,
+        replacements=None,
+    ):
+        """Intended to be invoked by the delivery wizard. When no product,
+        quantity and unit of measure are given, each RMA is replaced by
+        its own product and remaining quantity. `replacements` is an
+        optional dictionary {rma id: (product, qty, uom)} with the
+        replacement of each RMA. The procurements of all the RMAs are run
+        at once.
+        """
         self._ensure_can_be_replaced()
-        moves_before = self.delivery_move_ids
-        self._action_launch_stock_rule(scheduled_date, warehouse, product, qty, uom)
-        new_moves = self.delivery_move_ids - moves_before
-        body = ""
-        # The product replacement could explode into several moves like in the case of
-        # MRP BoM Kits
-        for new_move in new_moves:
-            body += (
-                _(
-                    "Replacement: "
-                    'Move <a href="#" data-oe-model="stock.move" '
-                    'data-oe-id="%d">%s</a> (Picking <a href="#" '
-                    'data-oe-model="stock.picking" data-oe-id="%d">%s</a>) '
-                    "has been created."
-                )
-                % (
-                    new_move.id,
-                    new_move.name_get()[0][1],
-                    new_move.picking_id.id,
-                    new_move.picking_id.name,
+        rmas = self.filtered(
+            lambda r: r.can_be_replaced
+            and r._get_replacement_values(product, qty, uom, replacements)[1] > 0
+        )
+        rmas._lock_for_update()
+        moves_before = {rma: rma.delivery_move_ids for rma in rmas}
+        rmas._action_launch_stock_rule(
+            scheduled_date, warehouse, product, qty, uom, replacements
+        )
+        new_moves_by_rma = {
+            rma: rma.delivery_move_ids - moves_before[rma] for rma in rmas
+        }
+        new_moves = self.env["stock.move"].concat(*new_moves_by_rma.values())
+        # Prefetch the names of the moves and the pickings at once
+        move_names = dict(new_moves.name_get())
+        new_moves.mapped("picking_id.name")
+        event_payloads = {}
+        for rma, rma_new_moves in new_moves_by_rma.items():
+            body = ""
+            # The product replacement could explode into several moves like in
+            # the case of MRP BoM Kits
+            for new_move in rma_new_moves:
+                body += (
+                    _(
+                        "Replacement: "
+                        'Move <a href="#" data-oe-model="stock.move" '
+                        'data-oe-id="%d">%s</a> (Picking <a href="#" '
+                        'data-oe-model="stock.picking" data-oe-id="%d">%s</a>) '
+                        "has been created."
+                    )
+                    % (
+                        new_move.id,
+                        move_names[new_move.id],
+                        new_move.picking_id.id,
+                        new_move.picking_id.name,
+                    )
+                    + "\n"
                 )
-                + "\n"
+            rma_product, rma_qty, rma_uom = rma._get_replacement_values(
+                product, qty, uom, replacements
             )
-        self.message_post(
-            body=body
-            or _(
-                "Replacement:<br/>"
-                'Product <a href="#" data-oe-model="product.product" '
-                'data-oe-id="%d">%s</a><br/>'
-                "Quantity %f %s<br/>"
-                "This replacement did not create a new move, but one of "
-                "the previously created moves was updated with this data."
+            event_payloads[rma.id] = {
+                "product_id": rma_product.id,
+                "product_uom_qty": rma_qty,
+                "product_uom": rma_uom.name,
+                "move_ids": rma_new_moves.ids,
+                "picking_ids": rma_new_moves.picking_id.ids,
+            }
+            rma.message_post(
+                body=body
+                or _(
+                    "Replacement:<br/>"
+                    'Product <a href="#" data-oe-model="product.product" '
+                    'data-oe-id="%d">%s</a><br/>'
+                    "Quantity %f %s<br/>"
+                    "This replacement did not create a new move, but one of "
+                    "the previously created moves was updated with this data."
+                )
+                % (rma_product.id, rma_product.display_name, rma_qty, rma_uom.name)
             )
-            % (product.id, product.display_name, qty, uom.name)
+        rmas._apply_state_event("replace")
+        self.env["rma.event"]._record(rmas, "replace", event_payloads)
+
+    def _get_replacement_values(
+        self, product=None, qty=None, uom=None, replacements=None
+    ):
+        """Product, quantity and unit of measure replacing the RMA: the
+        ones of `replacements` if the RMA is there, the given ones
+        otherwise, falling back on its own product and remaining quantity.
+        """
+        self.ensure_one()
+        if replacements and self.id in replacements:
+            return replacements[self.id]
+        return (
+            product or self.product_id,
+            qty if qty is not None else self.remaining_qty,
+            uom or self.product_uom,
         )
-        if self.state != "waiting_replacement":
-            self.state = "waiting_replacement"
+
+    def _prepare_procurement_group_values(self):
+        self.ensure_one()
+        return {
+            "name": self.name,
+            "move_type": "direct",
+            "partner_id": self.partner_shipping_id.id,
+        }
 
     def _action_launch_stock_rule(
         self,
         scheduled_date,
         warehouse,
-        product,
-        qty,
-        uom,
+        product=None,
+        qty=None,
+        uom=None,
+        replacements=None,
     ):
-        """Creates a delivery picking and launch stock rule. It is invoked by:
+        """Creates the delivery pickings and launch the stock rules of all
+        the RMAs in a single run, so the rules can merge their moves.
+        See `_get_replacement_values` for the replacement of each RMA.
+        It is invoked by:
         rma.create_replace
         """
-        self.ensure_one()
-        if self.product_id.type not in ("consu", "product"):
+        rmas = self.filtered(lambda r: r.product_id.type in ("consu", "product"))
+        if not rmas:
             return
-        if not self.procurement_group_id:
-            self.procurement_group_id = (
-                self.env["procurement.group"]
-                .create(
-                    {
-                        "name": self.name,
-                        "move_type": "direct",
-                        "partner_id": self.partner_shipping_id.id,
-                    }
+        rmas_without_group = rmas.filtered(lambda r: not r.procurement_group_id)
+        groups = self.env["procurement.group"].create(
+            [rma._prepare_procurement_group_values() for rma in rmas_without_group]
+        )
+        for rma, group in zip(rmas_without_group, groups):
+            rma.procurement_group_id = group
+        procurements = []
+        for rma in rmas:
+            values = rma._prepare_procurement_values(
+                rma.procurement_group_id, scheduled_date, warehouse
+            )
+            rma_product, rma_qty, rma_uom = rma._get_replacement_values(
+                product, qty, uom, replacements
+            )
+            procurements.append(
+                self.env["procurement.group"].Procurement(
+                    rma_product,
+                    rma_qty,
+                    rma_uom,
+                    rma.partner_shipping_id.property_stock_customer,
+                    rma.product_id.display_name,
+                    rma.procurement_group_id.name,
+                    rma.company_id,
+                    values,
                 )
-                .id
             )
-        values = self._prepare_procurement_values(
-            self.procurement_group_id, scheduled_date, warehouse
-        )
-        procurement = self.env["procurement.group"].Procurement(
-            product,
-            qty,
-            uom,
-            self.partner_shipping_id.property_stock_customer,
-            self.product_id.display_name,
-            self.procurement_group_id.name,
-            self.company_id,
-            values,
-        )
-        self.env["procurement.group"].run([procurement])
+        self.env["procurement.group"].run(procurements)
         return True
 
     def _prepare_procurement_values(
@@ -1250,6 +1759,259 @@ class Rma(models.Model):
             "priority": self.priority,
         }
 
+    # Import business methods
+    @api.model
+    def _get_bulk_import_columns(self):
+        """Columns of the files imported by the 'Import RMAs' wizard.
+        'partner' is the reference of the customer, 'product' the internal
+        reference or the barcode of the product, 'picking' the name of the
+        origin delivery and 'location' the full name of the stock location.
+        """
+        return [
+            "partner",
+            "product",
+            "quantity",
+            "uom",
+            "picking",
+            "location",
+            "origin",
+            "date",
+            "description",
+        ]
+
+    @api.model
+    def _prepare_bulk_values(self, rows, cache=None):
+        """Values to create an RMA from each row of an import file. Rows
+        are dictionaries {column: string}, see `_get_bulk_import_columns`.
+        The records referenced by the rows are resolved with one search per
+        model for all the distinct keys, and kept in `cache` so they are not
+        searched again for the next chunk of rows.
+
+        Return a list with a tuple (values, error message) for each row,
+        being values False when the row is not valid.
+        """
+        if cache is None:
+            cache = {}
+        lookups = self._get_bulk_lookups()
+        for key, (model_name, domain_function) in lookups.items():
+            key_cache = cache.setdefault(key, {})
+            missing = {row.get(key) for row in rows} - set(key_cache)
+            missing.discard(None)
+            missing.discard("")
+            if not missing:
+                continue
+            for value in missing:
+                key_cache[value] = False
+            records = self.env[model_name].search(domain_function(list(missing)))
+            for record in records:
+                for value in self._get_bulk_record_keys(key, record):
+                    if value in missing and not key_cache[value]:
+                        key_cache[value] = record.id
+        cache.setdefault("addresses", {})
+        cache.setdefault("warehouses", {})
+        self._prefetch_bulk_records(cache)
+        res = []
+        for row in rows:
+            try:
+                vals = self._prepare_bulk_row_values(row, cache)
+            except ValidationError as error:
+                res.append((False, error.args[0]))
+            else:
+                res.append((vals, False))
+        return res
+
+    @api.model
+    def _prefetch_bulk_records(self, cache):
+        """Read at once the values of the resolved records used to prepare
+        the values of each row.
+        """
+        self.env["product.product"].browse(
+            [product_id for product_id in cache["product"].values() if product_id]
+        ).mapped("uom_id.category_id")
+        self.env["uom.uom"].browse(
+            [uom_id for uom_id in cache["uom"].values() if uom_id]
+        ).mapped("category_id")
+        self.env["stock.picking"].browse(
+            [picking_id for picking_id in cache["picking"].values() if picking_id]
+        ).mapped("move_lines.product_id")
+
+    @api.model
+    def _get_bulk_lookups(self):
+        """Records referenced by the import columns, as a dictionary
+        {column: (model, function returning the search domain of a list of
+        keys)}.
+        """
+        return {
+            "partner": ("res.partner", lambda keys: [("ref", "in", keys)]),
+            "product": (
+                "product.product",
+                lambda keys: [
+                    "|",
+                    ("default_code", "in", keys),
+                    ("barcode", "in", keys),
+                ],
+            ),
+            "uom": ("uom.uom", lambda keys: [("name", "in", keys)]),
+            "picking": ("stock.picking", lambda keys: [("name", "in", keys)]),
+            "location": (
+                "stock.location",
+                lambda keys: [("complete_name", "in", keys)],
+            ),
+        }
+
+    @api.model
+    def _get_bulk_record_keys(self, column, record):
+        """Values of `column` matching `record`"""
+        if column == "partner":
+            return [record.ref]
+        if column == "product":
+            return [record.default_code, record.barcode]
+        if column in ["uom", "picking"]:
+            return [record.name]
+        if column == "location":
+            return [record.complete_name]
+        return []
+
+    @api.model
+    def _check_bulk_row(self, row, cache):
+        """Check the values of an import row. Return its quantity and
+        date, raise a ValidationError with all the errors found otherwise.
+        """
+        errors = []
+        for column in ["product", "quantity"]:
+            if not row.get(column):
+                errors.append(_("The column '%s' is required.") % column)
+        for column in self._get_bulk_lookups():
+            value = row.get(column)
+            if value and not cache[column].get(value):
+                errors.append(
+                    _("No record found for the %(column)s '%(value)s'.")
+                    % {"column": column, "value": value}
+                )
+        qty = date = False
+        try:
+            qty = float(row.get("quantity") or 0)
+        except ValueError:
+            errors.append(_("Invalid quantity '%s'.") % row.get("quantity"))
+        else:
+            if row.get("quantity") and qty <= 0:
+                errors.append(_("The quantity must be positive."))
+        try:
+            date = fields.Datetime.to_datetime(row.get("date") or False)
+        except ValueError:
+            errors.append(_("Invalid date '%s'.") % row.get("date"))
+        if errors:
+            raise ValidationError("\n".join(errors))
+        return qty, date
+
+    @api.model
+    def _prepare_bulk_row_values(self, row, cache):
+        qty, date = self._check_bulk_row(row, cache)
+        product = self.env["product.product"].browse(cache["product"][row["product"]])
+        uom = product.uom_id
+        if row.get("uom"):
+            uom = self.env["uom.uom"].browse(cache["uom"][row["uom"]])
+            if uom.category_id != product.uom_id.category_id:
+                raise ValidationError(
+                    _(
+                        "The unit of measure '%(uom)s' doesn't belong to the "
+                        "category of the product '%(product)s'."
+                    )
+                    % {"uom": uom.name, "product": product.display_name}
+                )
+        vals = self._prepare_bulk_document_values(row, product, cache)
+        partner_id = cache["partner"].get(row.get("partner")) or vals.get("partner_id")
+        if not partner_id:
+            raise ValidationError(_("The column 'partner' is required."))
+        if partner_id not in cache["addresses"]:
+            cache["addresses"][partner_id] = (
+                self.env["res.partner"]
+                .browse(partner_id)
+                .address_get(["invoice", "delivery"])
+            )
+        address = cache["addresses"][partner_id]
+        company = self.env.company
+        location_id = cache["location"].get(row.get("location")) or vals.get(
+            "location_id"
+        )
+        if not location_id:
+            if company.id not in cache["warehouses"]:
+                cache["warehouses"][company.id] = (
+                    self.env["stock.warehouse"]
+                    .search([("company_id", "=", company.id)], limit=1)
+                    .rma_loc_id.id
+                )
+            location_id = cache["warehouses"][company.id]
+        vals.update(
+            {
+                "partner_id": partner_id,
+                "partner_invoice_id": address.get("invoice", partner_id),
+                "partner_shipping_id": address.get("delivery", partner_id),
+                "product_id": product.id,
+                "product_uom_qty": qty,
+                "product_uom": uom.id,
+                "location_id": location_id,
+                "company_id": company.id,
+            }
+        )
+        if row.get("origin"):
+            vals["origin"] = row["origin"]
+        if date:
+            vals["date"] = date
+        if row.get("description"):
+            vals["description"] = html_escape(row["description"])
+        return vals
+
+    @api.model
+    def _prepare_bulk_document_values(self, row, product, cache):
+        """Values of an import row coming from the documents it refers to,
+        like the origin delivery and move of the returned product. The
+        partner and the location are only used when the row doesn't give
+        them.
+        """
+        if not row.get("picking"):
+            return {}
+        picking = self.env["stock.picking"].browse(cache["picking"][row["picking"]])
+        move = picking.move_lines.filtered(
+            lambda m: m.product_id == product and m.state == "done"
+        )[:1]
+        if not move:
+            raise ValidationError(
+                _("The product '%(product)s' wasn't delivered in %(picking)s.")
+                % {"product": product.display_name, "picking": picking.name}
+            )
+        return {
+            "picking_id": picking.id,
+            "move_id": move.id,
+            "partner_id": picking.partner_id.id,
+            "location_id": picking.picking_type_id.warehouse_id.rma_loc_id.id,
+        }
+
+    @api.model
+    def _create_batch(self, payloads, confirm=False):
+        """Create an RMA for each payload, a dictionary with the same keys
+        as the rows of the import files, and confirm them if `confirm` is
+        set. All the payloads are validated before creating any RMA; a
+        ValidationError listing the invalid ones is raised otherwise.
+
+        Return the created RMAs in the same order as `payloads`.
+        """
+        results = self._prepare_bulk_values(payloads)
+        errors = [
+            _("Item %(index)d: %(error)s") % {"index": index, "error": error}
+            for index, (__, error) in enumerate(results)
+            if error
+        ]
+        if errors:
+            raise ValidationError("\n".join(errors))
+        rmas = self.with_context(
+            mail_create_nolog=True, mail_create_nosubscribe=True
+        ).create([vals for vals, __ in results])
+        if confirm:
+            for rma in rmas:
+                rma.action_confirm()
+        return self.browse(rmas.ids)
+
     # Mail business methods
     def _creation_subtype(self):
         if self.state in ("draft"):
@@ -1266,23 +2028,34 @@ class Rma(models.Model):
                 return self.env.ref("rma.mt_rma_notification")
         return super()._track_subtype(init_values)
 
-    def message_new(self, msg_dict, custom_values=None):
-        """Extract the needed values from an incoming rma emails data-set
-        to be used to create an RMA.
+    def _prepare_message_new_values(self, msg_dict):
+        """Values extracted from an incoming rma emails data-set, without
+        the partner ones. Invoked by:
+        rma.message_new
+        rma.message_new_batch
         """
-        if custom_values is None:
-            custom_values = {}
         subject = msg_dict.get("subject", "")
         body = html2plaintext(msg_dict.get("body", ""))
         desc = _("<b>E-mail subject:</b> %s<br/><br/><b>E-mail body:</b><br/>%s") % (
             subject,
             body,
         )
-        defaults = {
+        values = {
             "description": desc,
             "name": _("New"),
             "origin": _("Incoming e-mail"),
         }
+        if msg_dict.get("priority"):
+            values["priority"] = msg_dict.get("priority")
+        return values
+
+    def message_new(self, msg_dict, custom_values=None):
+        """Extract the needed values from an incoming rma emails data-set
+        to be used to create an RMA.
+        """
+        if custom_values is None:
+            custom_values = {}
+        defaults = self._prepare_message_new_values(msg_dict)
         if msg_dict.get("author_id"):
             partner = self.env["res.partner"].browse(msg_dict.get("author_id"))
             defaults.update(
@@ -1291,14 +2064,108 @@ class Rma(models.Model):
                     "invoice", False
                 ),
             )
-        if msg_dict.get("priority"):
-            defaults["priority"] = msg_dict.get("priority")
         defaults.update(custom_values)
         rma = super().message_new(msg_dict, custom_values=defaults)
         if rma.user_id and rma.user_id.partner_id not in rma.message_partner_ids:
             rma.message_subscribe([rma.user_id.partner_id.id])
         return rma
 
+    @api.model
+    def message_new_batch(self, msg_dicts, custom_values=None):
+        """Batch version of `message_new` for bursts of incoming emails.
+        Authors are resolved with a single search by email, RMAs are
+        created with a single create call and the original emails are
+        stored in their chatter at once. As with bulk imports, followers
+        are not notified of the stored emails.
+
+        Returns the created RMAs in the same order as `msg_dicts`.
+        """
+        if custom_values is None:
+            custom_values = {}
+        emails = {
+            email_normalize(msg_dict.get("email_from") or "")
+            for msg_dict in msg_dicts
+            if not msg_dict.get("author_id")
+        }
+        emails.discard(False)
+        partner_by_email = {}
+        if emails:
+            for partner in self.env["res.partner"].search(
+                [("email_normalized", "in", list(emails))], order="id"
+            ):
+                partner_by_email.setdefault(partner.email_normalized, partner)
+        invoice_address_by_partner = {}
+        authors = []
+        vals_list = []
+        for msg_dict in msg_dicts:
+            vals = self._prepare_message_new_values(msg_dict)
+            if msg_dict.get("author_id"):
+                partner = self.env["res.partner"].browse(msg_dict["author_id"])
+            else:
+                partner = partner_by_email.get(
+                    email_normalize(msg_dict.get("email_from") or ""),
+                    self.env["res.partner"],
+                )
+            if partner:
+                if partner not in invoice_address_by_partner:
+                    invoice_address_by_partner[partner] = partner.address_get(
+                        ["invoice"]
+                    ).get("invoice", False)
+                vals.update(
+                    partner_id=partner.id,
+                    partner_invoice_id=invoice_address_by_partner[partner],
+                )
+            vals.update(custom_values)
+            authors.append(partner)
+            vals_list.append(vals)
+        rmas = self.with_context(
+            mail_create_nolog=True, mail_create_nosubscribe=True
+        ).create(vals_list)
+        subtype = self.env.ref("rma.mt_rma_draft")
+        message_vals_list = []
+        for rma, msg_dict, author in zip(rmas, msg_dicts, authors):
+            message_vals_list.append(
+                {
+                    "model": self._name,
+                    "res_id": rma.id,
+                    "record_name": rma.name,
+                    "message_type": "email",
+                    "subtype_id": subtype.id,
+                    "subject": msg_dict.get("subject"),
+                    "body": msg_dict.get("body", ""),
+                    "date": msg_dict.get("date") or fields.Datetime.now(),
+                    "email_from": msg_dict.get("email_from"),
+                    "author_id": author.id,
+                    "message_id": msg_dict.get("message_id"),
+                    "attachment_ids": [
+                        (
+                            0,
+                            0,
+                            {
+                                "name": attachment[0],
+                                "datas": base64.b64encode(
+                                    attachment[1].encode()
+                                    if isinstance(attachment[1], str)
+                                    else attachment[1]
+                                ),
+                                "res_model": self._name,
+                                "res_id": rma.id,
+                            },
+                        )
+                        for attachment in msg_dict.get("attachments", [])
+                    ],
+                }
+            )
+        self.env["mail.message"].sudo().create(message_vals_list)
+        # Subscribe the responsible users as message_new does
+        rmas_by_user = {}
+        for rma in rmas.filtered("user_id"):
+            rmas_by_user.setdefault(rma.user_id, self.env["rma"])
+            rmas_by_user[rma.user_id] |= rma
+        for user, user_rmas in rmas_by_user.items():
+            user_rmas.message_subscribe([user.partner_id.id])
+        return rmas
+
     @api.returns("mail.message", lambda value: value.id)
     def message_post(self, **kwargs):
         """Set 'sent' field to True when an email is sent from rma form
@@ -1328,6 +2195,117 @@ class Rma(models.Model):
         self.ensure_one()
         return "RMA Report - %s" % self.name
 
+    # State transition methods
+    def _lock_for_update(self):
+        """Lock the rows of the RMAs until the end of the transaction.
+
+        The rows are locked in the order of their ids, so transactions
+        locking overlapping sets of RMAs wait for each other instead of
+        deadlocking. They are meant to be locked before touching pickings,
+        moves or quants, so a concurrent update is detected before doing
+        the expensive work, which keeps the retries cheap.
+        """
+        ids = [rma_id for rma_id in self.ids if isinstance(rma_id, int)]
+        if ids:
+            self.env.cr.execute(
+                "SELECT id FROM rma WHERE id IN %s ORDER BY id FOR UPDATE",
+                (tuple(ids),),
+            )
+        return self
+
+    def _write_state(self, state, vals=None):
+        """Move the RMAs to `state` with a single grouped write, along with
+        the values `vals`, locking them first. Return the RMAs whose state
+        has changed.
+        """
+        to_write = self.filtered(lambda r: r.state != state)
+        if to_write:
+            to_write._lock_for_update().write(dict(vals or {}, state=state))
+        return to_write
+
+    @api.model
+    def _get_state_transitions(self):
+        """Transition table of the RMA workflow, as a list of tuples
+        (from states, event, guard, to state):
+
+        - from states: states the transition starts from, None for any.
+        - event: name of the event triggering the transition.
+        - guard: None, the name of a stored boolean field or a function
+          taking an RMA. The transition only applies to the RMAs passing
+          the guard. Guards must rely on stored or prefetched values.
+        - to state: state the RMAs are moved to.
+
+        For a given event, each RMA takes the first matching transition.
+        """
+        return [
+            (["draft"], "confirm", None, "confirmed"),
+            (None, "cancel", None, "cancelled"),
+            (["cancelled"], "draft", None, "draft"),
+            (None, "lock", "can_be_locked", "locked"),
+            (["locked"], "unlock", None, "received"),
+            (None, "finish", "can_be_finished", "finished"),
+            (None, "refund", None, "refunded"),
+            (None, "refund_unlink", None, "received"),
+            (None, "return", None, "waiting_return"),
+            (None, "replace", None, "waiting_replacement"),
+            # Stock moves events
+            (["confirmed"], "reception_done", None, "received"),
+            (None, "reception_cancel", lambda r: r.state != "cancelled", "draft"),
+            (None, "delivery_cancel", lambda r: r.delivered_qty == 0, "received"),
+            (
+                ["waiting_replacement"],
+                "replacement_update",
+                lambda r: 0 >= r.remaining_qty_to_done == r.remaining_qty,
+                "replaced",
+            ),
+            (
+                ["waiting_return"],
+                "return_update",
+                lambda r: r.remaining_qty_to_done <= 0,
+                "returned",
+            ),
+            # The extraction of the remaining quantity to another RMA
+            (
+                ["waiting_return"],
+                "split",
+                lambda r: r.remaining_qty_to_done <= 0,
+                "returned",
+            ),
+            (
+                ["waiting_replacement"],
+                "split",
+                lambda r: r.remaining_qty_to_done <= 0,
+                "replaced",
+            ),
+        ]
+
+    def _apply_state_event(self, event, vals=None):
+        """Apply the transitions of `event` to the RMAs, writing `vals`
+        along with the new state. The RMAs are moved with one write per
+        target state, and the RMAs with no matching transition or already
+        in the target state are left untouched. Return the RMAs whose
+        state has changed.
+        """
+        transitions = [t for t in self._get_state_transitions() if t[1] == event]
+        if not transitions:
+            raise ValueError("Unknown RMA state event '%s'" % event)
+        ids_by_state = {}
+        for rma in self:
+            for from_states, _event, guard, to_state in transitions:
+                if from_states is not None and rma.state not in from_states:
+                    continue
+                if isinstance(guard, str):
+                    if not rma[guard]:
+                        continue
+                elif guard is not None and not guard(rma):
+                    continue
+                ids_by_state.setdefault(to_state, []).append(rma.id)
+                break
+        changed = self.browse()
+        for to_state, ids in ids_by_state.items():
+            changed |= self.browse(ids)._write_state(to_state, vals)
+        return changed
+
     # Other business methods
 
     def update_received_state_on_reception(self):
@@ -1336,7 +2314,7 @@ class Rma(models.Model):
         Here we can attach methods to trigger when the customer products
         are received on the RMA location, such as automatic notifications
         """
-        self.write({"state": "received"})
+        self._apply_state_event("reception_done")
         self._send_receipt_confirmation_email()
 
     def update_received_state(self):
@@ -1344,9 +2322,7 @@ class Rma(models.Model):
         [stock.move].unlink
         [stock.move]._action_cancel
         """
-        rma = self.filtered(lambda r: r.delivered_qty == 0)
-        if rma:
-            rma.write({"state": "received"})
+        self._apply_state_event("delivery_cancel")
 
     def update_replaced_state(self):
         """Invoked by:
@@ -1354,19 +2330,8 @@ class Rma(models.Model):
         [stock.move].unlink
         [stock.move]._action_cancel
         """
-        rma = self.filtered(
-            lambda r: (
-                r.state == "waiting_replacement"
-                and 0 >= r.remaining_qty_to_done == r.remaining_qty
-            )
-        )
-        if rma:
-            rma.write({"state": "replaced"})
+        self._apply_state_event("replacement_update")
 
     def update_returned_state(self):
         """Invoked by [stock.move]._action_done"""
-        rma = self.filtered(
-            lambda r: (r.state == "waiting_return" and r.remaining_qty_to_done <= 0)
-        )
-        if rma:
-            rma.write({"state": "returned"})
+        self._apply_state_event("return_update")
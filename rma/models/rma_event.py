@@ -0,0 +1,219 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import json
+from datetime import timedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+RETENTION_PARAM = "rma.event_retention_days"
+# Number of events returned by a page by default, and at most
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class BigInteger(fields.Integer):
+    """Integer field stored in a 64 bits column"""
+
+    column_type = ("int8", "int8")
+
+
+class RmaEvent(models.Model):
+    """Append-only log of the RMA events, written in the same transaction
+    as the change it records, so external systems can follow the RMAs
+    incrementally through the '/rma/api/events' route.
+
+    Event ids increase with the insertion order, but concurrent
+    transactions can commit them out of order. The events are thus
+    exposed ordered by the id of the transaction that wrote them, and
+    only once all the older transactions are finished, so a consumer
+    never skips an event committed late.
+    """
+
+    _name = "rma.event"
+    _description = "RMA Event"
+    _order = "id"
+    _log_access = False
+
+    date = fields.Datetime(
+        default=lambda self: fields.Datetime.now(),
+        required=True,
+        readonly=True,
+    )
+    # The RMA id is kept even if the RMA is deleted
+    res_id = fields.Integer(string="RMA id", required=True, readonly=True)
+    rma_id = fields.Many2one(
+        comodel_name="rma",
+        string="RMA",
+        ondelete="set null",
+        readonly=True,
+        index=True,
+    )
+    rma_name = fields.Char(string="RMA reference", readonly=True)
+    company_id = fields.Many2one(comodel_name="res.company", readonly=True)
+    user_id = fields.Many2one(comodel_name="res.users", readonly=True)
+    event_type = fields.Selection(
+        selection=[
+            ("create", "Creation"),
+            ("state", "State change"),
+            ("refund", "Refund"),
+            ("return", "Return"),
+            ("replace", "Replacement"),
+        ],
+        required=True,
+        readonly=True,
+    )
+    old_state = fields.Selection(selection="_selection_state", readonly=True)
+    new_state = fields.Selection(selection="_selection_state", readonly=True)
+    payload = fields.Text(readonly=True, help="JSON encoded event details.")
+    # Filled in by the database, see init
+    transaction_id = BigInteger(
+        readonly=True,
+        group_operator=False,
+        help="Id of the database transaction that wrote the event.",
+    )
+
+    @api.model
+    def _selection_state(self):
+        return self.env["rma"]._fields["state"].selection
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            ALTER TABLE rma_event
+                ALTER COLUMN transaction_id SET DEFAULT txid_current()
+            """
+        )
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS rma_event_transaction_id_id_index
+            ON rma_event (transaction_id, id)
+            """
+        )
+
+    @api.model
+    def _record(self, rmas, event_type, payloads=None, old_states=None):
+        """Append an event of type `event_type` for each RMA. `payloads`
+        and `old_states` are optional dictionaries by RMA id.
+        """
+        payloads = payloads or {}
+        old_states = old_states or {}
+        vals_list = [
+            {
+                "res_id": rma.id,
+                "rma_id": rma.id,
+                "rma_name": rma.name,
+                "company_id": rma.company_id.id,
+                "user_id": self.env.uid,
+                "event_type": event_type,
+                "old_state": old_states.get(rma.id),
+                "new_state": rma.state,
+                "payload": json.dumps(payloads[rma.id])
+                if rma.id in payloads
+                else False,
+            }
+            for rma in rmas
+        ]
+        if vals_list:
+            self.sudo().create(vals_list)
+
+    @api.model
+    def _fetch(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Return a page of the events after `cursor` as a dictionary with
+        the events, the cursor of the next page and whether there are more
+        events to fetch. The cursor is an opaque string returned by the
+        previous page, None to start from the beginning.
+        """
+        transaction_id, event_id = self._parse_cursor(cursor)
+        limit = self._parse_limit(limit)
+        self.check_access_rights("read")
+        self.flush()
+        where_clause, where_params = self._get_fetch_rule_clause()
+        self.env.cr.execute(
+            """
+            SELECT id FROM rma_event
+            WHERE (transaction_id, id) > (%s, %s)
+                AND transaction_id < txid_snapshot_xmin(txid_current_snapshot())
+                {where}
+            ORDER BY transaction_id, id
+            LIMIT %s
+            """.format(
+                where=where_clause
+            ),
+            [transaction_id, event_id] + where_params + [limit + 1],
+        )
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        events = self.browse(ids[:limit])
+        next_cursor = cursor
+        if events:
+            last = events[-1]
+            next_cursor = "%s-%s" % (last.transaction_id, last.id)
+        return {
+            "events": [event._to_dict() for event in events],
+            "cursor": next_cursor,
+            "has_more": len(ids) > limit,
+        }
+
+    @api.model
+    def _parse_cursor(self, cursor):
+        if not cursor:
+            return 0, 0
+        try:
+            transaction_id, event_id = (int(part) for part in cursor.split("-"))
+        except (AttributeError, ValueError):
+            raise UserError(_("Invalid RMA event cursor '%s'.") % cursor)
+        return transaction_id, event_id
+
+    @api.model
+    def _parse_limit(self, limit):
+        """Page size between 1 and MAX_PAGE_SIZE, the default one if the
+        limit is not given.
+        """
+        if limit is None:
+            return DEFAULT_PAGE_SIZE
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise UserError(_("Invalid RMA event limit '%s'.") % limit)
+        return max(1, min(limit, MAX_PAGE_SIZE))
+
+    @api.model
+    def _get_fetch_rule_clause(self):
+        """SQL condition of the record rules on the events"""
+        query = self._where_calc([])
+        self._apply_ir_rules(query, "read")
+        from_clause, where_clause, where_params = query.get_sql()
+        if not where_clause:
+            return "", []
+        return (
+            "AND id IN (SELECT rma_event.id FROM {} WHERE {})".format(
+                from_clause, where_clause
+            ),
+            where_params,
+        )
+
+    def _to_dict(self):
+        self.ensure_one()
+        return {
+            "id": self.id,
+            "date": fields.Datetime.to_string(self.date),
+            "rma_id": self.res_id,
+            "rma_name": self.rma_name,
+            "company_id": self.company_id.id,
+            "user_id": self.user_id.id,
+            "type": self.event_type,
+            "old_state": self.old_state or None,
+            "new_state": self.new_state or None,
+            "payload": json.loads(self.payload) if self.payload else None,
+        }
+
+    @api.autovacuum
+    def _gc_events(self):
+        """Remove the events older than the retention set in the
+        'rma.event_retention_days' system parameter, if any.
+        """
+        days = int(self.env["ir.config_parameter"].sudo().get_param(RETENTION_PARAM, 0))
+        if days > 0:
+            limit_date = fields.Datetime.now() - timedelta(days=days)
+            self.sudo().search([("date", "<", limit_date)]).unlink()
@@ -0,0 +1,100 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+# Keys older than this are removed, their requests can't be replayed anymore
+KEY_LIFETIME = timedelta(days=7)
+
+
+class RmaIdempotencyKey(models.Model):
+    """Keys sent along with the requests creating RMAs, so a replayed
+    request (double click, browser resubmission, retry of a proxy or of an
+    external system) returns the RMAs created by the first one instead of
+    creating them again.
+
+    A key is reserved by inserting it in the same transaction that creates
+    the RMAs. Thanks to the unique constraint, a concurrent request with
+    the same key waits for that transaction to finish, and it fails if
+    the first one succeeded.
+    """
+
+    _name = "rma.idempotency.key"
+    _description = "RMA Idempotency Key"
+    _order = "id desc"
+    _log_access = False
+
+    key = fields.Char(required=True, readonly=True)
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+    )
+    date = fields.Datetime(
+        default=lambda self: fields.Datetime.now(),
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    rma_ids = fields.Many2many(
+        comodel_name="rma",
+        relation="rma_idempotency_key_rma_rel",
+        column1="key_id",
+        column2="rma_id",
+        string="RMAs",
+        readonly=True,
+    )
+
+    _sql_constraints = [
+        (
+            "key_uniq",
+            "unique(user_id, key)",
+            "This request has already been processed.",
+        ),
+    ]
+
+    @api.model
+    def _reserve(self, key):
+        """Reserve `key` for the current user. Return None if the key is
+        new, so the RMAs must be created and recorded with `_record`, and
+        the RMAs created with the key otherwise. Empty keys are never
+        reserved.
+        """
+        if not key:
+            return None
+        self.env.cr.execute(
+            """
+            INSERT INTO rma_idempotency_key (key, user_id, date)
+            VALUES (%s, %s, now() at time zone 'UTC')
+            ON CONFLICT (user_id, key) DO NOTHING
+            RETURNING id
+            """,
+            (key, self.env.uid),
+        )
+        if self.env.cr.fetchone():
+            return None
+        existing = (
+            self.sudo()
+            .with_context(active_test=False)
+            .search([("user_id", "=", self.env.uid), ("key", "=", key)], limit=1)
+        )
+        # In the order they were created
+        return self.env["rma"].browse(sorted(existing.rma_ids.ids))
+
+    @api.model
+    def _record(self, key, rmas):
+        """Link the RMAs created by a request to its reserved key"""
+        if not key:
+            return
+        self.sudo().search(
+            [("user_id", "=", self.env.uid), ("key", "=", key)], limit=1
+        ).write({"rma_ids": [(6, 0, rmas.ids)]})
+
+    @api.autovacuum
+    def _gc_keys(self):
+        self.sudo().search(
+            [("date", "<", fields.Datetime.now() - KEY_LIFETIME)]
+        ).unlink()
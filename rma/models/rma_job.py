@@ -0,0 +1,335 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import json
+import logging
+import threading
+from datetime import timedelta
+
+from psycopg2 import OperationalError, errorcodes
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Errors raised when two transactions update the same rows concurrently.
+# The job is run again later instead of failing.
+RETRYABLE_ERRORS = (
+    errorcodes.SERIALIZATION_FAILURE,
+    errorcodes.DEADLOCK_DETECTED,
+    errorcodes.LOCK_NOT_AVAILABLE,
+)
+# Key of the advisory locks that serialize the jobs of a warehouse
+WAREHOUSE_LOCK_KEY = 4357
+# Started jobs not finished in this time are considered lost
+STALE_DELAY = timedelta(hours=1)
+
+
+class RmaJob(models.Model):
+    """Heavy RMA operations run in background by the 'RMA: Run jobs'
+    scheduled action, so they don't hit the time limit of the HTTP
+    workers.
+
+    Jobs of the same warehouse are never run at the same time, as they
+    would compete for the locks of the same quants and pickings. Jobs
+    failing because of a concurrent update are retried later.
+    """
+
+    _name = "rma.job"
+    _description = "RMA Job"
+    _order = "id desc"
+
+    name = fields.Char(compute="_compute_name")
+    method = fields.Selection(
+        selection=[
+            ("action_confirm", "Confirm"),
+            ("action_refund", "Refund"),
+            ("create_return", "Return to customer"),
+        ],
+        required=True,
+        readonly=True,
+    )
+    rma_ids = fields.Many2many(
+        comodel_name="rma",
+        relation="rma_job_rma_rel",
+        column1="job_id",
+        column2="rma_id",
+        string="RMAs",
+        readonly=True,
+    )
+    rma_count = fields.Integer(string="RMAs count", compute="_compute_rma_count")
+    warehouse_id = fields.Many2one(
+        comodel_name="stock.warehouse",
+        readonly=True,
+        index=True,
+    )
+    arguments = fields.Text(
+        readonly=True,
+        help="JSON encoded keyword arguments of the method.",
+    )
+    job_context = fields.Text(
+        readonly=True,
+        help="JSON encoded context keys the method is run with.",
+    )
+    state = fields.Selection(
+        selection=[
+            ("pending", "Pending"),
+            ("started", "Started"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+            ("cancelled", "Cancelled"),
+        ],
+        default="pending",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        default=lambda self: self.env.user,
+        required=True,
+        readonly=True,
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        default=lambda self: self.env.company,
+        required=True,
+        readonly=True,
+    )
+    attempts = fields.Integer(readonly=True)
+    max_attempts = fields.Integer(default=5, required=True, readonly=True)
+    date_planned = fields.Datetime(
+        string="Planned on",
+        default=fields.Datetime.now,
+        readonly=True,
+        index=True,
+    )
+    date_started = fields.Datetime(string="Started on", readonly=True)
+    date_done = fields.Datetime(string="Done on", readonly=True)
+    error = fields.Text(readonly=True)
+
+    @api.depends("method", "rma_count")
+    def _compute_name(self):
+        methods = dict(self._fields["method"]._description_selection(self.env))
+        for job in self:
+            job.name = _("%(method)s of %(count)d RMA(s)") % {
+                "method": methods.get(job.method, ""),
+                "count": job.rma_count,
+            }
+
+    @api.depends("rma_ids")
+    def _compute_rma_count(self):
+        for job in self:
+            job.rma_count = len(job.rma_ids)
+
+    @api.model
+    def _get_context_keys(self):
+        """Keys of the context that are kept to run the job"""
+        return ["lang", "tz", "rma_return_grouping"]
+
+    @api.model
+    def _enqueue(self, rmas, method, **kwargs):
+        """Create the jobs that run `method` on `rmas` with the keyword
+        arguments `kwargs`, one job per warehouse and company, and wake up
+        the worker.
+        Arguments must be JSON serializable.
+        """
+        if method not in dict(self._fields["method"].selection):
+            raise UserError(
+                _("The RMA method '%s' can't be run in background.") % method
+            )
+        context = {
+            key: self.env.context[key]
+            for key in self._get_context_keys()
+            if key in self.env.context
+        }
+        rmas_by_warehouse = {}
+        for rma in rmas:
+            key = (rma.warehouse_id, rma.company_id)
+            rmas_by_warehouse.setdefault(key, rmas.browse())
+            rmas_by_warehouse[key] |= rma
+        vals_list = []
+        for (warehouse, company), warehouse_rmas in rmas_by_warehouse.items():
+            vals_list.append(
+                {
+                    "method": method,
+                    "rma_ids": [(6, 0, warehouse_rmas.ids)],
+                    "warehouse_id": warehouse.id,
+                    "company_id": company.id,
+                    "arguments": json.dumps(kwargs),
+                    "job_context": json.dumps(context),
+                }
+            )
+        jobs = self.create(vals_list)
+        self.env.ref("rma.ir_cron_rma_job")._trigger()
+        return jobs
+
+    # Action methods
+    def action_requeue(self):
+        """Invoked when 'Requeue' button is clicked"""
+        self.filtered(lambda j: j.state in ["failed", "cancelled"]).write(
+            {
+                "state": "pending",
+                "attempts": 0,
+                "error": False,
+                "date_planned": fields.Datetime.now(),
+            }
+        )
+        self.env.ref("rma.ir_cron_rma_job")._trigger()
+
+    def action_cancel(self):
+        """Invoked when 'Cancel' button is clicked"""
+        self.filtered(lambda j: j.state == "pending").write({"state": "cancelled"})
+
+    def action_view_rmas(self):
+        self.ensure_one()
+        action = self.env["ir.actions.actions"]._for_xml_id("rma.rma_action")
+        action["domain"] = [("id", "in", self.rma_ids.ids)]
+        return action
+
+    # Worker
+    @api.model
+    def _cron_run_jobs(self, limit=100):
+        """Run the pending jobs whose planned date is reached. The jobs of
+        a warehouse being processed by another worker are left for later.
+        """
+        self._requeue_stale_jobs()
+        job_ids = self.search(
+            [
+                ("state", "=", "pending"),
+                ("date_planned", "<=", fields.Datetime.now()),
+            ],
+            order="date_planned, id",
+            limit=limit,
+        ).ids
+        for job in self.browse(job_ids):
+            job._run()
+
+    @api.model
+    def _requeue_stale_jobs(self):
+        """Put back in the queue the jobs of the workers that died"""
+        self.search(
+            [
+                ("state", "=", "started"),
+                ("date_started", "<", fields.Datetime.now() - STALE_DELAY),
+            ]
+        ).write({"state": "pending"})
+
+    def _acquire(self):
+        """Lock the job and its warehouse. The warehouse lock is a session
+        advisory lock, so it is kept across the commits of the job until
+        `_release` is called.
+        """
+        self.ensure_one()
+        self.env.cr.execute(
+            """
+            SELECT id FROM rma_job
+            WHERE id = %s AND state = 'pending'
+            FOR UPDATE SKIP LOCKED
+            """,
+            (self.id,),
+        )
+        if not self.env.cr.fetchone():
+            return False
+        self.env.cr.execute(
+            "SELECT pg_try_advisory_lock(%s, %s)",
+            (WAREHOUSE_LOCK_KEY, self.warehouse_id.id or 0),
+        )
+        return self.env.cr.fetchone()[0]
+
+    def _release(self):
+        self.env.cr.execute(
+            "SELECT pg_advisory_unlock(%s, %s)",
+            (WAREHOUSE_LOCK_KEY, self.warehouse_id.id or 0),
+        )
+
+    def _run(self):
+        """Run the job in a savepoint, recording its outcome. Return True
+        when the job is done.
+        """
+        self.ensure_one()
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        self.invalidate_cache(ids=self.ids)
+        if not self._acquire():
+            return False
+        try:
+            self.write(
+                {
+                    "state": "started",
+                    "date_started": fields.Datetime.now(),
+                    "attempts": self.attempts + 1,
+                }
+            )
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            try:
+                with self.env.cr.savepoint():
+                    self._execute()
+            except Exception as error:
+                # Drop the values of the rolled back job from the cache
+                self.env.clear()
+                self._handle_failure(error)
+            else:
+                self.write(
+                    {
+                        "state": "done",
+                        "date_done": fields.Datetime.now(),
+                        "error": False,
+                    }
+                )
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+        finally:
+            self._release()
+        return self.state == "done"
+
+    def _handle_failure(self, error):
+        retryable = (
+            isinstance(error, OperationalError) and error.pgcode in RETRYABLE_ERRORS
+        )
+        if retryable and self.attempts < self.max_attempts:
+            _logger.info("RMA job %s conflicted, it will be retried", self.id)
+            # Exponential backoff: 1, 2, 4, 8... minutes
+            delay = timedelta(minutes=2 ** (self.attempts - 1))
+            self.write(
+                {
+                    "state": "pending",
+                    "date_planned": fields.Datetime.now() + delay,
+                    "error": str(error),
+                }
+            )
+        else:
+            _logger.exception("RMA job %s failed", self.id)
+            self.write({"state": "failed", "error": str(error)})
+
+    def _execute(self):
+        """Run the method of the job as the user that enqueued it, in the
+        company of the job only.
+        """
+        self.ensure_one()
+        rmas = (
+            self.rma_ids.with_user(self.user_id)
+            .with_context(**json.loads(self.job_context or "{}"))
+            .with_company(self.company_id)
+            .with_context(allowed_company_ids=self.company_id.ids)
+        )
+        kwargs = json.loads(self.arguments or "{}")
+        if self.method == "action_confirm":
+            for rma in rmas.filtered(lambda r: r.state == "draft"):
+                rma.action_confirm()
+        elif self.method == "action_refund":
+            rmas.action_refund()
+        elif self.method == "create_return":
+            uom_model = rmas.env["uom.uom"]
+            # JSON turns the RMA ids keys into strings
+            quantities = {
+                int(rma_id): (qty, uom_model.browse(uom_id))
+                for rma_id, (qty, uom_id) in kwargs.get("quantities", {}).items()
+            }
+            rmas.create_return(
+                fields.Datetime.to_datetime(kwargs["scheduled_date"]),
+                kwargs.get("qty"),
+                kwargs.get("uom_id") and uom_model.browse(kwargs["uom_id"]),
+                quantities=quantities,
+            )
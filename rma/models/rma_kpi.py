@@ -0,0 +1,238 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+# Columns of the aggregate table that are summed up
+KPI_MEASURES = [
+    "rma_count",
+    "open_count",
+    "received_count",
+    "refunded_count",
+    "closed_count",
+    "product_uom_qty",
+    "cycle_time",
+]
+# Columns that identify a row of the aggregate table
+KPI_DIMENSIONS = [
+    "date",
+    "company_id",
+    "team_id",
+    "warehouse_id",
+    "categ_id",
+    "state",
+]
+
+
+class RmaKpi(models.Model):
+    """RMA figures aggregated by company, team, warehouse, product
+    category, day and state.
+
+    The RMA create, write and unlink methods append rows with the
+    difference of the figures of the RMAs they change, so concurrent
+    transactions never update the same rows. The rows are summed up when
+    they are read, and the 'RMA: Collapse KPIs' scheduled action merges
+    them into one row per dimensions every hour. The table is rebuilt
+    every night from the RMAs by the 'RMA: Reconcile KPIs' scheduled
+    action. This way, the reporting views don't depend on the number of
+    RMAs.
+    """
+
+    _name = "rma.kpi"
+    _description = "RMA KPI"
+    _order = "date desc, id desc"
+    _log_access = False
+
+    date = fields.Date(readonly=True, index=True)
+    company_id = fields.Many2one(comodel_name="res.company", readonly=True)
+    team_id = fields.Many2one(comodel_name="rma.team", readonly=True)
+    warehouse_id = fields.Many2one(comodel_name="stock.warehouse", readonly=True)
+    categ_id = fields.Many2one(
+        comodel_name="product.category",
+        string="Product Category",
+        readonly=True,
+    )
+    state = fields.Selection(selection="_selection_state", readonly=True)
+    rma_count = fields.Integer(string="# RMAs", readonly=True)
+    open_count = fields.Integer(
+        string="# Open",
+        readonly=True,
+        help="RMAs that are neither closed nor cancelled.",
+    )
+    received_count = fields.Integer(
+        string="# Received",
+        readonly=True,
+        help="RMAs whose products have been received.",
+    )
+    refunded_count = fields.Integer(string="# Refunded", readonly=True)
+    closed_count = fields.Integer(string="# Closed", readonly=True)
+    product_uom_qty = fields.Float(
+        string="Quantity",
+        digits="Product Unit of Measure",
+        readonly=True,
+        help="Quantity in the unit of measure of the products.",
+    )
+    cycle_time = fields.Float(
+        string="Total cycle time (days)",
+        readonly=True,
+        help="Sum of the days between the date and the closing date of the "
+        "closed RMAs.",
+    )
+    # Not stored, it is computed from the sums of the rows, see read_group
+    avg_cycle_time = fields.Float(
+        string="Average cycle time (days)",
+        compute="_compute_avg_cycle_time",
+        help="Average of the days between the date and the closing date of "
+        "the closed RMAs.",
+    )
+
+    @api.model
+    def _selection_state(self):
+        return self.env["rma"]._fields["state"].selection
+
+    @api.depends("cycle_time", "closed_count")
+    def _compute_avg_cycle_time(self):
+        for kpi in self:
+            kpi.avg_cycle_time = (
+                kpi.cycle_time / kpi.closed_count if kpi.closed_count else 0.0
+            )
+
+    @api.model
+    def read_group(
+        self, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True
+    ):
+        """Compute the average cycle time of the groups from the sums of
+        the cycle time and of the closed RMAs, so it is weighted by the
+        closed RMAs and the RMAs that aren't closed are left out.
+        """
+        names = {spec.split(":")[0] for spec in fields}
+        with_average = "avg_cycle_time" in names
+        if with_average:
+            fields = list(fields) + [
+                name for name in ("cycle_time", "closed_count") if name not in names
+            ]
+        res = super().read_group(
+            domain,
+            fields,
+            groupby,
+            offset=offset,
+            limit=limit,
+            orderby=orderby,
+            lazy=lazy,
+        )
+        if with_average:
+            for group in res:
+                closed_count = group.get("closed_count")
+                group["avg_cycle_time"] = (
+                    group.get("cycle_time", 0.0) / closed_count
+                    if closed_count
+                    else False
+                )
+        return res
+
+    @api.model
+    def _apply_delta(self, before, after):
+        """Append to the table the difference between two sets of figures
+        returned by `rma._get_kpi_contributions`. Rows are only inserted,
+        so concurrent transactions don't wait for each other.
+        """
+        rows = []
+        for dimensions in set(before) | set(after):
+            old = before.get(dimensions)
+            new = after.get(dimensions)
+            delta = [
+                (new[measure] if new else 0) - (old[measure] if old else 0)
+                for measure in KPI_MEASURES
+            ]
+            if any(delta):
+                rows.append(tuple([value or None for value in dimensions] + delta))
+        if not rows:
+            return
+        self.flush()
+        self.env.cr.execute(
+            "INSERT INTO rma_kpi ({columns}) VALUES {values}".format(
+                columns=", ".join(KPI_DIMENSIONS + KPI_MEASURES),
+                values=", ".join(["%s"] * len(rows)),
+            ),
+            rows,
+        )
+        self.invalidate_cache()
+
+    @api.model
+    def _cron_collapse(self):
+        self._collapse()
+
+    @api.model
+    def _collapse(self):
+        """Merge the rows of the same dimensions into a single one. The
+        rows inserted by the transactions running meanwhile aren't
+        visible, so they are kept as they are.
+        """
+        self.flush()
+        self.env.cr.execute(
+            """
+            WITH deltas AS (
+                DELETE FROM rma_kpi RETURNING {dimensions}, {measures}
+            )
+            INSERT INTO rma_kpi ({dimensions}, {measures})
+            SELECT {dimensions}, {sums}
+            FROM deltas
+            GROUP BY {dimensions}
+            HAVING SUM(rma_count) <> 0
+            """.format(
+                dimensions=", ".join(KPI_DIMENSIONS),
+                measures=", ".join(KPI_MEASURES),
+                sums=", ".join("SUM(%s)" % measure for measure in KPI_MEASURES),
+            )
+        )
+        self.invalidate_cache()
+
+    @api.model
+    def _cron_reconcile(self):
+        self._reconcile()
+
+    @api.model
+    def _reconcile(self):
+        """Rebuild the whole table from the RMAs. It fixes the drift
+        caused by the changes that are not tracked incrementally, like
+        the change of the category of a product.
+        """
+        rma_model = self.env["rma"]
+        self.env["base"].flush()
+        self.env.cr.execute("DELETE FROM rma_kpi")
+        self.env.cr.execute(
+            """
+            INSERT INTO rma_kpi ({dimensions}, {measures})
+            SELECT
+                r.date::date, r.company_id, r.team_id, r.warehouse_id,
+                pt.categ_id, r.state,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE r.state IN %(open)s),
+                COUNT(*) FILTER (WHERE r.state NOT IN %(not_received)s),
+                COUNT(*) FILTER (WHERE r.state = 'refunded'),
+                COUNT(r.date_closed),
+                SUM(
+                    CASE WHEN rma_uom.category_id = product_uom.category_id
+                        THEN r.product_uom_qty / rma_uom.factor
+                            * product_uom.factor
+                        ELSE r.product_uom_qty END
+                ),
+                COALESCE(SUM(EXTRACT(EPOCH FROM r.date_closed - r.date))
+                    / 86400.0, 0)
+            FROM rma r
+            LEFT JOIN product_product pp ON pp.id = r.product_id
+            LEFT JOIN product_template pt ON pt.id = pp.product_tmpl_id
+            LEFT JOIN uom_uom rma_uom ON rma_uom.id = r.product_uom
+            LEFT JOIN uom_uom product_uom ON product_uom.id = pt.uom_id
+            GROUP BY r.date::date, r.company_id, r.team_id, r.warehouse_id,
+                pt.categ_id, r.state
+            """.format(
+                dimensions=", ".join(KPI_DIMENSIONS),
+                measures=", ".join(KPI_MEASURES),
+            ),
+            {
+                "open": tuple(rma_model._get_open_states()),
+                "not_received": tuple(rma_model._get_not_received_states()),
+            },
+        )
+        self.invalidate_cache()
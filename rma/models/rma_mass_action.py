@@ -0,0 +1,341 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import logging
+import random
+import threading
+import time
+from datetime import timedelta
+
+from psycopg2 import OperationalError
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError, ValidationError
+
+from .rma_job import RETRYABLE_ERRORS
+
+_logger = logging.getLogger(__name__)
+
+CHUNK_SIZE_PARAM = "rma.mass_action_chunk_size"
+DEFAULT_CHUNK_SIZE = 500
+# Running mass actions not updated in this time are considered interrupted
+STALE_DELAY = timedelta(minutes=15)
+# Attempts of a chunk failing because of a concurrent update
+MAX_CHUNK_ATTEMPTS = 5
+# Base of the exponential backoff between those attempts, in seconds
+RETRY_BASE_DELAY = 0.1
+
+
+class RmaMassAction(models.Model):
+    """Run an RMA action on a big selection of RMAs in chunks.
+
+    Each chunk is processed in a savepoint and committed, so a failure
+    only rolls back the current chunk, and the locks are released after
+    each chunk. The id of the last processed RMA is recorded, so an
+    interrupted or failed run resumes from the first unprocessed RMA.
+    """
+
+    _name = "rma.mass.action"
+    _description = "RMA Mass Action"
+    _order = "id desc"
+
+    name = fields.Char(compute="_compute_name")
+    action = fields.Selection(
+        selection=[
+            ("confirm", "Confirm"),
+            ("refund", "Refund"),
+            ("lock", "Lock"),
+            ("unlock", "Unlock"),
+            ("cancel", "Cancel"),
+            ("finish", "Finish"),
+        ],
+        required=True,
+        readonly=True,
+        states={"draft": [("readonly", False)]},
+    )
+    finalization_id = fields.Many2one(
+        comodel_name="rma.finalization",
+        string="Finalization reason",
+        readonly=True,
+        states={"draft": [("readonly", False)]},
+    )
+    rma_ids = fields.Many2many(
+        comodel_name="rma",
+        relation="rma_mass_action_rma_rel",
+        column1="mass_action_id",
+        column2="rma_id",
+        string="RMAs",
+        readonly=True,
+        states={"draft": [("readonly", False)]},
+    )
+    chunk_size = fields.Integer(
+        default=lambda self: self._default_chunk_size(),
+        required=True,
+        readonly=True,
+        states={"draft": [("readonly", False)]},
+    )
+    state = fields.Selection(
+        selection=[
+            ("draft", "Draft"),
+            ("pending", "Pending"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        default="draft",
+        required=True,
+        readonly=True,
+        copy=False,
+        index=True,
+    )
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        default=lambda self: self.env.user,
+        required=True,
+        readonly=True,
+        help="User the action is run as.",
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        default=lambda self: self.env.company,
+        required=True,
+        readonly=True,
+    )
+    last_rma_id = fields.Integer(
+        string="Last processed RMA id",
+        readonly=True,
+        copy=False,
+    )
+    processed_count = fields.Integer(string="Processed", readonly=True, copy=False)
+    total_count = fields.Integer(string="Total", compute="_compute_total_count")
+    progress = fields.Float(compute="_compute_progress")
+    date_start = fields.Datetime(string="Started on", readonly=True, copy=False)
+    date_end = fields.Datetime(string="Ended on", readonly=True, copy=False)
+    error = fields.Text(readonly=True, copy=False)
+
+    @api.model
+    def _default_chunk_size(self):
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param(CHUNK_SIZE_PARAM, DEFAULT_CHUNK_SIZE)
+        )
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if (
+            "rma_ids" in fields_list
+            and self.env.context.get("active_model") == "rma"
+            and self.env.context.get("active_ids")
+        ):
+            res["rma_ids"] = [(6, 0, self.env.context["active_ids"])]
+        return res
+
+    @api.depends("action", "create_date")
+    def _compute_name(self):
+        actions = dict(self._fields["action"]._description_selection(self.env))
+        for record in self:
+            record.name = "%s - %s" % (
+                actions.get(record.action, ""),
+                fields.Datetime.to_string(record.create_date or fields.Datetime.now()),
+            )
+
+    @api.depends("rma_ids")
+    def _compute_total_count(self):
+        for record in self:
+            record.total_count = len(record.rma_ids)
+
+    @api.depends("processed_count", "total_count")
+    def _compute_progress(self):
+        for record in self:
+            record.progress = (
+                100.0 * record.processed_count / record.total_count
+                if record.total_count
+                else 0.0
+            )
+
+    @api.constrains("chunk_size")
+    def _check_chunk_size(self):
+        if any(record.chunk_size <= 0 for record in self):
+            raise ValidationError(_("The chunk size must be positive."))
+
+    # Action methods
+    def action_run(self):
+        """Invoked when 'Run' button is clicked. The RMAs are processed in
+        background by the mass action scheduled action.
+        """
+        for record in self:
+            if record.action == "finish" and not record.finalization_id:
+                raise UserError(_("A finalization reason is required."))
+        self.filtered(lambda r: r.state in ["draft", "failed"]).write(
+            {"state": "pending", "error": False}
+        )
+        self.env.ref("rma.ir_cron_rma_mass_action")._trigger()
+
+    def action_view_rmas(self):
+        self.ensure_one()
+        action = self.env["ir.actions.actions"]._for_xml_id("rma.rma_action")
+        action["domain"] = [("id", "in", self.rma_ids.ids)]
+        return action
+
+    # Processing
+    @api.model
+    def _cron_process(self):
+        """Process the pending mass actions and resume the interrupted ones."""
+        stale_date = fields.Datetime.now() - STALE_DELAY
+        mass_actions = self.search(
+            [
+                "|",
+                ("state", "=", "pending"),
+                "&",
+                ("state", "=", "running"),
+                ("write_date", "<", stale_date),
+            ],
+            order="id",
+        )
+        for mass_action in mass_actions:
+            mass_action._process()
+
+    def _get_pending_rma_ids(self):
+        self.ensure_one()
+        self.env.cr.execute(
+            """
+            SELECT rma_id
+            FROM rma_mass_action_rma_rel
+            WHERE mass_action_id = %s AND rma_id > %s
+            ORDER BY rma_id
+            LIMIT %s
+            """,
+            (self.id, self.last_rma_id, self.chunk_size),
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def _lock(self):
+        """Lock the mass action row until the end of the current
+        transaction. Return False if another worker is processing it.
+        """
+        self.env.cr.execute(
+            """
+            SELECT id FROM rma_mass_action
+            WHERE id = %s
+            FOR UPDATE SKIP LOCKED
+            """,
+            (self.id,),
+        )
+        if not self.env.cr.fetchone():
+            return False
+        # Read the progress committed by the previous worker, if any
+        self.invalidate_cache(ids=self.ids)
+        return True
+
+    def _process(self):
+        """Process the unprocessed RMAs chunk by chunk, committing the
+        progress after each chunk. Return True when all the RMAs have been
+        processed.
+        """
+        self.ensure_one()
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        if not self._lock():
+            return False
+        vals = {"state": "running", "error": False}
+        if not self.date_start:
+            vals["date_start"] = fields.Datetime.now()
+        self.write(vals)
+        if auto_commit:
+            self.env.cr.commit()  # pylint: disable=invalid-commit
+            if not self._lock():
+                return False
+        # In the company of the mass action only, whatever the context of
+        # the worker
+        rma_model = (
+            self.env["rma"]
+            .with_user(self.user_id)
+            .with_company(self.company_id)
+            .with_context(allowed_company_ids=self.company_id.ids)
+        )
+        attempt = 1
+        while True:
+            rma_ids = self._get_pending_rma_ids()
+            if not rma_ids:
+                break
+            try:
+                with self.env.cr.savepoint():
+                    self._execute(rma_model.browse(rma_ids))
+            except Exception as error:
+                retryable = (
+                    isinstance(error, OperationalError)
+                    and error.pgcode in RETRYABLE_ERRORS
+                )
+                if retryable and attempt < MAX_CHUNK_ATTEMPTS:
+                    _logger.info(
+                        "RMA mass action %s conflicted, retrying the chunk",
+                        self.name,
+                    )
+                    attempt += 1
+                    if not self._prepare_retry(attempt, auto_commit):
+                        return False
+                    continue
+                _logger.exception("RMA mass action %s failed", self.name)
+                # Drop the values of the rolled back chunk from the cache
+                self.env.clear()
+                self.write({"state": "failed", "error": str(error)})
+                if auto_commit:
+                    self.env.cr.commit()  # pylint: disable=invalid-commit
+                return False
+            attempt = 1
+            self.write(
+                {
+                    "last_rma_id": rma_ids[-1],
+                    "processed_count": self.processed_count + len(rma_ids),
+                }
+            )
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            self.env["base"].flush()
+            self.env.cache.invalidate()
+            if not self._lock():
+                return False
+        self.write({"state": "done", "date_end": fields.Datetime.now()})
+        if auto_commit:
+            self.env.cr.commit()  # pylint: disable=invalid-commit
+        return True
+
+    def _prepare_retry(self, attempt, auto_commit):
+        """Wait before retrying a chunk that conflicted with a concurrent
+        transaction. The transaction is rolled back so the retry works on
+        a fresh snapshot, which is required to get past a serialization
+        failure; everything up to the last chunk is already committed.
+        The random wait spreads the retries of the competing workers.
+        Return False if another worker took over the mass action.
+        """
+        self.env.clear()
+        time.sleep(random.uniform(0, RETRY_BASE_DELAY * 2**attempt))
+        if not auto_commit:
+            return True
+        self.env.cr.rollback()
+        return self._lock()
+
+    def _execute(self, rmas):
+        """Run the action of this mass action on a chunk of RMAs. The RMAs
+        in which the action can't be applied are skipped, as the buttons
+        of the RMA form view are hidden for them.
+        """
+        self.ensure_one()
+        if self.action == "confirm":
+            for rma in rmas.filtered(lambda r: r.state == "draft"):
+                rma.action_confirm()
+        elif self.action == "refund":
+            rmas.action_refund()
+        elif self.action == "lock":
+            rmas.action_lock()
+        elif self.action == "unlock":
+            rmas.action_unlock()
+        elif self.action == "cancel":
+            rmas.filtered(lambda r: r.state in ["draft", "confirmed"]).action_cancel()
+        elif self.action == "finish":
+            if not rmas.env.user.has_group("rma.group_rma_manual_finalization"):
+                raise UserError(_("You are not allowed to finish RMAs manually."))
+            rmas._apply_state_event(
+                "finish", {"finalization_id": self.finalization_id.id}
+            )
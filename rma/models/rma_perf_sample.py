@@ -0,0 +1,113 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import functools
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+INSTRUMENTATION_PARAM = "rma.performance_instrumentation"
+
+
+def instrumented(method=None, condition=None):
+    """Record a performance sample of each call of the decorated method
+    when the 'rma.performance_instrumentation' system parameter is set.
+    When it is not set, the only overhead is a cached parameter lookup.
+    Failed calls are not sampled.
+
+    `condition` is an optional function called with the records, the
+    call is sampled only if it returns a truthy value. It is meant for
+    methods of other models, like `stock.move`, whose calls only matter
+    when the records are linked to RMAs::
+
+        @instrumented(condition=lambda moves: moves.filtered("rma_id"))
+        def _action_done(self):
+    """
+    if method is None:
+        return functools.partial(instrumented, condition=condition)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        sample_model = self.env["rma.perf.sample"]
+        if not sample_model._is_instrumentation_enabled() or (
+            condition and not condition(self)
+        ):
+            return method(self, *args, **kwargs)
+        record_count = len(self)
+        # Read before the call, the records could be deleted by it
+        company = sample_model._get_sample_company(self)
+        queries_before = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        res = method(self, *args, **kwargs)
+        sample_model._record_sample(
+            "{}.{}".format(self._name, method.__name__),
+            time.perf_counter() - start,
+            self.env.cr.sql_log_count - queries_before,
+            record_count,
+            company,
+        )
+        return res
+
+    return wrapper
+
+
+class RmaPerfSample(models.Model):
+    _name = "rma.perf.sample"
+    _description = "RMA Performance Sample"
+    _order = "id desc"
+    _log_access = False
+
+    date = fields.Datetime(
+        default=lambda self: fields.Datetime.now(),
+        index=True,
+        readonly=True,
+    )
+    method = fields.Char(index=True, readonly=True)
+    company_id = fields.Many2one(comodel_name="res.company", readonly=True)
+    user_id = fields.Many2one(comodel_name="res.users", readonly=True)
+    duration = fields.Float(
+        string="Wall time (s)",
+        digits=(16, 4),
+        readonly=True,
+    )
+    query_count = fields.Integer(string="SQL queries", readonly=True)
+    record_count = fields.Integer(string="Records", readonly=True)
+
+    @api.model
+    def _is_instrumentation_enabled(self):
+        # get_param is cached, it doesn't query the database on every call
+        return bool(
+            self.env["ir.config_parameter"].sudo().get_param(INSTRUMENTATION_PARAM)
+        )
+
+    @api.model
+    def _get_sample_company(self, records):
+        """Company of the sampled records, the current company for the
+        records without company. The first company is kept for records of
+        several companies.
+        """
+        if "company_id" in records._fields:
+            company = records.sudo().mapped("company_id")[:1]
+            if company:
+                return company
+        return self.env.company
+
+    @api.model
+    def _record_sample(self, method, duration, query_count, record_count, company=None):
+        self.sudo().create(
+            {
+                "method": method,
+                "company_id": (company or self.env.company).id,
+                "user_id": self.env.uid,
+                "duration": duration,
+                "query_count": query_count,
+                "record_count": record_count,
+            }
+        )
+
+    @api.autovacuum
+    def _gc_perf_samples(self):
+        """Remove the samples older than 30 days"""
+        limit_date = fields.Datetime.now() - timedelta(days=30)
+        self.sudo().search([("date", "<", limit_date)]).unlink()
@@ -2,8 +2,11 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 import ast
+import email
+import email.policy
 
 from odoo import _, fields, models
+from odoo.tools import email_normalize
 
 
 class RmaTeam(models.Model):
@@ -38,6 +41,28 @@ class RmaTeam(models.Model):
         inverse_name="rma_team_id",
         string="Team Members",
     )
+    kpi_open_count = fields.Integer(
+        string="Open RMAs",
+        compute="_compute_kpi_open_count",
+    )
+
+    def _compute_kpi_open_count(self):
+        # Read from the KPI table, not from the RMAs
+        data = self.env["rma.kpi"].read_group(
+            [("team_id", "in", self.ids)], ["team_id", "open_count"], ["team_id"]
+        )
+        counts = {group["team_id"][0]: group["open_count"] for group in data}
+        for team in self:
+            team.kpi_open_count = counts.get(team.id, 0)
+
+    def action_view_kpi(self):
+        self.ensure_one()
+        action = self.env["ir.actions.actions"]._for_xml_id("rma.rma_kpi_action")
+        action["context"] = {
+            "search_default_team_id": self.id,
+            "search_default_filter_date": 1,
+        }
+        return action
 
     def copy(self, default=None):
         self.ensure_one()
@@ -62,3 +87,73 @@ class RmaTeam(models.Model):
             )
             defaults["team_id"] = self.id
         return values
+
+    def message_process_batch(self, messages):
+        """Create RMAs from a batch of raw incoming emails sent to the team
+        alias. This is the bulk counterpart of the mail gateway for bursts
+        of return notifications: messages are parsed first and then
+        ingested at once by `rma.message_new_batch`. Messages already
+        processed (same Message-Id) or refused by the contact policy of
+        the alias are skipped.
+
+        :param messages: list of raw RFC2822 messages (bytes or str)
+        :returns: the created RMAs
+        """
+        self.ensure_one()
+        thread_model = self.env["mail.thread"]
+        msg_dicts = []
+        for message in messages:
+            if isinstance(message, str):
+                message = message.encode("utf-8")
+            message = email.message_from_bytes(message, policy=email.policy.SMTP)
+            msg_dicts.append(thread_model.message_parse(message))
+        message_ids = {d["message_id"] for d in msg_dicts if d.get("message_id")}
+        processed = set(
+            self.env["mail.message"]
+            .sudo()
+            .search([("message_id", "in", list(message_ids))])
+            .mapped("message_id")
+        )
+        to_process = []
+        for msg_dict in msg_dicts:
+            message_id = msg_dict.get("message_id")
+            if message_id in processed:
+                continue
+            if message_id:
+                processed.add(message_id)
+            to_process.append(msg_dict)
+        to_process = self._filter_alias_contact(to_process)
+        if not to_process:
+            return self.env["rma"]
+        custom_values = ast.literal_eval(self.alias_defaults or "{}")
+        custom_values["team_id"] = self.id
+        return self.env["rma"].message_new_batch(
+            to_process, custom_values=custom_values
+        )
+
+    def _filter_alias_contact(self, msg_dicts):
+        """Keep the emails whose sender is accepted by the contact policy
+        of the team alias, resolving the senders with a single search.
+        """
+        self.ensure_one()
+        policy = self.alias_id.alias_contact
+        if not policy or policy == "everyone":
+            return msg_dicts
+        senders = [
+            email_normalize(msg_dict.get("email_from") or "") for msg_dict in msg_dicts
+        ]
+        partners = (
+            self.env["res.partner"]
+            .sudo()
+            .search(
+                [("email_normalized", "in", [sender for sender in senders if sender])]
+            )
+        )
+        if policy == "followers":
+            partners &= self.sudo().message_partner_ids
+        allowed = set(partners.mapped("email_normalized"))
+        return [
+            msg_dict
+            for msg_dict, sender in zip(msg_dicts, senders)
+            if sender and sender in allowed
+        ]
@@ -4,6 +4,16 @@
 from odoo import _, api, fields, models
 from odoo.exceptions import ValidationError
 
+from .rma_perf_sample import instrumented
+
+
+def _has_rma(moves):
+    """Whether some of the moves are linked to RMAs, the calls on the other
+    moves aren't sampled.
+    """
+    moves = moves.sudo()
+    return moves.filtered("rma_id") or moves.mapped("rma_receiver_ids")
+
 
 class StockMove(models.Model):
     _inherit = "stock.move"
@@ -14,6 +24,7 @@ class StockMove(models.Model):
         inverse_name="move_id",
         string="RMAs",
         copy=False,
+        context={"active_test": False},
     )
     # RMAs linked to the incoming movement from client
     rma_receiver_ids = fields.One2many(
@@ -21,37 +32,46 @@ class StockMove(models.Model):
         inverse_name="reception_move_id",
         string="RMA receivers",
         copy=False,
+        context={"active_test": False},
     )
     # RMA that create the delivery movement to the customer
     rma_id = fields.Many2one(
         comodel_name="rma",
         string="RMA return",
         copy=False,
+        index=True,
     )
 
+    @instrumented(condition=_has_rma)
     def unlink(self):
         # A stock user could have no RMA permissions, so the ids wouldn't
         # be accessible due to record rules.
         rma_receiver = self.sudo().mapped("rma_receiver_ids")
         rma = self.sudo().mapped("rma_id")
+        self.sudo()._get_linked_rmas()._lock_for_update()
         res = super().unlink()
-        rma_receiver.filtered(lambda x: x.state != "cancelled").write(
-            {"state": "draft"}
-        )
+        rma_receiver._apply_state_event("reception_cancel")
         rma.update_received_state()
         rma.update_replaced_state()
         return res
 
+    @instrumented(condition=_has_rma)
     def _action_cancel(self):
+        # Lock the RMAs before the moves, in the same order as the other
+        # RMA operations
+        self.sudo()._get_linked_rmas()._lock_for_update()
         res = super()._action_cancel()
         # A stock user could have no RMA permissions, so the ids wouldn't
         # be accessible due to record rules.
         cancelled_moves = self.filtered(lambda r: r.state == "cancel").sudo()
-        cancelled_moves.mapped("rma_receiver_ids").write({"state": "draft"})
+        cancelled_moves.mapped("rma_receiver_ids")._apply_state_event(
+            "reception_cancel"
+        )
         cancelled_moves.mapped("rma_id").update_received_state()
         cancelled_moves.mapped("rma_id").update_replaced_state()
         return res
 
+    @instrumented(condition=_has_rma)
     def _action_done(self, cancel_backorder=False):
         """Avoids to validate stock.move with less quantity than the
         quantity in the linked receiver RMA. It also set the appropriated
@@ -68,6 +88,9 @@ class StockMove(models.Model):
                     )
                     % (move.product_id.name, move.rma_receiver_ids.name)
                 )
+        # Lock the RMAs before the moves, in the same order as the other
+        # RMA operations
+        self.sudo()._get_linked_rmas()._lock_for_update()
         res = super()._action_done(cancel_backorder=cancel_backorder)
         move_done = self.filtered(lambda r: r.state == "done").sudo()
         # Set RMAs as received. We sudo so we can grant the operation even
@@ -83,6 +106,9 @@ class StockMove(models.Model):
         move_done.mapped("rma_id").update_returned_state()
         return res
 
+    def _get_linked_rmas(self):
+        return self.mapped("rma_receiver_ids") | self.mapped("rma_id")
+
     @api.model
     def _prepare_merge_moves_distinct_fields(self):
         """The main use is that launched delivery RMAs doesn't merge
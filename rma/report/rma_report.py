@@ -0,0 +1,171 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import fields, models, tools
+
+
+class RmaReport(models.Model):
+    """One line per RMA with its stored quantities, amounts and lead times,
+    so that big pivots and graphs run as a single GROUP BY on a SQL view
+    instead of computing the fields of every RMA. Quantities are expressed
+    in the unit of measure of the product.
+    """
+
+    _name = "rma.report"
+    _description = "RMA Analysis Report"
+    _auto = False
+    _rec_name = "name"
+    _order = "date desc"
+
+    rma_id = fields.Many2one(comodel_name="rma", string="RMA", readonly=True)
+    name = fields.Char(string="Reference", readonly=True)
+    date = fields.Datetime(readonly=True)
+    date_closed = fields.Datetime(string="Closed on", readonly=True)
+    deadline = fields.Date(readonly=True)
+    partner_id = fields.Many2one(comodel_name="res.partner", readonly=True)
+    user_id = fields.Many2one(
+        comodel_name="res.users", string="Responsible", readonly=True
+    )
+    team_id = fields.Many2one(comodel_name="rma.team", string="RMA team", readonly=True)
+    company_id = fields.Many2one(comodel_name="res.company", readonly=True)
+    warehouse_id = fields.Many2one(comodel_name="stock.warehouse", readonly=True)
+    operation_id = fields.Many2one(
+        comodel_name="rma.operation",
+        string="Requested operation",
+        readonly=True,
+    )
+    product_id = fields.Many2one(comodel_name="product.product", readonly=True)
+    categ_id = fields.Many2one(
+        comodel_name="product.category",
+        string="Product Category",
+        readonly=True,
+    )
+    product_uom_id = fields.Many2one(
+        comodel_name="uom.uom", string="Unit of Measure", readonly=True
+    )
+    state = fields.Selection(selection="_selection_state", readonly=True)
+    nbr = fields.Integer(string="# RMAs", readonly=True)
+    product_uom_qty = fields.Float(
+        string="Quantity",
+        digits="Product Unit of Measure",
+        readonly=True,
+    )
+    received_qty = fields.Float(
+        string="Received quantity",
+        digits="Product Unit of Measure",
+        readonly=True,
+    )
+    delivered_qty = fields.Float(
+        string="Delivered quantity",
+        digits="Product Unit of Measure",
+        readonly=True,
+    )
+    remaining_qty = fields.Float(
+        string="Remaining quantity",
+        digits="Product Unit of Measure",
+        readonly=True,
+    )
+    currency_id = fields.Many2one(comodel_name="res.currency", readonly=True)
+    refund_amount = fields.Monetary(
+        readonly=True,
+        help="Untaxed amount of the refund lines of the RMA, in the company "
+        "currency.",
+    )
+    reception_days = fields.Float(
+        string="Days to receive",
+        group_operator="avg",
+        readonly=True,
+    )
+    delivery_days = fields.Float(
+        string="Days to deliver",
+        group_operator="avg",
+        readonly=True,
+        help="Days between the reception and the last delivery.",
+    )
+    cycle_days = fields.Float(
+        string="Days to close",
+        group_operator="avg",
+        readonly=True,
+    )
+
+    def _selection_state(self):
+        return self.env["rma"]._fields["state"].selection
+
+    def _select(self):
+        return """
+            SELECT
+                r.id AS id,
+                r.id AS rma_id,
+                r.name AS name,
+                r.date AS date,
+                r.date_closed AS date_closed,
+                r.deadline AS deadline,
+                r.partner_id AS partner_id,
+                r.user_id AS user_id,
+                r.team_id AS team_id,
+                r.company_id AS company_id,
+                r.warehouse_id AS warehouse_id,
+                r.operation_id AS operation_id,
+                r.product_id AS product_id,
+                pt.categ_id AS categ_id,
+                pt.uom_id AS product_uom_id,
+                r.state AS state,
+                1 AS nbr,
+                r.product_uom_qty / ru.factor * pu.factor AS product_uom_qty,
+                CASE WHEN reception.id IS NOT NULL
+                    THEN r.product_uom_qty / ru.factor * pu.factor
+                    ELSE 0
+                END AS received_qty,
+                COALESCE(delivery.product_qty, 0) AS delivered_qty,
+                r.product_uom_qty / ru.factor * pu.factor
+                    - COALESCE(delivery.product_qty, 0) AS remaining_qty,
+                c.currency_id AS currency_id,
+                COALESCE(refund.amount, 0) AS refund_amount,
+                EXTRACT(EPOCH FROM reception.date - r.date)
+                    / 86400.0 AS reception_days,
+                EXTRACT(EPOCH FROM delivery.date - reception.date)
+                    / 86400.0 AS delivery_days,
+                EXTRACT(EPOCH FROM r.date_closed - r.date)
+                    / 86400.0 AS cycle_days
+        """
+
+    def _from(self):
+        return """
+            FROM rma r
+            LEFT JOIN product_product pp ON pp.id = r.product_id
+            LEFT JOIN product_template pt ON pt.id = pp.product_tmpl_id
+            LEFT JOIN uom_uom ru ON ru.id = r.product_uom
+            LEFT JOIN uom_uom pu ON pu.id = pt.uom_id
+            LEFT JOIN res_company c ON c.id = r.company_id
+            -- The RMAs split from another one share its reception move,
+            -- only its date is taken
+            LEFT JOIN stock_move reception
+                ON reception.id = r.reception_move_id
+                AND reception.state = 'done'
+            LEFT JOIN (
+                SELECT rma_id, SUM(product_qty) AS product_qty, MAX(date) AS date
+                FROM stock_move
+                WHERE rma_id IS NOT NULL
+                    AND state = 'done'
+                    AND scrapped IS NOT TRUE
+                GROUP BY rma_id
+            ) delivery ON delivery.rma_id = r.id
+            LEFT JOIN (
+                SELECT aml.rma_id, SUM(aml.balance) AS amount
+                FROM account_move_line aml
+                JOIN account_move am ON am.id = aml.move_id
+                WHERE aml.rma_id IS NOT NULL AND am.state != 'cancel'
+                GROUP BY aml.rma_id
+            ) refund ON refund.rma_id = r.id
+        """
+
+    def _where(self):
+        return ""
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(
+            "CREATE OR REPLACE VIEW {} AS ({} {} {})".format(
+                self._table, self._select(), self._from(), self._where()
+            )
+        )
@@ -1,3 +1,7 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 from . import test_rma
+from . import test_rma_benchmark
+from . import test_rma_export
+from . import test_rma_query_count
+from . import test_rma_indexes
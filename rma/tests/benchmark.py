@@ -0,0 +1,222 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+"""Helpers of the RMA performance benchmarks.
+
+The benchmarks are tagged ``rma_benchmark`` and they are not run with the
+standard tests. To run them::
+
+    RMA_BENCHMARK_SCALE=200 RMA_BENCHMARK_OUTPUT=/tmp/bench \\
+    odoo -d db -i rma_sale --test-tags rma_benchmark --stop-after-init
+
+Each suite writes a ``rma_benchmark_<suite>.json`` file in the
+``RMA_BENCHMARK_OUTPUT`` directory (the temp dir by default) so that the
+results of two releases can be compared.
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from odoo import release
+
+BENCHMARK_SCALE = int(os.environ.get("RMA_BENCHMARK_SCALE", 10))
+BENCHMARK_OUTPUT = os.environ.get("RMA_BENCHMARK_OUTPUT", tempfile.gettempdir())
+
+
+class RmaBenchmarkDataGenerator(object):
+    """Create the partners, products, deliveries and RMAs of a benchmark
+    at the given scale. All the records are created in batches.
+    """
+
+    def __init__(self, env, scale=BENCHMARK_SCALE, prefix="Benchmark"):
+        self.env = env
+        self.scale = scale
+        self.prefix = prefix
+        self.company = env.company
+        self.warehouse = env["stock.warehouse"].search(
+            [("company_id", "=", self.company.id)], limit=1
+        )
+
+    def _get_receivable_account(self):
+        account = self.env["account.account"].search(
+            [
+                ("company_id", "=", self.company.id),
+                ("internal_type", "=", "receivable"),
+                ("deprecated", "=", False),
+            ],
+            limit=1,
+        )
+        if not account:
+            account_type = self.env["account.account.type"].create(
+                {"name": "RCV type", "type": "receivable", "internal_group": "income"}
+            )
+            account = self.env["account.account"].create(
+                {
+                    "name": "%s receivable" % self.prefix,
+                    "code": "RCVBENCH",
+                    "user_type_id": account_type.id,
+                    "reconcile": True,
+                }
+            )
+        return account
+
+    def create_partners(self, count=None):
+        account = self._get_receivable_account()
+        return self.env["res.partner"].create(
+            [
+                {
+                    "name": "%s partner %d" % (self.prefix, index),
+                    "email": "%s.partner.%d@example.com" % (self.prefix.lower(), index),
+                    "property_account_receivable_id": account.id,
+                }
+                for index in range(count or self.scale)
+            ]
+        )
+
+    def create_products(self, count=None):
+        return self.env["product.product"].create(
+            [
+                {
+                    "name": "%s product %d" % (self.prefix, index),
+                    "default_code": "%s-%d" % (self.prefix.upper(), index),
+                    "type": "product",
+                    "lst_price": 10.0 + index,
+                }
+                for index in range(count or self.scale)
+            ]
+        )
+
+    def create_deliveries(self, partners, products, qty=10.0):
+        """Create and validate one delivery per partner with a move of
+        every product.
+        """
+        picking_type = self.warehouse.out_type_id
+        customer_location = self.env.ref("stock.stock_location_customers")
+        pickings = self.env["stock.picking"].create(
+            [
+                {
+                    "picking_type_id": picking_type.id,
+                    "partner_id": partner.id,
+                    "location_id": picking_type.default_location_src_id.id,
+                    "location_dest_id": customer_location.id,
+                    "move_lines": [
+                        (
+                            0,
+                            0,
+                            {
+                                "name": product.display_name,
+                                "product_id": product.id,
+                                "product_uom_qty": qty,
+                                "product_uom": product.uom_id.id,
+                                "location_id": picking_type.default_location_src_id.id,
+                                "location_dest_id": customer_location.id,
+                            },
+                        )
+                        for product in products
+                    ],
+                }
+                for partner in partners
+            ]
+        )
+        pickings.action_confirm()
+        for move in pickings.move_lines:
+            move.quantity_done = move.product_uom_qty
+        pickings.move_lines._action_done()
+        return pickings
+
+    def create_rmas(self, deliveries, count=None, qty=2.0):
+        """Create draft RMAs linked to the moves of the given deliveries,
+        cycling over them until `count` RMAs are created.
+        """
+        moves = deliveries.move_lines
+        count = count or self.scale
+        vals_list = []
+        for index in range(count):
+            move = moves[index % len(moves)]
+            partner = move.picking_id.partner_id
+            vals_list.append(
+                {
+                    "partner_id": partner.id,
+                    "partner_invoice_id": partner.id,
+                    "partner_shipping_id": partner.id,
+                    "picking_id": move.picking_id.id,
+                    "move_id": move.id,
+                    "product_id": move.product_id.id,
+                    "product_uom_qty": qty,
+                    "product_uom": move.product_uom.id,
+                    "location_id": self.warehouse.rma_loc_id.id,
+                    "company_id": self.company.id,
+                }
+            )
+        return self.env["rma"].create(vals_list)
+
+    @staticmethod
+    def receive(rmas):
+        moves = rmas.mapped("reception_move_id")
+        for move in moves:
+            move.quantity_done = move.product_uom_qty
+        moves._action_done()
+
+
+class RmaBenchmarkMixin(object):
+    """Measure the wall time and the number of queries of the benchmarked
+    operations and dump the results to a JSON file.
+    """
+
+    benchmark_suite = "rma"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.benchmark_results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._write_benchmark_results()
+        super().tearDownClass()
+
+    @classmethod
+    def _write_benchmark_results(cls):
+        if not os.path.isdir(BENCHMARK_OUTPUT):
+            os.makedirs(BENCHMARK_OUTPUT)
+        path = os.path.join(
+            BENCHMARK_OUTPUT, "rma_benchmark_%s.json" % cls.benchmark_suite
+        )
+        with open(path, "w") as output:
+            json.dump(
+                {
+                    "suite": cls.benchmark_suite,
+                    "odoo_version": release.version,
+                    "date": datetime.utcnow().isoformat(),
+                    "scale": BENCHMARK_SCALE,
+                    "results": cls.benchmark_results,
+                },
+                output,
+                indent=2,
+            )
+
+    def measure(self, name, records, func):
+        """Run `func` and record its wall time and SQL query count. The
+        pending computations are flushed before and after the run so they
+        are measured with the operation that triggers them.
+        """
+        self.env["base"].flush()
+        self.env.cache.invalidate()
+        queries_before = self.cr.sql_log_count
+        start = time.perf_counter()
+        result = func()
+        self.env["base"].flush()
+        elapsed = time.perf_counter() - start
+        queries = self.cr.sql_log_count - queries_before
+        self.benchmark_results.append(
+            {
+                "name": name,
+                "records": len(records),
+                "seconds": round(elapsed, 6),
+                "queries": queries,
+                "queries_per_record": round(queries / (len(records) or 1), 2),
+            }
+        )
+        return result
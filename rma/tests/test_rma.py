@@ -1,8 +1,16 @@
 # Copyright 2020 Tecnativa - Ernesto Tejeda
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import base64
+from datetime import timedelta
+from unittest.mock import patch
+
+from psycopg2 import OperationalError, errorcodes
+
+from odoo import fields
 from odoo.exceptions import UserError, ValidationError
 from odoo.tests import Form, SavepointCase, new_test_user, users
+from odoo.tools import sql
 
 
 class TestRma(SavepointCase):
@@ -541,6 +549,39 @@ class TestRmaCase(TestRma):
         self.assertEqual(rma.state, "finished")
         self.assertEqual(rma.finalization_id, self.finalization_reason_2)
 
+    def test_return_to_customer_concurrent(self):
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        self.assertTrue(rma.can_be_returned)
+        self.env["base"].flush()
+        # A concurrent transaction returned the RMA after it was read
+        self.env.cr.execute(
+            "UPDATE rma SET state = 'returned', can_be_returned = false "
+            "WHERE id = %s",
+            (rma.id,),
+        )
+        with self.assertRaises(ValidationError):
+            rma.create_return(fields.Datetime.now(), 10, rma.product_uom)
+        self.assertFalse(rma.delivery_move_ids)
+
+    def test_return_to_customer_background(self):
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        delivery_form = Form(
+            self.env["rma.delivery.wizard"].with_context(
+                active_ids=rma.ids,
+                rma_delivery_type="return",
+            )
+        )
+        delivery_form.product_uom_qty = 4
+        delivery_form.run_in_background = True
+        delivery_form.save().action_deliver()
+        # The return of a single RMA is queued too
+        self.assertFalse(rma.delivery_move_ids)
+        job = self.env["rma.job"].search([("rma_ids", "in", rma.ids)])
+        self.assertEqual(job.method, "create_return")
+        self.assertTrue(job._run())
+        self.assertEqual(rma.delivery_move_ids.product_uom_qty, 4)
+        self.assertEqual(rma.state, "waiting_return")
+
     def test_mass_return_to_customer(self):
         # Create, confirm and receive rma_1
         rma_1 = self._create_confirm_receive(
@@ -797,3 +838,763 @@ class TestRmaCase(TestRma):
         )
         self.assertTrue(rma.name in mail_receipt.subject)
         self.assertTrue("products received" in mail_receipt.subject)
+
+    def test_message_process_batch(self):
+        self.partner.email = "partner.rma@example.com"
+        team = self.env["rma.team"].create({"name": "Batch team"})
+        raw_email = (
+            "From: {sender}\r\n"
+            "To: rma@example.com\r\n"
+            "Subject: Return {number}\r\n"
+            "Message-Id: <rma-batch-{number}@example.com>\r\n"
+            "Content-Type: text/plain\r\n"
+            "\r\n"
+            "The product {number} is broken\r\n"
+        )
+        messages = [
+            raw_email.format(sender="Partner <partner.rma@example.com>", number=1),
+            raw_email.format(sender="unknown@example.com", number=2),
+        ]
+        rmas = team.message_process_batch(messages)
+        self.assertEqual(len(rmas), 2)
+        self.assertEqual(rmas.mapped("team_id"), team)
+        self.assertEqual(rmas[0].partner_id, self.partner)
+        self.assertEqual(rmas[0].partner_invoice_id, self.partner_invoice)
+        self.assertFalse(rmas[1].partner_id)
+        self.assertIn("The product 1 is broken", rmas[0].description)
+        message = rmas[0].message_ids.filtered(lambda m: m.message_type == "email")
+        self.assertEqual(message.message_id, "<rma-batch-1@example.com>")
+        # Already processed emails are skipped
+        self.assertFalse(team.message_process_batch(messages))
+        # The contact policy of the alias applies
+        team.alias_contact = "partners"
+        messages = [
+            raw_email.format(sender="unknown@example.com", number=3),
+            raw_email.format(sender="partner.rma@example.com", number=4),
+        ]
+        rmas = team.message_process_batch(messages)
+        self.assertEqual(len(rmas), 1)
+        self.assertEqual(rmas.partner_id, self.partner)
+
+    def test_performance_instrumentation(self):
+        sample_model = self.env["rma.perf.sample"]
+        rma = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        rma.action_confirm()
+        self.assertFalse(sample_model.search([("method", "=", "rma.action_confirm")]))
+        self.env["ir.config_parameter"].sudo().set_param(
+            "rma.performance_instrumentation", "1"
+        )
+        rma = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        rma.action_confirm()
+        sample = sample_model.search([("method", "=", "rma.action_confirm")])
+        self.assertEqual(len(sample), 1)
+        self.assertEqual(sample.record_count, 1)
+        self.assertTrue(sample.query_count)
+        self.assertEqual(sample.user_id, self.env.user)
+        # Only the stock moves linked to RMAs are sampled
+        move = self.env["stock.move"].create(
+            {
+                "name": "Not an RMA move",
+                "product_id": self.product.id,
+                "product_uom_qty": 1,
+                "product_uom": self.product.uom_id.id,
+                "location_id": self.rma_loc.id,
+                "location_dest_id": self.env.ref("stock.stock_location_customers").id,
+            }
+        )
+        move._action_cancel()
+        self.assertFalse(
+            sample_model.search([("method", "=", "stock.move._action_cancel")])
+        )
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        sample = sample_model.search([("method", "=", "stock.move._action_done")])
+        self.assertEqual(len(sample), 1)
+        self.assertEqual(sample.company_id, rma.company_id)
+        # The split of a single RMA is sampled under its own name
+        rma.create_return(fields.Datetime.now(), 4, rma.product_uom)
+        rma.extract_quantity(3, rma.product_uom)
+        sample = sample_model.search([("method", "=", "rma.extract_quantity")])
+        self.assertEqual(len(sample), 1)
+        self.assertEqual(sample.record_count, 1)
+
+    def test_mass_action(self):
+        rmas = self.env["rma"]
+        for _i in range(3):
+            rmas |= self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        mass_action = self.env["rma.mass.action"].create(
+            {"action": "confirm", "rma_ids": [(6, 0, rmas.ids)], "chunk_size": 2}
+        )
+        self.assertEqual(mass_action.total_count, 3)
+        self.assertTrue(mass_action._process())
+        self.assertEqual(mass_action.state, "done")
+        self.assertEqual(mass_action.processed_count, 3)
+        self.assertEqual(mass_action.last_rma_id, max(rmas.ids))
+        self.assertEqual(rmas.mapped("state"), ["confirmed"] * 3)
+
+    def test_mass_action_company(self):
+        company = self.env["res.company"].create({"name": "Mass action company"})
+        self.env.user.company_ids |= company
+        rma = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        mass_action = self.env["rma.mass.action"].create(
+            {
+                "action": "confirm",
+                "rma_ids": [(6, 0, rma.ids)],
+                "company_id": company.id,
+            }
+        )
+        companies = []
+
+        def company_execute(self, rmas):
+            companies.append(
+                (rmas.env.company, rmas.env.context["allowed_company_ids"])
+            )
+
+        with patch.object(type(mass_action), "_execute", company_execute):
+            self.assertTrue(mass_action.with_company(self.env.company)._process())
+        # The chunks run in the company of the mass action only
+        self.assertEqual(companies, [(company, company.ids)])
+
+    def test_mass_action_retry(self):
+        class SerializationFailure(OperationalError):
+            pgcode = errorcodes.SERIALIZATION_FAILURE
+
+        rmas = self.env["rma"]
+        for _i in range(2):
+            rmas |= self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        mass_action = self.env["rma.mass.action"].create(
+            {"action": "confirm", "rma_ids": [(6, 0, rmas.ids)], "chunk_size": 2}
+        )
+        execute = type(mass_action)._execute
+        calls = []
+
+        def conflicting_execute(self, rmas):
+            calls.append(rmas.ids)
+            if len(calls) == 1:
+                raise SerializationFailure("could not serialize access")
+            return execute(self, rmas)
+
+        with patch.object(type(mass_action), "_execute", conflicting_execute), patch(
+            "odoo.addons.rma.models.rma_mass_action.time.sleep"
+        ):
+            self.assertTrue(mass_action._process())
+        # The conflicting chunk was run again instead of failing the run
+        self.assertEqual(calls, [rmas.ids, rmas.ids])
+        self.assertEqual(mass_action.state, "done")
+        self.assertEqual(rmas.mapped("state"), ["confirmed"] * 2)
+
+    def test_write_state(self):
+        rma_1 = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        rma_2 = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        rma_2.action_cancel()
+        changed = (rma_1 | rma_2)._write_state("cancelled")
+        self.assertEqual(changed, rma_1)
+        self.assertEqual((rma_1 | rma_2).mapped("state"), ["cancelled"] * 2)
+
+    def test_state_events(self):
+        draft_rma = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        cancelled_rma = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        cancelled_rma.action_cancel()
+        received_rma = self._create_confirm_receive(
+            self.partner, self.product, 10, self.rma_loc
+        )
+        rmas = draft_rma | cancelled_rma | received_rma
+        # Only the RMAs matching a transition are changed
+        self.assertEqual(rmas._apply_state_event("draft"), cancelled_rma)
+        self.assertEqual(rmas.mapped("state"), ["draft", "draft", "received"])
+        # The guards are evaluated on each RMA
+        self.assertEqual(rmas._apply_state_event("lock"), received_rma)
+        self.assertEqual(received_rma.state, "locked")
+        self.assertFalse(rmas._apply_state_event("lock"))
+        self.assertEqual(rmas._apply_state_event("unlock"), received_rma)
+        self.assertEqual(received_rma.state, "received")
+        with self.assertRaises(ValueError):
+            rmas._apply_state_event("unknown")
+
+    def test_mass_action_resume(self):
+        rmas = self.env["rma"]
+        for _i in range(3):
+            rmas |= self._create_confirm_receive(
+                self.partner, self.product, 10, self.rma_loc
+            )
+        user = new_test_user(
+            self.env,
+            login="rma_mass_action_user",
+            groups="rma.rma_group_user_all,stock.group_stock_user",
+        )
+        mass_action = self.env["rma.mass.action"].create(
+            {
+                "action": "finish",
+                "finalization_id": self.finalization_reason_1.id,
+                "rma_ids": [(6, 0, rmas.ids)],
+                "chunk_size": 2,
+                "user_id": user.id,
+            }
+        )
+        # The user is not allowed to finish RMAs, the chunk is rolled back
+        self.assertFalse(mass_action._process())
+        self.assertEqual(mass_action.state, "failed")
+        self.assertTrue(mass_action.error)
+        self.assertEqual(mass_action.processed_count, 0)
+        self.assertEqual(rmas.mapped("state"), ["received"] * 3)
+        self.env.ref("rma.group_rma_manual_finalization").users |= user
+        mass_action.action_run()
+        self.assertEqual(mass_action.state, "pending")
+        self.assertTrue(mass_action._process())
+        self.assertEqual(mass_action.processed_count, 3)
+        self.assertEqual(rmas.mapped("state"), ["finished"] * 3)
+        self.assertEqual(rmas.mapped("finalization_id"), self.finalization_reason_1)
+
+    def test_job(self):
+        rmas = self.env["rma"]
+        for _i in range(3):
+            rmas |= self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        job = self.env["rma.job"]._enqueue(rmas, "action_confirm")
+        self.assertEqual(len(job), 1)
+        self.assertEqual(job.warehouse_id, self.warehouse_company)
+        self.assertEqual(job.company_id, rmas.company_id)
+        self.assertEqual(job.state, "pending")
+        action_confirm = type(rmas).action_confirm
+        companies = []
+
+        def company_action_confirm(self):
+            companies.append(
+                (self.env.company, self.env.context["allowed_company_ids"])
+            )
+            return action_confirm(self)
+
+        with patch.object(type(rmas), "action_confirm", company_action_confirm):
+            self.env["rma.job"].with_company(self.env.company)._cron_run_jobs()
+        # The job runs in its own company only
+        self.assertEqual(companies, [(job.company_id, job.company_id.ids)] * len(rmas))
+        self.assertEqual(job.state, "done")
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(rmas.mapped("state"), ["confirmed"] * 3)
+        # The RMAs are not received yet, they can't be returned
+        job = self.env["rma.job"]._enqueue(
+            rmas,
+            "create_return",
+            scheduled_date=fields.Datetime.to_string(fields.Datetime.now()),
+        )
+        self.assertFalse(job._run())
+        self.assertEqual(job.state, "failed")
+        self.assertTrue(job.error)
+        for rma in rmas:
+            rma.reception_move_id.quantity_done = rma.product_uom_qty
+        rmas.mapped("reception_move_id.picking_id")._action_done()
+        job.action_requeue()
+        self.assertTrue(job._run())
+        self.assertEqual(rmas.mapped("state"), ["waiting_return"] * 3)
+
+    def test_job_retry(self):
+        class SerializationFailure(OperationalError):
+            pgcode = errorcodes.SERIALIZATION_FAILURE
+
+        rma = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        job = self.env["rma.job"]._enqueue(rma, "action_refund")
+        job.write({"attempts": 1, "max_attempts": 2})
+        job._handle_failure(SerializationFailure("could not serialize access"))
+        self.assertEqual(job.state, "pending")
+        self.assertGreater(job.date_planned, fields.Datetime.now())
+        # The job fails when it runs out of attempts
+        job.attempts = 2
+        job._handle_failure(SerializationFailure("could not serialize access"))
+        self.assertEqual(job.state, "failed")
+
+    def _get_kpi_figures(self):
+        groups = self.env["rma.kpi"].read_group(
+            [],
+            ["rma_count", "open_count", "received_count", "closed_count"],
+            ["date:day", "company_id", "team_id", "warehouse_id", "categ_id", "state"],
+            lazy=False,
+        )
+        return {
+            (
+                group["date:day"],
+                group["company_id"],
+                group["team_id"],
+                group["warehouse_id"],
+                group["categ_id"],
+                group["state"],
+                group["rma_count"],
+                group["open_count"],
+                group["received_count"],
+                group["closed_count"],
+            )
+            for group in groups
+            if group["rma_count"]
+        }
+
+    def _get_kpi_group(self, rma, state):
+        groups = self.env["rma.kpi"].read_group(
+            [
+                ("date", "=", rma.date.date()),
+                ("team_id", "=", rma.team_id.id),
+                ("categ_id", "=", rma.product_id.categ_id.id),
+                ("state", "=", state),
+            ],
+            [
+                "rma_count",
+                "open_count",
+                "refunded_count",
+                "closed_count",
+                "product_uom_qty",
+                "avg_cycle_time",
+            ],
+            [],
+        )
+        return groups[0]
+
+    def test_kpi(self):
+        kpi_model = self.env["rma.kpi"]
+        kpi_model._reconcile()
+        rma = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        kpi = kpi_model.search(
+            [("warehouse_id", "=", self.warehouse_company.id), ("state", "=", "draft")]
+        )
+        self.assertEqual(kpi.mapped("categ_id"), self.product.categ_id)
+        group = self._get_kpi_group(rma, "draft")
+        self.assertEqual(group["open_count"], group["rma_count"])
+        draft_count = group["rma_count"]
+        rma.action_confirm()
+        rma.reception_move_id.quantity_done = 10
+        rma.reception_move_id.picking_id._action_done()
+        self.assertEqual(rma.state, "received")
+        self.assertFalse(rma.date_closed)
+        self.assertEqual(
+            self._get_kpi_group(rma, "draft")["rma_count"], draft_count - 1
+        )
+        rma.action_refund()
+        self.assertTrue(rma.date_closed)
+        group = self._get_kpi_group(rma, "refunded")
+        self.assertTrue(group["rma_count"])
+        self.assertEqual(group["refunded_count"], group["rma_count"])
+        self.assertEqual(group["closed_count"], group["rma_count"])
+        self.assertFalse(group["open_count"])
+        # The average is weighted by the closed RMAs
+        self.assertGreaterEqual(group["avg_cycle_time"], 0)
+        self.assertIs(self._get_kpi_group(rma, "received")["avg_cycle_time"], False)
+        # The incremental updates match the figures computed from scratch,
+        # before and after collapsing the deltas
+        figures = self._get_kpi_figures()
+        row_count = kpi_model.search_count([])
+        kpi_model._collapse()
+        self.assertEqual(self._get_kpi_figures(), figures)
+        self.assertLessEqual(kpi_model.search_count([]), row_count)
+        kpi_model._reconcile()
+        self.assertEqual(self._get_kpi_figures(), figures)
+
+    def test_kpi_uom(self):
+        uom_dozen = self.env.ref("uom.product_uom_dozen")
+        rma = self._create_rma(self.partner, self.product, 1, self.rma_loc)
+        quantity = self._get_kpi_group(rma, "draft")["product_uom_qty"]
+        rma.product_uom = uom_dozen
+        # The quantities are summed up in the unit of measure of the product
+        self.assertAlmostEqual(
+            self._get_kpi_group(rma, "draft")["product_uom_qty"], quantity + 11
+        )
+        self.env["rma.kpi"]._reconcile()
+        self.assertAlmostEqual(
+            self._get_kpi_group(rma, "draft")["product_uom_qty"], quantity + 11
+        )
+
+    def test_rma_report(self):
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        rma.action_refund()
+        self.env["base"].flush()
+        line = self.env["rma.report"].search([("rma_id", "=", rma.id)])
+        self.assertEqual(line.nbr, 1)
+        self.assertEqual(line.state, "refunded")
+        self.assertEqual(line.product_uom_qty, 10)
+        self.assertEqual(line.received_qty, 10)
+        self.assertEqual(line.delivered_qty, 0)
+        self.assertEqual(line.remaining_qty, 10)
+        self.assertTrue(line.refund_amount)
+        self.assertEqual(line.categ_id, self.product.categ_id)
+        self.assertGreaterEqual(line.reception_days, 0)
+        # Big pivots run as a single GROUP BY on the view
+        groups = self.env["rma.report"].read_group(
+            [("rma_id", "=", rma.id)], ["nbr", "refund_amount"], ["state"]
+        )
+        self.assertEqual(groups[0]["nbr"], 1)
+        self.assertEqual(groups[0]["refund_amount"], line.refund_amount)
+        # The RMAs split from another one share its reception move, each
+        # one reports its own received quantity
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        rma.create_return(fields.Datetime.now(), 4, rma.product_uom)
+        new_rma = rma.extract_quantity(3, rma.product_uom)
+        self.env["base"].flush()
+        lines = self.env["rma.report"].search([("rma_id", "in", (rma | new_rma).ids)])
+        self.assertEqual(sorted(lines.mapped("received_qty")), [3, 7])
+
+    def test_stored_workflow_flags(self):
+        rma = self._create_rma(self.partner, self.product, 10, self.rma_loc)
+        rma_model = self.env["rma"]
+        self.assertNotIn(rma, rma_model.search([("can_be_refunded", "=", True)]))
+        rma.action_confirm()
+        rma.reception_move_id.quantity_done = 10
+        rma.reception_move_id.picking_id._action_done()
+        ready = rma_model.search([("can_be_refunded", "=", True)])
+        self.assertIn(rma, ready)
+        self.assertIn(rma, rma_model.search([("can_be_returned", "=", True)]))
+        self.assertIn(rma, rma_model.search([("can_be_locked", "=", True)]))
+        self.assertEqual(rma.remaining_qty, 10)
+        # The flags follow the deliveries
+        delivery_form = Form(
+            self.env["rma.delivery.wizard"].with_context(
+                active_ids=rma.ids,
+                rma_delivery_type="return",
+            )
+        )
+        delivery_form.product_uom_qty = 10
+        delivery_form.save().action_deliver()
+        self.assertEqual(rma.remaining_qty, 0)
+        self.assertNotIn(rma, rma_model.search([("can_be_returned", "=", True)]))
+        self.assertNotIn(rma, rma_model.search([("can_be_refunded", "=", True)]))
+
+    def test_archive(self):
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        rma.action_refund()
+        rma.date_closed = fields.Datetime.now() - timedelta(days=40)
+        rma_model = self.env["rma"]
+        # Archiving is disabled by default
+        rma_model._cron_archive()
+        self.assertTrue(rma.active)
+        rma.company_id.rma_archive_delay = 30
+        rma_model._cron_archive(batch_size=1)
+        self.assertFalse(rma.active)
+        self.assertNotIn(rma, rma_model.search([("partner_id", "=", self.partner.id)]))
+        # The history is still available
+        self.assertIn(rma, rma.reception_move_id.rma_receiver_ids)
+        self.assertIn(
+            rma,
+            rma_model.with_context(active_test=False).search(
+                [("partner_id", "=", self.partner.id)]
+            ),
+        )
+        # Recently closed RMAs are kept
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        rma.action_refund()
+        rma_model._cron_archive()
+        self.assertTrue(rma.active)
+
+    def test_compact_chatter(self):
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        rma.action_refund()
+        rma._message_log(body="System note")
+        customer_message = rma.message_post(
+            body="Message to the customer",
+            message_type="comment",
+            subtype_xmlid="mail.mt_comment",
+        )
+        self.env["base"].flush()
+        self.env.cr.precommit.run()
+        rma.date_closed = fields.Datetime.now() - timedelta(days=40)
+        notes = rma.message_ids.filtered(
+            lambda m: m.message_type == "notification" and m.subtype_id.internal
+        )
+        self.assertGreater(len(notes), 1)
+        rma.company_id.rma_chatter_compaction_delay = 30
+        self.env["rma"]._cron_compact_chatter(batch_size=1)
+        rma.invalidate_cache()
+        self.assertFalse(notes.exists())
+        self.assertTrue(customer_message.exists())
+        summary = rma.message_ids.filtered(
+            lambda m: m.message_type == "notification" and m.subtype_id.internal
+        )
+        self.assertEqual(len(summary), 1)
+        self.assertIn("System note", summary.body)
+        # Already compacted RMAs are left untouched
+        self.env["rma"]._cron_compact_chatter()
+        self.assertTrue(summary.exists())
+
+    def test_split_into_lots(self):
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        split_form = Form(
+            self.env["rma.split.wizard"].with_context(
+                active_id=rma.id,
+                active_ids=rma.ids,
+            )
+        )
+        split_form.split_mode = "lots"
+        split_form.product_uom_qty = 3
+        action = split_form.save().action_split()
+        new_rmas = self.env["rma"].search(action["domain"])
+        self.assertEqual(len(new_rmas), 3)
+        self.assertEqual(new_rmas.mapped("product_uom_qty"), [3, 3, 3])
+        self.assertEqual(new_rmas.mapped("state"), ["received"] * 3)
+        self.assertEqual(new_rmas.origin_split_rma_id, rma)
+        self.assertEqual(rma.product_uom_qty, 1)
+        split_messages = rma.message_ids.filtered(lambda m: "Split:" in m.body)
+        self.assertEqual(len(split_messages), 1)
+        for new_rma in new_rmas:
+            self.assertIn(new_rma.name, split_messages.body)
+        # Split a list of quantities
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        new_rmas = rma.extract_quantities([2, 5], rma.product_uom)
+        self.assertEqual(sorted(new_rmas.mapped("product_uom_qty")), [2, 5])
+        self.assertEqual(rma.product_uom_qty, 3)
+        with self.assertRaises(ValidationError):
+            rma.extract_quantities([2, 2], rma.product_uom)
+
+    def test_mass_replace(self):
+        rma_1 = self._create_confirm_receive(
+            self.partner, self.product, 10, self.rma_loc
+        )
+        product_2 = self.product_product.create(
+            {"name": "Product 2 test", "type": "product"}
+        )
+        rma_2 = self._create_confirm_receive(self.partner, product_2, 5, self.rma_loc)
+        rmas = rma_1 | rma_2
+        delivery_form = Form(
+            self.env["rma.delivery.wizard"].with_context(
+                active_ids=rmas.ids,
+                rma_delivery_type="replace",
+            )
+        )
+        delivery_form.save().action_deliver()
+        self.assertEqual(set(rmas.mapped("state")), {"waiting_replacement"})
+        self.assertEqual(rma_1.delivery_move_ids.product_id, self.product)
+        self.assertEqual(rma_1.delivery_move_ids.product_uom_qty, 10)
+        self.assertEqual(rma_2.delivery_move_ids.product_id, product_2)
+        self.assertEqual(rma_2.delivery_move_ids.product_uom_qty, 5)
+        self.assertNotEqual(rma_1.procurement_group_id, rma_2.procurement_group_id)
+        self.assertEqual(rma_1.remaining_qty, 0)
+        for rma in rmas:
+            self.assertIn(
+                rma.delivery_move_ids.picking_id.name, rma.message_ids[:1].body
+            )
+
+    def test_mass_delivery_line_quantities(self):
+        rma_1 = self._create_confirm_receive(
+            self.partner, self.product, 10, self.rma_loc
+        )
+        product_2 = self.product_product.create(
+            {"name": "Product 2 test", "type": "product"}
+        )
+        rma_2 = self._create_confirm_receive(self.partner, product_2, 5, self.rma_loc)
+        rmas = rma_1 | rma_2
+        # Return part of each RMA
+        delivery_form = Form(
+            self.env["rma.delivery.wizard"].with_context(
+                active_ids=rmas.ids,
+                rma_delivery_type="return",
+            )
+        )
+        self.assertEqual(len(delivery_form.line_ids), 2)
+        with delivery_form.line_ids.edit(0) as line_form:
+            line_form.product_uom_qty = 4
+        with delivery_form.line_ids.edit(1) as line_form:
+            line_form.product_uom_qty = 0
+        delivery_form.save().action_deliver()
+        self.assertEqual(rma_1.delivery_move_ids.product_uom_qty, 4)
+        self.assertEqual(rma_1.remaining_qty, 6)
+        self.assertFalse(rma_2.delivery_move_ids)
+        self.assertEqual(rma_2.state, "received")
+        # Replace the other RMA with another product. The RMA being
+        # returned can't be replaced, so it has no line.
+        product_3 = self.product_product.create(
+            {"name": "Product 3 test", "type": "product"}
+        )
+        delivery_form = Form(
+            self.env["rma.delivery.wizard"].with_context(
+                active_ids=rmas.ids,
+                rma_delivery_type="replace",
+            )
+        )
+        self.assertEqual(len(delivery_form.line_ids), 1)
+        with delivery_form.line_ids.edit(0) as line_form:
+            line_form.product_id = product_3
+            line_form.product_uom_qty = 2
+        delivery_form.save().action_deliver()
+        self.assertEqual(rma_2.delivery_move_ids.product_id, product_3)
+        self.assertEqual(rma_2.delivery_move_ids.product_uom_qty, 2)
+        self.assertEqual(rma_2.state, "waiting_replacement")
+        self.assertEqual(rma_1.state, "waiting_return")
+
+    def test_events(self):
+        event_model = self.env["rma.event"]
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        rma.action_refund()
+        events = event_model.search([("rma_id", "=", rma.id)])
+        self.assertEqual(
+            events.mapped("event_type"), ["create", "state", "state", "state", "refund"]
+        )
+        self.assertEqual(
+            [(e.old_state, e.new_state) for e in events[1:4]],
+            [
+                ("draft", "confirmed"),
+                ("confirmed", "received"),
+                ("received", "refunded"),
+            ],
+        )
+        self.assertEqual(
+            events[-1]._to_dict()["payload"]["refund_id"], rma.refund_id.id
+        )
+        # The events of the running transaction are not exposed yet, as
+        # they could be committed after the ones of a later transaction
+        page = event_model._fetch()
+        self.assertNotIn(events[0].id, [e["id"] for e in page["events"]])
+        # Simulate the commit of the transaction
+        self.env.cr.execute(
+            "UPDATE rma_event SET transaction_id = 1 WHERE id IN %s",
+            (tuple(events.ids),),
+        )
+        event_model.invalidate_cache()
+        page = event_model._fetch(limit=2)
+        self.assertEqual([e["id"] for e in page["events"]], events[:2].ids)
+        self.assertTrue(page["has_more"])
+        page = event_model._fetch(cursor=page["cursor"], limit=10)
+        self.assertEqual([e["id"] for e in page["events"]], events[2:].ids)
+        self.assertFalse(page["has_more"])
+        # Nothing new after the last cursor
+        last_page = event_model._fetch(cursor=page["cursor"])
+        self.assertFalse(last_page["events"])
+        self.assertEqual(last_page["cursor"], page["cursor"])
+        # Transaction ids are 64 bits, the column matches the field so
+        # the updates of the module keep it
+        columns = sql.table_columns(self.env.cr, "rma_event")
+        self.assertEqual(columns["transaction_id"]["udt_name"], "int8")
+        self.assertEqual(event_model._fields["transaction_id"].column_type[0], "int8")
+        self.env.cr.execute(
+            "UPDATE rma_event SET transaction_id = %s WHERE id = %s",
+            (2**32, events[-1].id),
+        )
+        events.invalidate_cache()
+        self.assertEqual(events[-1].transaction_id, 2**32)
+        with self.assertRaises(UserError):
+            event_model._fetch(cursor="wrong")
+        with self.assertRaises(UserError):
+            event_model._fetch(limit="ten")
+
+    def test_export(self):
+        rma_1 = self._create_confirm_receive(
+            self.partner, self.product, 10, self.rma_loc
+        )
+        rma_1.action_refund()
+        rma_2 = self._create_rma(self.partner, self.product, 5, self.rma_loc)
+        rma_2.action_cancel()
+        rma_2.active = False
+        rmas = rma_1 | rma_2
+        wizard = (
+            self.env["rma.export.wizard"]
+            .with_context(active_model="rma", active_ids=rmas.ids)
+            .create({"file_format": "csv"})
+        )
+        self.assertEqual(wizard.rma_ids, rmas)
+        headers = [header for header, __ in wizard._get_columns()]
+        # Read one RMA per query
+        rows = list(wizard._iter_rows(chunk_size=1))
+        self.assertEqual([row[0] for row in rows], rmas.mapped("name"))
+        row_1 = dict(zip(headers, rows[0]))
+        self.assertEqual(row_1["Status"], "Refunded")
+        self.assertEqual(row_1["Quantity"], 10)
+        self.assertEqual(row_1["Reception"], rma_1.reception_move_id.picking_id.name)
+        self.assertEqual(row_1["Refund"], rma_1.refund_id.name)
+        wizard.include_archived = False
+        self.assertEqual([row[0] for row in wizard._iter_rows()], [rma_1.name])
+        action = wizard.action_export()
+        self.assertEqual(action["url"], "/rma/export/%d" % wizard.id)
+
+    def test_import(self):
+        self.partner.ref = "CUST-1"
+        self.product.default_code = "PROD-1"
+        lines = [
+            "partner,product,quantity,uom,origin",
+            "CUST-1,PROD-1,2,,MKT-1",
+            "CUST-1,UNKNOWN,1,,MKT-2",
+            "CUST-1,PROD-1,-1,,MKT-3",
+            "CUST-1,PROD-1,3,Units,MKT-4",
+        ]
+        wizard = self.env["rma.import.wizard"].create(
+            {
+                "file": base64.b64encode("\n".join(lines).encode()),
+                "filename": "returns.csv",
+            }
+        )
+        # One row per chunk, the rows with errors come from several chunks
+        with patch("odoo.addons.rma.wizard.rma_import.IMPORT_CHUNK_SIZE", 1):
+            wizard.action_import()
+        self.assertEqual(wizard.state, "done")
+        self.assertEqual(wizard.imported_count, 2)
+        self.assertEqual(wizard.error_count, 2)
+        rmas = self.env["rma"].search([("origin", "like", "MKT-")], order="id")
+        self.assertEqual(rmas.mapped("origin"), ["MKT-1", "MKT-4"])
+        self.assertEqual(rmas.mapped("product_uom_qty"), [2, 3])
+        self.assertEqual(rmas.partner_id, self.partner)
+        self.assertTrue(all(rmas.mapped("location_id")))
+        self.assertEqual(rmas.mapped("state"), ["draft", "draft"])
+        report = base64.b64decode(wizard.error_file).decode().splitlines()
+        self.assertEqual(wizard.error_filename, "returns_errors.csv")
+        self.assertEqual([line.split(",")[0] for line in report[1:]], ["3", "4"])
+        self.assertEqual(wizard.processed_lines, 4)
+        # The rows with errors of each chunk are gathered at the end
+        self.assertFalse(wizard._get_error_chunk_attachments())
+        # An interrupted import resumes after the lines already processed
+        lines = [line.replace("MKT-", "RES-") for line in lines]
+        wizard = self.env["rma.import.wizard"].create(
+            {
+                "file": base64.b64encode("\n".join(lines).encode()),
+                "processed_lines": 2,
+            }
+        )
+        wizard.action_import()
+        self.assertEqual(wizard.processed_lines, 4)
+        self.assertEqual((wizard.imported_count, wizard.error_count), (1, 1))
+        rmas = self.env["rma"].search([("origin", "like", "RES-")])
+        self.assertEqual(rmas.mapped("origin"), ["RES-4"])
+        # The rows of a failing chunk are reported and the import goes on
+        lines = [line.replace("RES-", "ERR-") for line in lines]
+        wizard = self.env["rma.import.wizard"].create(
+            {"file": base64.b64encode("\n".join(lines).encode())}
+        )
+        with patch.object(
+            type(wizard), "_import_chunk", side_effect=Exception("Chunk failure")
+        ), self.assertLogs("odoo.addons.rma.wizard.rma_import", "ERROR"):
+            wizard.action_import()
+        self.assertEqual(wizard.state, "done")
+        self.assertEqual((wizard.imported_count, wizard.error_count), (0, 4))
+        report = base64.b64decode(wizard.error_file).decode().splitlines()
+        self.assertEqual(
+            [line.split(",")[0] for line in report[1:]], ["2", "3", "4", "5"]
+        )
+        self.assertTrue(all(line.endswith("Chunk failure") for line in report[1:]))
+        self.assertFalse(self.env["rma"].search([("origin", "like", "ERR-")]))
+        # The missing required columns are detected before importing
+        wizard = self.env["rma.import.wizard"].create(
+            {"file": base64.b64encode(b"partner,quantity\nCUST-1,1")}
+        )
+        with self.assertRaises(UserError):
+            wizard.action_import()
+
+    def test_create_batch(self):
+        self.partner.ref = "CUST-1"
+        self.product.default_code = "PROD-1"
+        payloads = [
+            {"partner": "CUST-1", "product": "PROD-1", "quantity": 2, "origin": "A"},
+            {"partner": "CUST-1", "product": "PROD-1", "quantity": 1, "origin": "B"},
+        ]
+        rmas = self.env["rma"]._create_batch(payloads, confirm=True)
+        self.assertEqual(rmas.mapped("origin"), ["A", "B"])
+        self.assertEqual(rmas.mapped("state"), ["confirmed", "confirmed"])
+        self.assertTrue(rmas.mapped("reception_move_id"))
+        # Nothing is created when an item is not valid
+        payloads.append({"partner": "CUST-1", "product": "UNKNOWN", "quantity": 1})
+        rma_count = self.env["rma"].search_count([])
+        with self.assertRaisesRegex(ValidationError, "Item 2"):
+            self.env["rma"]._create_batch(payloads)
+        self.assertEqual(self.env["rma"].search_count([]), rma_count)
+
+    def test_idempotency_key(self):
+        key_model = self.env["rma.idempotency.key"]
+        self.assertIsNone(key_model._reserve(False))
+        self.assertIsNone(key_model._reserve("key-1"))
+        rmas = self._create_rma(self.partner, self.product, 1, self.rma_loc)
+        rmas |= self._create_rma(self.partner, self.product, 2, self.rma_loc)
+        key_model._record("key-1", rmas)
+        # A replayed request gets the RMAs of the first one
+        self.assertEqual(key_model._reserve("key-1").ids, rmas.ids)
+        # Keys are reserved per user
+        self.assertIsNone(key_model.with_user(self.user_rma)._reserve("key-1"))
+        self.assertEqual(
+            key_model.with_user(self.user_rma)._reserve("key-1"), self.env["rma"]
+        )
@@ -0,0 +1,62 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import fields
+from odoo.tests import HttpCase, new_test_user, tagged
+
+from .benchmark import RmaBenchmarkDataGenerator, RmaBenchmarkMixin
+
+
+@tagged("-at_install", "post_install", "-standard", "rma_benchmark")
+class TestRmaBenchmark(RmaBenchmarkMixin, HttpCase):
+    benchmark_suite = "rma"
+
+    def setUp(self):
+        super().setUp()
+        self.generator = RmaBenchmarkDataGenerator(self.env)
+        self.partners = self.generator.create_partners()
+        self.products = self.generator.create_products(5)
+        self.deliveries = self.generator.create_deliveries(self.partners, self.products)
+
+    def test_benchmark_workflow(self):
+        rmas = self.generator.create_rmas(self.deliveries)
+        self.measure(
+            "action_confirm", rmas, lambda: [rma.action_confirm() for rma in rmas]
+        )
+        self.measure(
+            "stock.move._action_done (reception)",
+            rmas,
+            lambda: self.generator.receive(rmas),
+        )
+        third = len(rmas) // 3
+        to_refund = rmas[:third]
+        to_return = rmas[third : 2 * third]
+        to_replace = rmas[2 * third :]
+        self.measure("action_refund", to_refund, to_refund.action_refund)
+        now = fields.Datetime.now()
+        self.measure("create_return", to_return, lambda: to_return.create_return(now))
+        warehouse = self.generator.warehouse
+        self.measure(
+            "create_replace",
+            to_replace,
+            lambda: to_replace.create_replace(now, warehouse, qty=1),
+        )
+        self.measure(
+            "extract_quantity",
+            to_replace,
+            lambda: [rma.extract_quantity(1, rma.product_uom) for rma in to_replace],
+        )
+        self.assertEqual(set(to_refund.mapped("state")), {"refunded"})
+        self.assertEqual(set(to_return.mapped("state")), {"waiting_return"})
+
+    def test_benchmark_portal_rma_list(self):
+        portal_user = new_test_user(
+            self.env, login="rma_benchmark_portal", groups="base.group_portal"
+        )
+        rmas = self.generator.create_rmas(self.deliveries)
+        rmas.message_subscribe([portal_user.partner_id.id])
+        self.authenticate("rma_benchmark_portal", "rma_benchmark_portal")
+        response = self.measure(
+            "portal /my/rmas", rmas, lambda: self.url_open("/my/rmas")
+        )
+        self.assertEqual(response.status_code, 200)
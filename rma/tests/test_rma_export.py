@@ -0,0 +1,50 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import csv
+import io
+import zipfile
+
+from odoo.tests import HttpCase, tagged
+
+from .benchmark import RmaBenchmarkDataGenerator
+
+
+@tagged("post_install", "-at_install")
+class TestRmaExport(HttpCase):
+    def setUp(self):
+        super().setUp()
+        generator = RmaBenchmarkDataGenerator(self.env, prefix="Export")
+        deliveries = generator.create_deliveries(
+            generator.create_partners(2), generator.create_products(2)
+        )
+        self.rmas = generator.create_rmas(deliveries, count=3)
+        self.authenticate("admin", "admin")
+
+    def _download(self, file_format):
+        wizard = self.env["rma.export.wizard"].create(
+            {"rma_ids": [(6, 0, self.rmas.ids)], "file_format": file_format}
+        )
+        self.env["base"].flush()
+        response = self.url_open(wizard.action_export()["url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("RMAs.%s" % file_format, response.headers["Content-Disposition"])
+        return response
+
+    def test_export_csv(self):
+        response = self._download("csv")
+        self.assertEqual(response.headers["Content-Type"], "text/csv;charset=utf-8")
+        rows = list(csv.reader(io.StringIO(response.content.decode())))
+        self.assertEqual(rows[0][0], "Reference")
+        self.assertEqual([row[0] for row in rows[1:]], self.rmas.mapped("name"))
+
+    def test_export_xlsx(self):
+        response = self._download("xlsx")
+        self.assertEqual(
+            response.headers["Content-Type"],
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+        with zipfile.ZipFile(io.BytesIO(response.content)) as workbook:
+            sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        for name in self.rmas.mapped("name"):
+            self.assertIn(name, sheet)
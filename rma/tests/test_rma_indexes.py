@@ -0,0 +1,77 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo.tests import SavepointCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestRmaIndexes(SavepointCase):
+    """Check that the planner can answer the dominant RMA queries with
+    the indexes of the module. The test tables are too small for the
+    planner to prefer an index over a sequential scan, so sequential
+    scans are disabled while the queries are explained.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env.company
+        cls.env["base"].flush()
+        cls.env.cr.execute("ANALYZE rma")
+
+    def _explain(self, query, params=None):
+        self.env.cr.execute("SET enable_seqscan = off")
+        try:
+            self.env.cr.execute("EXPLAIN " + query, params)
+            return "\n".join(row[0] for row in self.env.cr.fetchall())
+        finally:
+            self.env.cr.execute("RESET enable_seqscan")
+
+    def _assert_index_used(self, plan, index_names):
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            "None of the indexes %s is used by the plan:\n%s" % (index_names, plan),
+        )
+
+    def test_indexes_exist(self):
+        for name in self.env["rma"]._get_indexes():
+            self.env.cr.execute(
+                "SELECT 1 FROM pg_indexes WHERE indexname = %s", (name,)
+            )
+            self.assertTrue(self.env.cr.fetchone(), name)
+
+    def test_company_state_index(self):
+        plan = self._explain(
+            "SELECT id FROM rma WHERE company_id = %s AND state = %s",
+            (self.company.id, "received"),
+        )
+        self._assert_index_used(
+            plan, ["rma_company_id_state_index", "rma_unresolved_company_id_date_index"]
+        )
+
+    def test_order_index(self):
+        plan = self._explain("SELECT id FROM rma ORDER BY date DESC, priority LIMIT 80")
+        self._assert_index_used(plan, ["rma_date_desc_priority_index"])
+
+    def test_unresolved_index(self):
+        plan = self._explain(
+            """
+            SELECT id FROM rma
+            WHERE company_id = %s AND state NOT IN %s
+            ORDER BY date DESC, priority
+            LIMIT 80
+            """,
+            (
+                self.company.id,
+                tuple(self.env["rma"]._get_unresolved_excluded_states()),
+            ),
+        )
+        self._assert_index_used(plan, ["rma_unresolved_company_id_date_index"])
+
+    def test_reverse_lookup_indexes(self):
+        plan = self._explain("SELECT id FROM stock_move WHERE rma_id = 1")
+        self._assert_index_used(plan, ["stock_move_rma_id_index"])
+        plan = self._explain("SELECT id FROM account_move_line WHERE rma_id = 1")
+        self._assert_index_used(plan, ["account_move_line_rma_id_index"])
+        plan = self._explain("SELECT id FROM rma WHERE reception_move_id = 1")
+        self._assert_index_used(plan, ["rma_reception_move_id_index"])
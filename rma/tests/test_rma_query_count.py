@@ -0,0 +1,177 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import fields
+from odoo.tests import HttpCase, SavepointCase, new_test_user, tagged
+
+from .benchmark import RmaBenchmarkDataGenerator
+
+SIZES = (1, 10, 100)
+
+
+class RmaQueryCountMixin(object):
+    """Guard the query budget of the RMA hot paths.
+
+    Every operation is run on 1, 10 and 100 records. The number of queries
+    must stay under `fixed + per_record * size` (see QUERY_BUDGETS), and
+    each record added between the 10 and the 100 records runs must not
+    cost more than `per_record` queries, so a new query per record or a
+    super-linear pattern fails even if the fixed part has some margin.
+
+    The budgets are upper bounds of the queries each operation needs
+    without per-record lookups (prefetched reads, grouped creates), see
+    the comments in QUERY_BUDGETS. Lower them when an operation gets
+    cheaper.
+    """
+
+    # operation: (fixed queries, queries per record)
+    QUERY_BUDGETS = {}
+
+    def setUp(self):
+        super().setUp()
+        self.generator = RmaBenchmarkDataGenerator(self.env, prefix="QueryCount")
+        partners = self.generator.create_partners(5)
+        products = self.generator.create_products(5)
+        self.deliveries = self.generator.create_deliveries(partners, products)
+
+    def _count_queries(self, func):
+        self.env["base"].flush()
+        self.env.cache.invalidate()
+        queries_before = self.cr.sql_log_count
+        func()
+        self.env["base"].flush()
+        return self.cr.sql_log_count - queries_before
+
+    def _assert_query_scaling(self, operation, prepare, run):
+        counts = {}
+        for size in SIZES:
+            records = prepare(size)
+            counts[size] = self._count_queries(lambda: run(records))
+        fixed, per_record = self.QUERY_BUDGETS[operation]
+        for size, count in counts.items():
+            self.assertLessEqual(
+                count,
+                fixed + per_record * size,
+                "%s on %d records exceeds its query budget: %s"
+                % (operation, size, counts),
+            )
+        self.assertLessEqual(
+            (counts[100] - counts[10]) / 90,
+            per_record,
+            "%s costs more than %s queries per additional record: %s"
+            % (operation, per_record, counts),
+        )
+        return counts
+
+    def _prepare_confirmed(self, size):
+        rmas = self.generator.create_rmas(self.deliveries, count=size)
+        for rma in rmas:
+            rma.action_confirm()
+        return rmas
+
+    def _prepare_received(self, size):
+        rmas = self._prepare_confirmed(size)
+        self.generator.receive(rmas)
+        return rmas
+
+
+@tagged("post_install", "-at_install")
+class TestRmaQueryCount(RmaQueryCountMixin, SavepointCase):
+    QUERY_BUDGETS = {
+        # One action_confirm call per RMA: state write, picking type and
+        # partner reads, event and KPI rows, confirmation email
+        "confirm": (30, 35),
+        # Move lines are created one by one by the stock reservation
+        "receive": (60, 15),
+        # One refund per partner, its lines are created at once
+        "refund": (80, 12),
+        # One picking per shipping address, moves created at once
+        "return": (60, 12),
+        # One procurement group per RMA, procurements run at once
+        "replace": (60, 15),
+        # One extract_quantity call per RMA, each one copies the RMA
+        "split": (20, 25),
+        # New RMAs created at once from a single RMA
+        "split_lots": (30, 6),
+    }
+
+    def test_query_count_confirm(self):
+        self._assert_query_scaling(
+            "confirm",
+            lambda size: self.generator.create_rmas(self.deliveries, count=size),
+            lambda rmas: [rma.action_confirm() for rma in rmas],
+        )
+
+    def test_query_count_receive(self):
+        self._assert_query_scaling(
+            "receive", self._prepare_confirmed, self.generator.receive
+        )
+
+    def test_query_count_refund(self):
+        self._assert_query_scaling(
+            "refund", self._prepare_received, lambda rmas: rmas.action_refund()
+        )
+
+    def test_query_count_return(self):
+        now = fields.Datetime.now()
+        self._assert_query_scaling(
+            "return", self._prepare_received, lambda rmas: rmas.create_return(now)
+        )
+
+    def _replace(self, rmas):
+        # Each RMA is replaced by one unit of its own product
+        rmas.create_replace(fields.Datetime.now(), self.generator.warehouse, qty=1)
+
+    def test_query_count_replace(self):
+        self._assert_query_scaling("replace", self._prepare_received, self._replace)
+
+    def test_query_count_split(self):
+        def prepare(size):
+            rmas = self._prepare_received(size)
+            self._replace(rmas)
+            return rmas
+
+        self._assert_query_scaling(
+            "split",
+            prepare,
+            lambda rmas: [rma.extract_quantity(1, rma.product_uom) for rma in rmas],
+        )
+
+    def test_query_count_split_lots(self):
+        def prepare(size):
+            # One RMA split into `size` lots of one unit
+            rma = self.generator.create_rmas(self.deliveries, count=1, qty=size + 1)
+            rma.action_confirm()
+            self.generator.receive(rma)
+            return rma
+
+        self._assert_query_scaling(
+            "split_lots",
+            prepare,
+            lambda rma: rma.extract_quantities(
+                [1.0] * int(rma.product_uom_qty - 1), rma.product_uom
+            ),
+        )
+
+
+@tagged("post_install", "-at_install")
+class TestRmaPortalQueryCount(RmaQueryCountMixin, HttpCase):
+    # Only the first page of RMAs is rendered, with prefetched reads
+    QUERY_BUDGETS = {"portal_list": (60, 1)}
+
+    def test_query_count_portal_list(self):
+        portal_user = new_test_user(
+            self.env, login="rma_query_count_portal", groups="base.group_portal"
+        )
+        self.authenticate("rma_query_count_portal", "rma_query_count_portal")
+
+        def prepare(size):
+            # Only the RMAs of this size are visible to the portal user
+            self.env["rma"].search([]).message_unsubscribe([portal_user.partner_id.id])
+            rmas = self.generator.create_rmas(self.deliveries, count=size)
+            rmas.message_subscribe([portal_user.partner_id.id])
+            return rmas
+
+        self._assert_query_scaling(
+            "portal_list", prepare, lambda rmas: self.url_open("/my/rmas")
+        )
@@ -1,6 +1,8 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 from . import rma_delivery
+from . import rma_export
 from . import rma_finalization_wizard
+from . import rma_import
 from . import rma_split
 from . import stock_picking_return
@@ -35,6 +35,15 @@ class RmaReDeliveryWizard(models.TransientModel):
         string="Group RMA returns by customer address and warehouse",
         default=lambda self: self.env.company.rma_return_grouping,
     )
+    run_in_background = fields.Boolean(
+        help="Create the returns in background. Follow their progress in "
+        "RMA > Jobs. Replacements are always created right away.",
+    )
+    line_ids = fields.One2many(
+        comodel_name="rma.delivery.wizard.line",
+        inverse_name="wizard_id",
+        string="Lines",
+    )
 
     @api.constrains("product_uom_qty")
     def _check_product_uom_qty(self):
@@ -67,8 +76,33 @@ class RmaReDeliveryWizard(models.TransientModel):
             product_id=product_id,
             product_uom_qty=product_uom_qty,
         )
+        if len(rma) > 1:
+            res["line_ids"] = [
+                (0, 0, line_vals)
+                for line_vals in self._prepare_line_values(rma, delivery_type)
+            ]
         return res
 
+    @api.model
+    def _prepare_line_values(self, rmas, delivery_type):
+        """One line per RMA that can be delivered, with its product and
+        remaining quantity.
+        """
+        if delivery_type == "return":
+            rmas = rmas.filtered("can_be_returned")
+        else:
+            rmas = rmas.filtered("can_be_replaced")
+        return [
+            {
+                "rma_id": rma.id,
+                "product_id": rma.product_id.id,
+                "product_uom_qty": rma.remaining_qty,
+                "product_uom": rma.product_uom.id,
+            }
+            for rma in rmas
+            if rma.remaining_qty > 0
+        ]
+
     @api.onchange("product_id")
     def _onchange_product_id(self):
         if self.product_id:
@@ -79,6 +113,8 @@ class RmaReDeliveryWizard(models.TransientModel):
         self.ensure_one()
         rma_ids = self.env.context.get("active_ids")
         rma = self.env["rma"].browse(rma_ids)
+        if self.rma_count > 1:
+            return self._deliver_lines()
         if self.type == "replace":
             rma.create_replace(
                 self.scheduled_date,
@@ -88,9 +124,94 @@ class RmaReDeliveryWizard(models.TransientModel):
                 self.product_uom,
             )
         elif self.type == "return":
-            qty = uom = None
-            if self.rma_count == 1:
-                qty, uom = self.product_uom_qty, self.product_uom
-            rma.with_context(
-                rma_return_grouping=self.rma_return_grouping
-            ).create_return(self.scheduled_date, qty, uom)
+            rma = rma.with_context(rma_return_grouping=self.rma_return_grouping)
+            if self.run_in_background:
+                rma._ensure_can_be_returned()
+                rma.env["rma.job"]._enqueue(
+                    rma,
+                    "create_return",
+                    scheduled_date=fields.Datetime.to_string(self.scheduled_date),
+                    qty=self.product_uom_qty,
+                    uom_id=self.product_uom.id,
+                )
+                return
+            rma.create_return(
+                self.scheduled_date, self.product_uom_qty, self.product_uom
+            )
+
+    def _deliver_lines(self):
+        """Return or replace the RMAs of the lines all at once, each one
+        with the quantity of its line.
+        """
+        lines = self.line_ids.filtered(lambda line: line.product_uom_qty > 0)
+        if not lines:
+            raise ValidationError(_("There is no quantity to deliver."))
+        rmas = lines.mapped("rma_id")
+        if self.type == "replace":
+            rmas.create_replace(
+                self.scheduled_date,
+                self.warehouse_id,
+                replacements={
+                    line.rma_id.id: (
+                        line.product_id,
+                        line.product_uom_qty,
+                        line.product_uom,
+                    )
+                    for line in lines
+                },
+            )
+        elif self.type == "return":
+            rmas = rmas.with_context(rma_return_grouping=self.rma_return_grouping)
+            if self.run_in_background:
+                rmas._ensure_can_be_returned()
+                self.env["rma.job"].with_context(
+                    rma_return_grouping=self.rma_return_grouping
+                )._enqueue(
+                    rmas,
+                    "create_return",
+                    scheduled_date=fields.Datetime.to_string(self.scheduled_date),
+                    quantities={
+                        line.rma_id.id: (line.product_uom_qty, line.product_uom.id)
+                        for line in lines
+                    },
+                )
+                return
+            rmas.create_return(
+                self.scheduled_date,
+                quantities={
+                    line.rma_id.id: (line.product_uom_qty, line.product_uom)
+                    for line in lines
+                },
+            )
+
+
+class RmaDeliveryWizardLine(models.TransientModel):
+    _name = "rma.delivery.wizard.line"
+    _description = "RMA Delivery Wizard Line"
+
+    wizard_id = fields.Many2one(
+        comodel_name="rma.delivery.wizard",
+        required=True,
+        ondelete="cascade",
+    )
+    rma_id = fields.Many2one(comodel_name="rma", string="RMA", required=True)
+    product_id = fields.Many2one(
+        comodel_name="product.product",
+        string="Product",
+        required=True,
+    )
+    product_uom_qty = fields.Float(
+        string="Quantity",
+        digits="Product Unit of Measure",
+    )
+    product_uom = fields.Many2one(
+        comodel_name="uom.uom",
+        string="Unit of measure",
+        required=True,
+    )
+    uom_category_id = fields.Many2one(related="product_id.uom_id.category_id")
+
+    @api.onchange("product_id")
+    def _onchange_product_id(self):
+        if self.product_id and self.product_uom.category_id != self.uom_category_id:
+            self.product_uom = self.product_id.uom_id
@@ -0,0 +1,177 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from datetime import timedelta
+
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+
+# Number of RMAs read by each query of the export
+EXPORT_CHUNK_SIZE = 2000
+
+
+class RmaExportWizard(models.TransientModel):
+    """Export the RMAs with their logistics and accounting data.
+
+    The rows are read with SQL in chunks of consecutive ids and sent to
+    the browser as they are read by the '/rma/export/<wizard id>' route,
+    so the memory used doesn't depend on the number of RMAs exported.
+    """
+
+    _name = "rma.export.wizard"
+    _description = "RMA Export Wizard"
+
+    date_from = fields.Date()
+    date_to = fields.Date()
+    rma_ids = fields.Many2many(
+        comodel_name="rma",
+        string="RMAs",
+        help="Leave empty to export all the RMAs of the period.",
+    )
+    file_format = fields.Selection(
+        selection=[("csv", "CSV"), ("xlsx", "Excel (XLSX)")],
+        string="Format",
+        default="xlsx",
+        required=True,
+    )
+    include_archived = fields.Boolean(default=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if (
+            "rma_ids" in fields_list
+            and self.env.context.get("active_model") == "rma"
+            and self.env.context.get("active_ids")
+        ):
+            res["rma_ids"] = [(6, 0, self.env.context["active_ids"])]
+        return res
+
+    @api.constrains("date_from", "date_to")
+    def _check_dates(self):
+        for wizard in self:
+            if (
+                wizard.date_from
+                and wizard.date_to
+                and wizard.date_from > wizard.date_to
+            ):
+                raise ValidationError(
+                    _("The start date must be earlier than the end date.")
+                )
+
+    def action_export(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_url",
+            "url": "/rma/export/%d" % self.id,
+            "target": "self",
+        }
+
+    def _get_filename(self):
+        self.ensure_one()
+        return "%s.%s" % (_("RMAs"), self.file_format)
+
+    def _get_domain(self):
+        self.ensure_one()
+        domain = []
+        if self.rma_ids:
+            domain.append(("id", "in", self.rma_ids.ids))
+        if self.date_from:
+            domain.append(("date", ">=", fields.Datetime.to_datetime(self.date_from)))
+        if self.date_to:
+            domain.append(
+                (
+                    "date",
+                    "<",
+                    fields.Datetime.to_datetime(self.date_to) + timedelta(days=1),
+                )
+            )
+        return domain
+
+    @api.model
+    def _get_columns(self):
+        """Columns of the export as a list of (header, SQL expression).
+        The expressions can use the aliases of the tables joined in
+        `_get_rows_query`.
+        """
+        return [
+            (_("Reference"), "rma.name"),
+            (_("Date"), "rma.date"),
+            (_("Status"), "rma.state"),
+            (_("Company"), "company.name"),
+            (_("Customer"), "partner.name"),
+            (_("Product Reference"), "product.default_code"),
+            (_("Product"), "template.name"),
+            (_("Quantity"), "rma.product_uom_qty"),
+            (_("Unit of Measure"), "uom.name"),
+            (_("Origin delivery"), "origin_picking.name"),
+            (_("Reception"), "reception_picking.name"),
+            (
+                _("Deliveries"),
+                """(
+                    SELECT string_agg(delivery_picking.name, ', '
+                        ORDER BY delivery_picking.id)
+                    FROM stock_picking delivery_picking
+                    WHERE delivery_picking.id IN (
+                        SELECT picking_id FROM stock_move WHERE rma_id = rma.id
+                    )
+                )""",
+            ),
+            (_("Delivered quantity"), "rma.delivered_qty"),
+            (_("Refund"), "refund.name"),
+            (_("Refunded amount"), "refund_line.price_subtotal"),
+            (_("Closing date"), "rma.date_closed"),
+        ]
+
+    @api.model
+    def _get_rows_query(self):
+        return """
+            SELECT {columns}
+            FROM rma
+            LEFT JOIN res_company company ON company.id = rma.company_id
+            LEFT JOIN res_partner partner ON partner.id = rma.partner_id
+            LEFT JOIN product_product product ON product.id = rma.product_id
+            LEFT JOIN product_template template
+                ON template.id = product.product_tmpl_id
+            LEFT JOIN uom_uom uom ON uom.id = rma.product_uom
+            LEFT JOIN stock_picking origin_picking
+                ON origin_picking.id = rma.picking_id
+            LEFT JOIN stock_move reception_move
+                ON reception_move.id = rma.reception_move_id
+            LEFT JOIN stock_picking reception_picking
+                ON reception_picking.id = reception_move.picking_id
+            LEFT JOIN account_move refund ON refund.id = rma.refund_id
+            LEFT JOIN account_move_line refund_line
+                ON refund_line.id = rma.refund_line_id
+            WHERE rma.id IN %s
+            ORDER BY rma.id
+        """.format(
+            columns=", ".join(expression for __, expression in self._get_columns())
+        )
+
+    def _iter_rows(self, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield the rows of the export, reading the RMAs allowed to the
+        user by chunks of increasing ids. Only the current chunk is kept
+        in memory.
+        """
+        self.ensure_one()
+        rma_model = self.env["rma"].with_context(active_test=not self.include_archived)
+        domain = self._get_domain()
+        states = dict(rma_model._fields["state"]._description_selection(self.env))
+        state_index = [expression for __, expression in self._get_columns()].index(
+            "rma.state"
+        )
+        query = self._get_rows_query()
+        last_id = 0
+        while True:
+            rma_ids = rma_model.search(
+                domain + [("id", ">", last_id)], order="id", limit=chunk_size
+            ).ids
+            if not rma_ids:
+                break
+            self.env.cr.execute(query, (tuple(rma_ids),))
+            for row in self.env.cr.fetchall():
+                row = list(row)
+                row[state_index] = states.get(row[state_index], row[state_index])
+                yield row
+            last_id = rma_ids[-1]
@@ -15,4 +15,4 @@ class RmaFinalizationWizard(models.TransientModel):
         self.ensure_one()
         rma_ids = self.env.context.get("active_ids")
         rma = self.env["rma"].browse(rma_ids)
-        rma.write({"finalization_id": self.finalization_id, "state": "finished"})
+        rma._apply_state_event("finish", {"finalization_id": self.finalization_id.id})
@@ -0,0 +1,229 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import base64
+import csv
+import io
+import logging
+import threading
+from itertools import islice
+
+from odoo import _, fields, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Number of rows validated and created at once
+IMPORT_CHUNK_SIZE = 1000
+# Name prefix of the attachments holding the rows with errors of a chunk
+ERROR_CHUNK_PREFIX = "rma_import_errors_"
+
+
+class RmaImportWizard(models.TransientModel):
+    """Import RMAs in draft from a CSV file.
+
+    The file is stored as an attachment and read from it as a stream,
+    row by row, and processed by chunks: the records referenced by a
+    chunk are resolved with one search per model, the rows are validated
+    together and the valid ones are created with a single create call.
+    The invalid rows are reported in a CSV file instead of stopping the
+    import. Each chunk is committed with its errors and the number of
+    processed lines, so an interrupted import resumes after the last
+    committed chunk when it is run again.
+    """
+
+    _name = "rma.import.wizard"
+    _description = "RMA Import Wizard"
+
+    state = fields.Selection(
+        selection=[("draft", "Draft"), ("done", "Done")],
+        default="draft",
+        required=True,
+    )
+    file = fields.Binary(required=True)
+    filename = fields.Char()
+    delimiter = fields.Char(default=",", required=True, size=1)
+    processed_lines = fields.Integer(
+        readonly=True,
+        help="Lines of the file already processed, a new run resumes after them.",
+    )
+    imported_count = fields.Integer(string="Imported RMAs", readonly=True)
+    error_count = fields.Integer(string="Rows with errors", readonly=True)
+    error_file = fields.Binary(string="Error report", readonly=True, attachment=False)
+    error_filename = fields.Char(readonly=True)
+
+    def _open_file(self):
+        """Binary stream of the uploaded file"""
+        self.ensure_one()
+        attachment = (
+            self.env["ir.attachment"]
+            .sudo()
+            .search(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_field", "=", "file"),
+                    ("res_id", "=", self.id),
+                ],
+                limit=1,
+            )
+        )
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), "rb")
+        return io.BytesIO(attachment.raw or b"")
+
+    def action_import(self):
+        self.ensure_one()
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        with self._open_file() as binary_file:
+            reader = csv.DictReader(
+                io.TextIOWrapper(binary_file, encoding="utf-8-sig"),
+                delimiter=self.delimiter,
+            )
+            missing = {"product", "quantity"} - set(reader.fieldnames or [])
+            if missing:
+                raise UserError(
+                    _("The file doesn't have the required column(s): %s")
+                    % ", ".join(sorted(missing))
+                )
+            cache = {}
+            # The header is the first line of the file. The lines processed
+            # by a previous run are skipped.
+            lines = islice(enumerate(reader, start=2), self.processed_lines, None)
+            while True:
+                chunk = list(islice(lines, IMPORT_CHUNK_SIZE))
+                if not chunk:
+                    break
+                try:
+                    with self.env.cr.savepoint():
+                        created, errors = self._import_chunk(chunk, cache)
+                except Exception as error:
+                    _logger.exception(
+                        "RMA import: lines %s to %s failed", chunk[0][0], chunk[-1][0]
+                    )
+                    # Drop the values of the rolled back RMAs from the cache
+                    self.env.clear()
+                    created = 0
+                    errors = [
+                        (line_number, row, str(error)) for line_number, row in chunk
+                    ]
+                self._record_chunk(reader.fieldnames, len(chunk), created, errors)
+                if auto_commit:
+                    self.env.cr.commit()  # pylint: disable=invalid-commit
+                # Keep the memory used constant whatever the size of the file
+                self.env["base"].flush()
+                self.env.cache.invalidate()
+            self._build_error_report(reader.fieldnames)
+        _logger.info(
+            "RMA import: %s RMAs created, %s rows with errors",
+            self.imported_count,
+            self.error_count,
+        )
+        self.write({"state": "done", "file": False})
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": self._name,
+            "res_id": self.id,
+            "view_mode": "form",
+            "target": "new",
+        }
+
+    def _record_chunk(self, fieldnames, line_count, created, errors):
+        """Save the progress of the import and the rows with errors of a
+        chunk, in an attachment of its own so the report collected so far
+        isn't rewritten for every chunk.
+        """
+        if errors:
+            report = io.StringIO()
+            report_writer = csv.writer(report)
+            for line_number, row, error in sorted(errors, key=lambda e: e[0]):
+                report_writer.writerow(
+                    [line_number] + [row.get(column) for column in fieldnames] + [error]
+                )
+            self.env["ir.attachment"].sudo().create(
+                {
+                    "name": "%s%s.csv" % (ERROR_CHUNK_PREFIX, errors[0][0]),
+                    "res_model": self._name,
+                    "res_id": self.id,
+                    "raw": report.getvalue().encode(),
+                }
+            )
+        self.write(
+            {
+                "processed_lines": self.processed_lines + line_count,
+                "imported_count": self.imported_count + created,
+                "error_count": self.error_count + len(errors),
+            }
+        )
+
+    def _get_error_chunk_attachments(self):
+        return (
+            self.env["ir.attachment"]
+            .sudo()
+            .search(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_id", "=", self.id),
+                    ("name", "=like", ERROR_CHUNK_PREFIX + "%"),
+                ],
+                order="id",
+            )
+        )
+
+    def _build_error_report(self, fieldnames):
+        """Gather the rows with errors of all the chunks in the error
+        report, once the whole file is processed.
+        """
+        attachments = self._get_error_chunk_attachments()
+        if not attachments:
+            return
+        header = io.StringIO()
+        csv.writer(header).writerow([_("Line")] + fieldnames + [_("Error")])
+        report = io.BytesIO()
+        report.write(header.getvalue().encode())
+        for attachment in attachments:
+            report.write(attachment.raw)
+        filename = self.filename or "rma"
+        self.write(
+            {
+                "error_file": base64.b64encode(report.getvalue()),
+                "error_filename": "%s_errors.csv" % filename.rsplit(".", 1)[0],
+            }
+        )
+        attachments.unlink()
+
+    def _import_chunk(self, chunk, cache):
+        """Create the RMAs of a chunk of (line number, row). Return the
+        number of created RMAs and a list of (line number, row, error)
+        with the rows that couldn't be imported.
+        """
+        rma_model = self.env["rma"].with_context(
+            mail_create_nolog=True, mail_create_nosubscribe=True
+        )
+        results = rma_model._prepare_bulk_values([row for __, row in chunk], cache)
+        errors = []
+        valid = []
+        for (line_number, row), (vals, error) in zip(chunk, results):
+            if vals:
+                valid.append((line_number, row, vals))
+            else:
+                errors.append((line_number, row, error))
+        if not valid:
+            return 0, errors
+        try:
+            with self.env.cr.savepoint():
+                rma_model.create([vals for __, __, vals in valid])
+            return len(valid), errors
+        except Exception:
+            # Drop the values of the rolled back RMAs from the cache
+            self.env.clear()
+        # Find the rows failing by creating them one by one
+        created = 0
+        for line_number, row, vals in valid:
+            try:
+                with self.env.cr.savepoint():
+                    rma_model.create(vals)
+                created += 1
+            except Exception as error:
+                self.env.clear()
+                errors.append((line_number, row, str(error)))
+        return created, errors
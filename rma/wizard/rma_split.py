@@ -1,7 +1,11 @@
 # Copyright 2020 Tecnativa - Ernesto Tejeda
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import re
+
 from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
+from odoo.tools import float_is_zero
 
 
 class RmaReSplitWizard(models.TransientModel):
@@ -12,11 +16,26 @@ class RmaReSplitWizard(models.TransientModel):
         comodel_name="rma",
         string="RMA",
     )
+    split_mode = fields.Selection(
+        selection=[
+            ("quantity", "Extract a quantity"),
+            ("quantities", "Extract several quantities"),
+            ("lots", "Split into lots"),
+        ],
+        default="quantity",
+        required=True,
+    )
     product_uom_qty = fields.Float(
         string="Quantity to extract",
         digits="Product Unit of Measure",
         required=True,
-        help="Quantity to extract to a new RMA.",
+        help="Quantity to extract to a new RMA. When splitting into lots, "
+        "quantity of each lot.",
+    )
+    quantities = fields.Char(
+        string="Quantities to extract",
+        help="Quantities separated by commas. A new RMA is extracted for "
+        "each one of them.",
     )
     product_uom = fields.Many2one(
         comodel_name="uom.uom",
@@ -54,11 +73,55 @@ class RmaReSplitWizard(models.TransientModel):
         )
         return res
 
+    def _get_quantities(self):
+        """Quantities to extract, in the unit of measure of the wizard"""
+        self.ensure_one()
+        if self.split_mode == "quantities":
+            try:
+                return [
+                    float(qty)
+                    for qty in re.split(r"[,;\s]+", self.quantities or "")
+                    if qty
+                ]
+            except ValueError:
+                raise ValidationError(
+                    _("'%s' is not a valid list of quantities.") % self.quantities
+                )
+        if self.split_mode == "lots":
+            return self._get_lot_quantities()
+        return [self.product_uom_qty]
+
+    def _get_lot_quantities(self):
+        """Lots of the wizard quantity in which the remaining quantity of
+        the RMA is split. The RMA keeps the rest of the division, or a
+        whole lot if there's no rest.
+        """
+        rounding = self.product_uom.rounding
+        remaining_qty = self.rma_id.product_uom._compute_quantity(
+            self.rma_id.remaining_qty, self.product_uom
+        )
+        lot_count = int(remaining_qty // self.product_uom_qty)
+        rest = remaining_qty - lot_count * self.product_uom_qty
+        # No rest (exact division up to the UoM rounding): one of the lots
+        # stays in the RMA
+        if float_is_zero(rest, precision_rounding=rounding):
+            lot_count -= 1
+        if lot_count <= 0:
+            raise ValidationError(
+                _("The remaining quantity of the RMA fits in a single lot.")
+            )
+        return [self.product_uom_qty] * lot_count
+
     def action_split(self):
         self.ensure_one()
-        extracted_rma = self.rma_id.extract_quantity(
-            self.product_uom_qty, self.product_uom
+        extracted_rmas = self.rma_id.extract_quantities(
+            self._get_quantities(), self.product_uom
         )
+        if len(extracted_rmas) > 1:
+            action = self.env["ir.actions.actions"]._for_xml_id("rma.rma_action")
+            action["name"] = _("Extracted RMAs")
+            action["domain"] = [("id", "in", extracted_rmas.ids)]
+            return action
         return {
             "name": _("Extracted RMA"),
             "type": "ir.actions.act_window",
@@ -66,5 +129,5 @@ class RmaReSplitWizard(models.TransientModel):
             "view_mode": "form",
             "res_model": "rma",
             "views": [(self.env.ref("rma.rma_view_form").id, "form")],
-            "res_id": extracted_rma.id,
+            "res_id": extracted_rmas.id,
         }
@@ -31,9 +31,19 @@ class Rma(models.Model):
             picking_form.company_id, picking_form.partner_id
         )
 
-    def create_replace(self, scheduled_date, warehouse, product, qty, uom):
+    def create_replace(
+        self,
+        scheduled_date,
+        warehouse,
+        product=None,
+        qty=None,
+        uom=None,
+        replacements=None,
+    ):
         existing_pickings = self.delivery_move_ids.mapped("picking_id")
-        super().create_replace(scheduled_date, warehouse, product, qty, uom)
+        super().create_replace(
+            scheduled_date, warehouse, product, qty, uom, replacements
+        )
         new_pickings = self.delivery_move_ids.mapped("picking_id") - existing_pickings
         for picking in new_pickings:
             picking.carrier_id = self._get_default_carrier_id(
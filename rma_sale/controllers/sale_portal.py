@@ -2,14 +2,28 @@
 # Copyright 2022 Tecnativa - Víctor Martínez
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+import re
+import uuid
+
 from odoo import _, http
 from odoo.exceptions import AccessError, MissingError
 from odoo.http import request
 
 from odoo.addons.sale.controllers.portal import CustomerPortal
 
+# Names of the wizard line fields posted by the RMA request form, like
+# '3-product_id': index of the line and field name
+LINE_FIELD_KEY_RE = re.compile(r"^(\w+)-(\w+)$")
+
 
 class CustomerPortal(CustomerPortal):
+    def _order_get_page_view_values(self, order, access_token, **kwargs):
+        values = super()._order_get_page_view_values(order, access_token, **kwargs)
+        # Sent back by the RMA request form, so resubmitting it doesn't
+        # create the RMAs again
+        values["rma_idempotency_token"] = uuid.uuid4().hex
+        return values
+
     @http.route(
         ["/my/orders/<int:order_id>/requestrma"],
         type="http",
@@ -24,25 +38,53 @@ class CustomerPortal(CustomerPortal):
             )
         except (AccessError, MissingError):
             return request.redirect("/my")
+        idempotency_token = post.pop("idempotency_token", False)
+        key_model = request.env["rma.idempotency.key"]
+        rma = key_model._reserve(idempotency_token)
+        if rma is None:
+            rma = self._request_rma_create(order_id, post)
+            key_model._record(idempotency_token, rma)
+        else:
+            rma = rma.sudo()
+        user_has_group_portal = request.env.user.has_group(
+            "base.group_portal"
+        ) or request.env.user.has_group("base.group_public")
+        if len(rma) == 0:
+            route = order_sudo.get_portal_url()
+        elif len(rma) == 1:
+            route = rma._get_share_url() if user_has_group_portal else rma.access_url
+        else:
+            route = (
+                order_sudo._get_share_url()
+                if user_has_group_portal
+                else "/my/rmas?sale_id=%d" % order_id
+            )
+        return request.redirect(route)
+
+    def _request_rma_create(self, order_id, post):
+        """Create the RMAs requested from the portal form"""
         order_obj = request.env["sale.order"]
         wizard_obj = request.env["sale.order.rma.wizard"].sudo()
-        wizard_line_field_types = {
-            f: d["type"] for f, d in wizard_obj.line_ids.fields_get().items()
-        }
+        wizard_line_field_types = request.env[
+            "sale.order.line.rma.wizard"
+        ]._get_field_types()
         # Set wizard line vals
         mapped_vals = {}
         custom_vals = {}
         partner_shipping_id = post.pop("partner_shipping_id", False)
         for name, value in post.items():
-            try:
-                row, field_name = name.split("-", 1)
-                if wizard_line_field_types.get(field_name) == "many2one":
-                    value = int(value) if value else False
-                mapped_vals.setdefault(row, {}).update({field_name: value})
+            match = LINE_FIELD_KEY_RE.match(name)
+            field_type = match and wizard_line_field_types.get(match.group(2))
+            if field_type == "many2one" and value and not value.isdigit():
+                field_type = False
             # Catch possible form custom fields to add them to the RMA
             # description values
-            except ValueError:
-                custom_vals.update({name: value})
+            if not field_type:
+                custom_vals[name] = value
+                continue
+            if field_type == "many2one":
+                value = int(value) if value else False
+            mapped_vals.setdefault(match.group(1), {})[match.group(2)] = value
         # If no operation is filled, no RMA will be created
         line_vals = [
             (0, 0, vals) for vals in mapped_vals.values() if vals.get("operation_id")
@@ -65,9 +107,6 @@ class CustomerPortal(CustomerPortal):
                 "custom_description": custom_description,
             }
         )
-        user_has_group_portal = request.env.user.has_group(
-            "base.group_portal"
-        ) or request.env.user.has_group("base.group_public")
         rma = wizard.sudo().create_rma(from_portal=True)
         for rec in rma:
             rec.origin += _(" (Portal)")
@@ -78,17 +117,7 @@ class CustomerPortal(CustomerPortal):
         rma.message_follower_ids.filtered(
             lambda x: x.partner_id == request.env.user.partner_id
         ).subtype_ids += request.env.ref("rma.mt_rma_notification")
-        if len(rma) == 0:
-            route = order_sudo.get_portal_url()
-        elif len(rma) == 1:
-            route = rma._get_share_url() if user_has_group_portal else rma.access_url
-        else:
-            route = (
-                order._get_share_url()
-                if user_has_group_portal
-                else "/my/rmas?sale_id=%d" % order_id
-            )
-        return request.redirect(route)
+        return rma
 
     @http.route(
         ["/my/requestrma/<int:order_id>"], type="http", auth="public", website=True
@@ -109,6 +138,7 @@ class CustomerPortal(CustomerPortal):
             "default_url": order_sudo.get_portal_url(),
             "token": access_token,
             "partner_id": order_sudo.partner_id.id,
+            "rma_idempotency_token": uuid.uuid4().hex,
         }
         if order_sudo.company_id:
             values["res_company"] = order_sudo.company_id
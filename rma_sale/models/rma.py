@@ -2,7 +2,8 @@
 # Copyright 2023 Michael Tietz (MT Software) <mtietz@mt-software.de>
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import api, fields, models
+from odoo import _, api, fields, models
+from odoo.exceptions import ValidationError
 
 
 class Rma(models.Model):
@@ -120,3 +121,64 @@ class Rma(models.Model):
             analytic_account = line.order_id.analytic_account_id
             if analytic_account:
                 line_form.analytic_account_id = analytic_account
+
+    @api.model
+    def _get_bulk_import_columns(self):
+        """'sale_order' is the name of the sale order of the returned
+        product.
+        """
+        return super()._get_bulk_import_columns() + ["sale_order"]
+
+    @api.model
+    def _get_bulk_lookups(self):
+        res = super()._get_bulk_lookups()
+        res["sale_order"] = ("sale.order", lambda keys: [("name", "in", keys)])
+        return res
+
+    @api.model
+    def _get_bulk_record_keys(self, column, record):
+        if column == "sale_order":
+            return [record.name]
+        return super()._get_bulk_record_keys(column, record)
+
+    @api.model
+    def _prefetch_bulk_records(self, cache):
+        super()._prefetch_bulk_records(cache)
+        self.env["sale.order"].browse(
+            [order_id for order_id in cache["sale_order"].values() if order_id]
+        ).mapped("order_line.move_ids.picking_id")
+
+    @api.model
+    def _prepare_bulk_document_values(self, row, product, cache):
+        """Link the RMA to the sale order and to the delivered move of the
+        product, in the given delivery if any.
+        """
+        if not row.get("sale_order"):
+            return super()._prepare_bulk_document_values(row, product, cache)
+        order = self.env["sale.order"].browse(cache["sale_order"][row["sale_order"]])
+        if row.get("picking"):
+            vals = super()._prepare_bulk_document_values(row, product, cache)
+            if vals["picking_id"] not in order.picking_ids.ids:
+                raise ValidationError(
+                    _("The delivery %(picking)s doesn't belong to %(order)s.")
+                    % {"picking": row["picking"], "order": order.name}
+                )
+        else:
+            move = order.order_line.move_ids.filtered(
+                lambda m: m.product_id == product
+                and m.state == "done"
+                and m.picking_code == "outgoing"
+            )[:1]
+            if not move:
+                raise ValidationError(
+                    _("The product '%(product)s' wasn't delivered in %(order)s.")
+                    % {"product": product.display_name, "order": order.name}
+                )
+            warehouse = move.picking_id.picking_type_id.warehouse_id
+            vals = {
+                "picking_id": move.picking_id.id,
+                "move_id": move.id,
+                "location_id": warehouse.rma_loc_id.id,
+            }
+        vals.update(order_id=order.id, partner_id=order.partner_id.id)
+        return vals
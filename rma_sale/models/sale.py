@@ -14,12 +14,15 @@ class SaleOrder(models.Model):
         inverse_name="order_id",
         string="RMAs",
         copy=False,
+        context={"active_test": False},
     )
     rma_count = fields.Integer(string="RMA count", compute="_compute_rma_count")
 
     def _compute_rma_count(self):
-        rma_data = self.env["rma"].read_group(
-            [("order_id", "in", self.ids)], ["order_id"], ["order_id"]
+        rma_data = (
+            self.env["rma"]
+            .with_context(active_test=False)
+            .read_group([("order_id", "in", self.ids)], ["order_id"], ["order_id"])
         )
         mapped_data = {r["order_id"][0]: r["order_id_count"] for r in rma_data}
         for record in self:
@@ -70,8 +73,9 @@ class SaleOrder(models.Model):
             )
         else:
             action["domain"] = [("id", "in", rma.ids)]
-        # reset context to show all related rma without default filters
-        action["context"] = {}
+        # reset context to show all related rma without default filters,
+        # archived ones included
+        action["context"] = {"active_test": False}
         return action
 
     def get_delivery_rma_data(self):
@@ -3,6 +3,7 @@
 # Copyright 2023 Michael Tietz (MT Software) <mtietz@mt-software.de>
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
+from odoo.exceptions import ValidationError
 from odoo.tests import Form, SavepointCase
 from odoo.tests.common import users
 
@@ -168,3 +169,48 @@ class TestRmaSale(SavepointCase):
             rma.product_uom_qty,
             "We should be allowed to return the product again",
         )
+
+    def test_create_batch(self):
+        self.product_1.default_code = "PROD-1"
+        rmas = self.env["rma"]._create_batch(
+            [
+                {
+                    "sale_order": self.sale_order.name,
+                    "product": "PROD-1",
+                    "quantity": 2,
+                },
+                {
+                    "sale_order": self.sale_order.name,
+                    "picking": self.order_out_picking.name,
+                    "product": "PROD-1",
+                    "quantity": 3,
+                },
+            ],
+            confirm=True,
+        )
+        self.assertEqual(len(rmas), 2)
+        self.assertEqual(rmas.order_id, self.sale_order)
+        self.assertEqual(rmas.partner_id, self.partner)
+        self.assertEqual(rmas.move_id, self.order_out_picking.move_lines)
+        self.assertEqual(rmas.location_id, self.sale_order.warehouse_id.rma_loc_id)
+        self.assertEqual(rmas.mapped("state"), ["confirmed", "confirmed"])
+        # Products not delivered by the order are rejected
+        self.product_2.default_code = "PROD-2"
+        with self.assertRaises(ValidationError):
+            self.env["rma"]._create_batch(
+                [
+                    {
+                        "sale_order": self.sale_order.name,
+                        "product": "PROD-2",
+                        "quantity": 1,
+                    }
+                ]
+            )
+
+    def test_wizard_line_field_types(self):
+        line_model = self.env["sale.order.line.rma.wizard"]
+        field_types = line_model._get_field_types()
+        self.assertEqual(field_types["product_id"], "many2one")
+        self.assertEqual(field_types["quantity"], "float")
+        # Computed once per registry load
+        self.assertIs(line_model._get_field_types(), field_types)
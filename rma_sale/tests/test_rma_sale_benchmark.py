@@ -0,0 +1,46 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo.tests import SavepointCase, tagged
+
+from odoo.addons.rma.tests.benchmark import RmaBenchmarkDataGenerator, RmaBenchmarkMixin
+
+
+@tagged("-at_install", "post_install", "-standard", "rma_benchmark")
+class TestRmaSaleBenchmark(RmaBenchmarkMixin, SavepointCase):
+    benchmark_suite = "rma_sale"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        generator = RmaBenchmarkDataGenerator(cls.env)
+        partners = generator.create_partners()
+        products = generator.create_products(5)
+        cls.orders = cls.env["sale.order"].create(
+            [
+                {
+                    "partner_id": partner.id,
+                    "order_line": [
+                        (0, 0, {"product_id": product.id, "product_uom_qty": 3})
+                        for product in products
+                    ],
+                }
+                for partner in partners
+            ]
+        )
+        cls.orders.action_confirm()
+        pickings = cls.orders.mapped("picking_ids")
+        for move in pickings.mapped("move_lines"):
+            move.quantity_done = move.product_uom_qty
+        pickings._action_done()
+
+    def test_benchmark_sale_rma_wizard(self):
+        def create_rmas():
+            for order in self.orders:
+                wizard = self.env["sale.order.rma.wizard"].browse(
+                    order.action_create_rma()["res_id"]
+                )
+                wizard.create_rma()
+
+        self.measure("sale.order.rma.wizard", self.orders, create_rmas)
+        self.assertEqual(len(self.orders.mapped("rma_ids")), len(self.orders) * 5)
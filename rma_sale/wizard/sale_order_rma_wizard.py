@@ -2,7 +2,7 @@
 # Copyright 2022 Tecnativa - Víctor Martínez
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
-from odoo import SUPERUSER_ID, _, api, fields, models
+from odoo import SUPERUSER_ID, _, api, fields, models, tools
 
 
 class SaleOrderRmaWizard(models.TransientModel):
@@ -152,6 +152,16 @@ class SaleOrderLineRmaWizard(models.TransientModel):
     )
     description = fields.Text()
 
+    @api.model
+    @tools.ormcache()
+    def _get_field_types(self):
+        """Types of the fields of the lines, computed once per registry
+        load. Used to parse the RMA requests posted from the portal.
+        """
+        return tools.frozendict(
+            {name: field.type for name, field in self._fields.items()}
+        )
+
     @api.onchange("product_id")
     def onchange_product_id(self):
         self.picking_id = False
@@ -0,0 +1,14 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+{
+    "name": "Return Merchandise Authorization Management - Vendor returns",
+    "summary": "Send the goods received on RMAs back to the suppliers",
+    "version": "14.0.1.1.0",
+    "development_status": "Beta",
+    "category": "RMA",
+    "website": "https://github.com/OCA/rma",
+    "author": "Odoo Community Association (OCA)",
+    "license": "AGPL-3",
+    "depends": ["rma", "product_warranty"],
+    "data": ["data/ir_cron_data.xml", "views/rma_views.xml"],
+}
@@ -0,0 +1,5 @@
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from . import product_supplierinfo
+from . import rma
+from . import stock_move
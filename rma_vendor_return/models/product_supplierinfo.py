@@ -0,0 +1,49 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, models
+
+
+class ProductSupplierinfo(models.Model):
+    _inherit = "product.supplierinfo"
+
+    @api.model
+    def _get_vendor_return_fields(self):
+        """Fields deciding whether the goods of an RMA go to a supplier"""
+        return [
+            "name",
+            "product_tmpl_id",
+            "product_id",
+            "company_id",
+            "sequence",
+            "warranty_return_partner",
+        ]
+
+    def _reset_vendor_return_skipped(self):
+        """Check again the RMAs skipped by the vendor returns cron"""
+        self.env["rma"].sudo().search(
+            [
+                ("vendor_return_skipped", "=", True),
+                ("product_id.product_tmpl_id", "in", self.product_tmpl_id.ids),
+            ]
+        ).write({"vendor_return_skipped": False})
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._reset_vendor_return_skipped()
+        return records
+
+    def write(self, vals):
+        reset = bool(set(vals) & set(self._get_vendor_return_fields()))
+        if reset:
+            # The products the lines applied to before the change
+            self._reset_vendor_return_skipped()
+        res = super().write(vals)
+        if reset:
+            self._reset_vendor_return_skipped()
+        return res
+
+    def unlink(self):
+        self._reset_vendor_return_skipped()
+        return super().unlink()
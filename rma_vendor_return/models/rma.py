@@ -0,0 +1,205 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+import logging
+import threading
+
+from odoo import api, fields, models
+from odoo.tools import float_compare
+
+_logger = logging.getLogger(__name__)
+
+
+class Rma(models.Model):
+    _inherit = "rma"
+
+    vendor_return_move_ids = fields.One2many(
+        comodel_name="stock.move",
+        inverse_name="rma_vendor_return_id",
+        string="Vendor return moves",
+        readonly=True,
+        copy=False,
+    )
+    vendor_return_picking_id = fields.Many2one(
+        comodel_name="stock.picking",
+        string="Vendor return",
+        compute="_compute_vendor_return_picking_id",
+    )
+    # Set when the supplier info of the product doesn't send the goods of
+    # the RMA to a supplier, so the RMA isn't checked on every cron run.
+    # Reset when the supplier info of the product changes.
+    vendor_return_skipped = fields.Boolean(readonly=True, copy=False)
+
+    @api.depends("vendor_return_move_ids.picking_id")
+    def _compute_vendor_return_picking_id(self):
+        for record in self:
+            record.vendor_return_picking_id = record.vendor_return_move_ids[
+                -1:
+            ].picking_id
+
+    def _get_vendor_return_states(self):
+        """RMA states in which the received goods are not going back to
+        the customer anymore, so they can be sent to the supplier.
+        """
+        return ["waiting_replacement", "refunded", "replaced", "finished"]
+
+    def _get_vendor_return_domain(self):
+        return [
+            ("state", "in", self._get_vendor_return_states()),
+            ("reception_move_id.state", "=", "done"),
+            ("vendor_return_move_ids", "=", False),
+            ("vendor_return_skipped", "=", False),
+            ("warehouse_id", "!=", False),
+            ("product_id.product_tmpl_id.seller_ids", "!=", False),
+        ]
+
+    @api.model
+    def _cron_create_vendor_returns(self, chunk_size=500):
+        """Send the goods of the received RMAs back to the suppliers.
+        RMAs are processed in chunks and the transaction is committed
+        after each chunk. A failing chunk is rolled back and logged, and
+        the next chunks are processed anyway. Its RMAs are retried on the
+        next run.
+        """
+        rmas = self.search(self._get_vendor_return_domain(), order="id")
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        for index in range(0, len(rmas), chunk_size):
+            chunk = rmas[index : index + chunk_size]
+            try:
+                with self.env.cr.savepoint():
+                    chunk._create_vendor_returns()
+            except Exception:
+                _logger.exception(
+                    "Vendor returns of the RMAs %s couldn't be created", chunk.ids
+                )
+                # Drop the values of the rolled back records from the cache
+                self.env.clear()
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
+            self.invalidate_cache()
+
+    def _create_vendor_returns(self):
+        """Create the outgoing pickings that send the goods of these RMAs
+        back to the suppliers, one picking per return address and
+        location of the received goods. Only products whose supplier info
+        sets the supplier or another partner as the warranty return
+        partner are returned, the other RMAs are flagged as skipped.
+        """
+        sellers = self.env["product.supplierinfo"]._get_warranty_sellers(
+            self.mapped("product_id"), self.mapped("company_id")
+        )
+        group_dict = {}
+        skipped = self.env["rma"]
+        for rma in self:
+            if not rma.warehouse_id:
+                continue
+            seller = sellers.get((rma.product_id.id, rma.company_id.id))
+            if not seller or seller.warranty_return_partner == "company":
+                skipped |= rma
+                continue
+            address = seller._get_warranty_return_address(rma.company_id)
+            if address == rma.company_id.partner_id:
+                # Type 'other' without address: the goods would be sent to
+                # the company itself
+                _logger.info(
+                    "No vendor return for the RMA %s: the supplier info of "
+                    "its product has no return address",
+                    rma.name,
+                )
+                skipped |= rma
+                continue
+            if (
+                float_compare(
+                    rma._get_vendor_return_qty(),
+                    0,
+                    precision_rounding=rma.product_uom.rounding,
+                )
+                <= 0
+            ):
+                # All the goods went back to the customer
+                skipped |= rma
+                continue
+            key = (address, rma.warehouse_id, rma.location_id)
+            rmas, instructions = group_dict.setdefault(
+                key, (self.env["rma"], self.env["return.instruction"])
+            )
+            group_dict[key] = (rmas | rma, instructions | seller.return_instructions)
+        skipped.write({"vendor_return_skipped": True})
+        if not group_dict:
+            return self.env["stock.picking"]
+        picking_vals_list = []
+        for (address, warehouse, location), (rmas, instructions) in group_dict.items():
+            picking_vals_list.append(
+                rmas._prepare_vendor_return_picking_vals(
+                    address, warehouse, location, instructions
+                )
+            )
+        pickings = self.env["stock.picking"].create(picking_vals_list)
+        move_vals_list = []
+        for picking, (rmas, _instructions) in zip(pickings, group_dict.values()):
+            for rma in rmas:
+                move_vals_list.append(rma._prepare_vendor_return_move_vals(picking))
+        self.env["stock.move"].create(move_vals_list)
+        pickings.action_confirm()
+        pickings.action_assign()
+        for picking, (rmas, _instructions) in zip(pickings, group_dict.values()):
+            picking.message_post_with_view(
+                "mail.message_origin_link",
+                values={"self": picking, "origin": rmas},
+                subtype_id=self.env.ref("mail.mt_note").id,
+            )
+        return pickings
+
+    def _prepare_vendor_return_picking_vals(
+        self, address, warehouse, location, instructions
+    ):
+        return {
+            "picking_type_id": warehouse.rma_out_type_id.id,
+            "partner_id": address.id,
+            "origin": ", ".join(self.mapped("name")),
+            "location_id": location.id,
+            "location_dest_id": address.property_stock_supplier.id,
+            "company_id": warehouse.company_id.id,
+            "move_type": "direct",
+            "note": "\n".join(filter(None, instructions.mapped("instructions"))),
+        }
+
+    def _get_vendor_return_qty(self):
+        """Quantity of the received goods still held in the RMA location,
+        in the unit of measure of the RMA: the goods returned to the
+        customer are not sent to the supplier.
+        """
+        self.ensure_one()
+        qty = self.product_uom_qty
+        for move in self.delivery_move_ids:
+            # Only the returns take the received goods, the replacements
+            # are not chained to the reception
+            if (
+                move.state == "cancel"
+                or move.scrapped
+                or self.reception_move_id not in move.move_orig_ids
+            ):
+                continue
+            move_qty = (
+                move.quantity_done if move.state == "done" else move.product_uom_qty
+            )
+            qty -= move.product_uom._compute_quantity(move_qty, self.product_uom)
+        return qty
+
+    def _prepare_vendor_return_move_vals(self, picking):
+        self.ensure_one()
+        return {
+            "name": self.name,
+            "origin": self.name,
+            "picking_id": picking.id,
+            "picking_type_id": picking.picking_type_id.id,
+            "partner_id": picking.partner_id.id,
+            "product_id": self.product_id.id,
+            "product_uom_qty": self._get_vendor_return_qty(),
+            "product_uom": self.product_uom.id,
+            "location_id": picking.location_id.id,
+            "location_dest_id": picking.location_dest_id.id,
+            "company_id": picking.company_id.id,
+            "move_orig_ids": [(4, self.reception_move_id.id)],
+            "rma_vendor_return_id": self.id,
+        }
@@ -0,0 +1,26 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+
+class StockMove(models.Model):
+    _inherit = "stock.move"
+
+    # RMA whose received goods are sent back to the supplier by this move
+    rma_vendor_return_id = fields.Many2one(
+        comodel_name="rma",
+        string="RMA vendor return",
+        index=True,
+        copy=False,
+    )
+
+    @api.model
+    def _prepare_merge_moves_distinct_fields(self):
+        """Keep one vendor return move per RMA in the grouped pickings."""
+        return super()._prepare_merge_moves_distinct_fields() + ["rma_vendor_return_id"]
+
+    def _prepare_move_split_vals(self, qty):
+        res = super()._prepare_move_split_vals(qty)
+        res["rma_vendor_return_id"] = self.sudo().rma_vendor_return_id.id
+        return res
@@ -0,0 +1,128 @@
+# Copyright 2026 Odoo Community Association (OCA)
+# License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import Form
+
+from odoo.addons.rma.tests.test_rma import TestRma
+
+
+class TestRmaVendorReturn(TestRma):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.vendor = cls.res_partner.create({"name": "Vendor test"})
+        cls.instruction = cls.env["return.instruction"].create(
+            {"name": "Test instructions", "instructions": "Attach the RMA number"}
+        )
+        cls.seller = cls.env["product.supplierinfo"].create(
+            {
+                "name": cls.vendor.id,
+                "product_tmpl_id": cls.product.product_tmpl_id.id,
+                "warranty_return_partner": "supplier",
+                "return_instructions": cls.instruction.id,
+            }
+        )
+
+    def test_vendor_return(self):
+        rma_1 = self._create_confirm_receive(
+            self.partner, self.product, 10, self.rma_loc
+        )
+        rma_2 = self._create_confirm_receive(
+            self.partner, self.product, 5, self.rma_loc
+        )
+        rma_3 = self._create_confirm_receive(
+            self.partner, self.product, 5, self.rma_loc
+        )
+        (rma_1 | rma_2).action_refund()
+        self.env["rma"]._cron_create_vendor_returns()
+        picking = rma_1.vendor_return_picking_id
+        self.assertTrue(picking)
+        # Both RMAs are grouped in the same picking, one move per RMA
+        self.assertEqual(rma_2.vendor_return_picking_id, picking)
+        self.assertEqual(len(picking.move_lines), 2)
+        self.assertEqual(picking.partner_id, self.vendor)
+        self.assertEqual(picking.location_id, self.rma_loc)
+        self.assertEqual(picking.location_dest_id, self.vendor.property_stock_supplier)
+        self.assertIn("Attach the RMA number", picking.note)
+        # The goods leave the location where they were received
+        self.assertEqual(picking.move_lines.location_id, self.rma_loc)
+        self.assertEqual(rma_1.vendor_return_move_ids.product_uom_qty, 10)
+        self.assertEqual(
+            rma_1.vendor_return_move_ids.move_orig_ids, rma_1.reception_move_id
+        )
+        # RMAs whose goods can still go back to the customer are kept
+        self.assertFalse(rma_3.vendor_return_move_ids)
+        # RMAs are sent back only once
+        self.env["rma"]._cron_create_vendor_returns()
+        self.assertEqual(len(rma_1.vendor_return_move_ids), 1)
+
+    def test_vendor_return_company_return_type(self):
+        self.seller.warranty_return_partner = "company"
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        rma.action_refund()
+        self.env["rma"]._cron_create_vendor_returns()
+        self.assertFalse(rma.vendor_return_move_ids)
+        # Skipped RMAs aren't checked again on the next runs
+        self.assertTrue(rma.vendor_return_skipped)
+        self.assertNotIn(
+            rma, self.env["rma"].search(self.env["rma"]._get_vendor_return_domain())
+        )
+        # Until the supplier info of the product changes
+        self.seller.warranty_return_partner = "supplier"
+        self.assertFalse(rma.vendor_return_skipped)
+        self.env["rma"]._cron_create_vendor_returns()
+        self.assertTrue(rma.vendor_return_move_ids)
+
+    def test_vendor_return_partially_returned(self):
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        rma.create_return(fields.Datetime.now(), 4, rma.product_uom)
+        return_move = rma.delivery_move_ids
+        return_move.quantity_done = 4
+        return_move.picking_id._action_done()
+        finalization_form = Form(
+            self.env["rma.finalization.wizard"].with_context(
+                active_ids=rma.ids,
+                rma_finalization_type="replace",
+            )
+        )
+        finalization_form.finalization_id = self.finalization_reason_2
+        finalization_form.save().action_finish()
+        self.env["rma"]._cron_create_vendor_returns()
+        # Only the goods still in the RMA location are sent to the vendor
+        self.assertEqual(rma.vendor_return_move_ids.product_uom_qty, 6)
+
+    def test_vendor_return_other_type_without_address(self):
+        self.seller.warranty_return_partner = "other"
+        rma = self._create_confirm_receive(self.partner, self.product, 10, self.rma_loc)
+        rma.action_refund()
+        with self.assertLogs("odoo.addons.rma_vendor_return.models.rma", "INFO"):
+            self.env["rma"]._cron_create_vendor_returns()
+        # The goods are not sent to the company itself
+        self.assertFalse(rma.vendor_return_move_ids)
+        self.assertTrue(rma.vendor_return_skipped)
+
+    def test_vendor_return_failing_chunk(self):
+        rma_1 = self._create_confirm_receive(
+            self.partner, self.product, 10, self.rma_loc
+        )
+        rma_2 = self._create_confirm_receive(
+            self.partner, self.product, 5, self.rma_loc
+        )
+        (rma_1 | rma_2).action_refund()
+        create_vendor_returns = type(rma_1)._create_vendor_returns
+
+        def failing_create_vendor_returns(self):
+            if rma_1 in self:
+                raise Exception("Vendor return error")
+            return create_vendor_returns(self)
+
+        with patch.object(
+            type(rma_1), "_create_vendor_returns", failing_create_vendor_returns
+        ), self.assertLogs("odoo.addons.rma_vendor_return.models.rma", level="ERROR"):
+            self.env["rma"]._cron_create_vendor_returns(chunk_size=1)
+        # The failing chunk doesn't prevent the next ones
+        self.assertFalse(rma_1.vendor_return_move_ids)
+        self.assertTrue(rma_2.vendor_return_move_ids)